@@ -2,8 +2,9 @@
 Script to add 'already_registered_message' text to NocoDB
 """
 import asyncio
-import httpx
 from config import config
+from bot_flow.flows.nocodb_client import get_nocodb_client, where_eq
+from bot_flow.flows.nocodb_utils import close_client_pool
 
 
 async def add_already_registered_message():
@@ -13,33 +14,30 @@ async def add_already_registered_message():
         print("❌ NocoDB not configured!")
         return
 
-    headers = {
-        "xc-token": config.NOCODB_API_TOKEN,
-        "Content-Type": "application/json"
-    }
+    client = get_nocodb_client()
+
+    try:
+        await _add_record(client)
+    finally:
+        await close_client_pool()
+
 
+async def _add_record(client) -> None:
+    """Check for existing record and add it if missing"""
     # Check if record already exists
     print("🔍 Checking if 'already_registered_message' already exists...")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{config.NOCODB_API_URL}/api/v2/tables/{config.NOCODB_TEXTS_TABLE_ID}/records",
-                headers=headers,
-                params={
-                    "where": "(action,eq,already_registered_message)",
-                    "limit": 1
-                },
-                timeout=10.0
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("list"):
-                print("✅ Record already exists!")
-                record = data["list"][0]
-                print(f"   ID: {record.get('Id')}")
-                print(f"   Text: {record.get('text')[:100]}...")
-                return
+        record = await client.find(
+            config.NOCODB_TEXTS_TABLE_ID,
+            where_eq("action", "already_registered_message"),
+            fields=["Id", "text"]
+        )
+
+        if record:
+            print("✅ Record already exists!")
+            print(f"   ID: {record.id}")
+            print(f"   Text: {record.get('text')[:100]}...")
+            return
 
     except Exception as e:
         print(f"❌ Error checking existing record: {e}")
@@ -60,20 +58,12 @@ async def add_already_registered_message():
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{config.NOCODB_API_URL}/api/v2/tables/{config.NOCODB_TEXTS_TABLE_ID}/records",
-                headers=headers,
-                json=new_record,
-                timeout=10.0
-            )
-            response.raise_for_status()
-            result = response.json()
-
-            print("✅ Successfully added new record!")
-            print(f"   ID: {result.get('Id') or result.get('id')}")
-            print(f"   Action: {new_record['action']}")
-            print(f"   Text: {new_record['text'][:100]}...")
+        record_id = await client.create(config.NOCODB_TEXTS_TABLE_ID, new_record)
+
+        print("✅ Successfully added new record!")
+        print(f"   ID: {record_id}")
+        print(f"   Action: {new_record['action']}")
+        print(f"   Text: {new_record['text'][:100]}...")
 
     except Exception as e:
         print(f"❌ Error adding record: {e}")
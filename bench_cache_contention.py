@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CacheManager miss contention.
+
+1,000 concurrent misses spread over 100 keys, each fetch taking 20ms
+(simulated NocoDB round trip). Compares the previous global-lock
+get_or_fetch (every miss serialized behind one lock) with per-key
+single-flight (one fetch per key, keys fetched in parallel).
+
+Run: python bench_cache_contention.py [requests] [keys] [fetch_ms]
+"""
+import asyncio
+import sys
+import time
+
+from bot_flow.flows.cache_manager import CacheManager
+
+
+class GlobalLockCacheManager(CacheManager):
+    """get_or_fetch as before single-flight: one lock for all keys"""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = asyncio.Lock()
+
+    async def get_or_fetch(self, key, fetch_fn, ttl=None, hard_ttl=None):
+        value = self.get(key)
+        if value is not None:
+            return value
+        async with self.lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            value = await fetch_fn()
+            self.set(key, value, ttl, hard_ttl)
+            return value
+
+
+async def run(cache: CacheManager, requests: int, keys: int, fetch_delay: float) -> dict:
+    fetches = 0
+    latencies = []
+
+    def fetcher(key: str):
+        async def fetch():
+            nonlocal fetches
+            fetches += 1
+            await asyncio.sleep(fetch_delay)
+            return f"value-{key}"
+        return fetch
+
+    async def request(index: int):
+        key = f"user:{index % keys}"
+        started = time.perf_counter()
+        await cache.get_or_fetch(key, fetcher(key), ttl=60)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request(index) for index in range(requests)))
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'total': total,
+        'fetches': fetches,
+        'p50': latencies[len(latencies) // 2],
+        'p99': latencies[int(len(latencies) * 0.99) - 1]
+    }
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    keys = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    fetch_delay = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+
+    print("=" * 60)
+    print(f"📊 Cache contention: {requests} concurrent misses, {keys} keys, "
+          f"{fetch_delay * 1000:.0f}ms fetch")
+    print("=" * 60)
+    for name, cache in (("Global lock", GlobalLockCacheManager()), ("Single-flight", CacheManager())):
+        result = asyncio.run(run(cache, requests, keys, fetch_delay))
+        print(f"{name:14} total {result['total'] * 1000:7.0f}ms  fetches {result['fetches']:4}  "
+              f"p50 {result['p50'] * 1000:6.0f}ms  p99 {result['p99'] * 1000:6.0f}ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Global Payment Tracker sweep preparation at 50k tracked users.
+
+Compares the per-sweep rebuild (reverse dict + chunking + where clauses from
+scratch) with the incrementally maintained SweepIndex, plus the cost of
+track/untrack churn between sweeps. With AdaptivePollingPolicy enabled (half
+of the users backed off), compares filtering every user per sweep with the
+per-chunk next checks kept in SweepIndex. No API calls are made.
+
+Run: python bench_tracker_sweep.py [users]
+"""
+import sys
+import time
+from datetime import datetime
+
+from bot_flow.core import AdaptivePollingPolicy
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker, chunk_record_ids
+from bot_flow.flows.nocodb_client import where_in
+
+
+def rebuild_per_sweep(tracker: GlobalPaymentTracker) -> list:
+    """Sweep preparation as done before the index (everything rebuilt each sweep)"""
+    user_by_record = {record_id: user_id for user_id, record_id in tracker.user_records.items()}
+    user_ids = list(tracker.user_records)
+    chunks = chunk_record_ids([tracker.user_records[user_id] for user_id in user_ids])
+    return [(where_in("Id", chunk), len(chunk)) for chunk in chunks], user_by_record
+
+
+def filter_per_sweep(tracker: GlobalPaymentTracker) -> list:
+    """Due selection as done before per-chunk next checks (every user filtered each sweep)"""
+    user_ids = tracker.polling_policy.due(
+        user_id for record_id, user_id in tracker.user_by_record.items()
+        if record_id in tracker.sweep_index
+    )
+    chunks = chunk_record_ids([tracker.user_records[user_id] for user_id in user_ids])
+    return [(where_in("Id", chunk), len(chunk)) for chunk in chunks]
+
+
+def bench_policy(users: int, repeat: int) -> None:
+    """Sweep preparation with AdaptivePollingPolicy, older half of the users backed off"""
+    tracker = GlobalPaymentTracker()
+    tracker.polling_policy = AdaptivePollingPolicy(base_interval=20)
+    abandoned = time.time() - 3 * 24 * 3600
+    for user_id in range(users):
+        created_at = abandoned if user_id < users // 2 else None
+        tracker.track_user(user_id, str(1_000_000 + user_id),
+                           created_at=datetime.fromtimestamp(created_at) if created_at else None)
+
+    # First sweep checks everyone; one interval later only the fresh half is due
+    checked, _, user_ids = tracker._select_due()
+    tracker._record_checks(user_ids, checked)
+    tracker.polling_policy.record_checks(range(users // 2, users), time.time() - 20)
+
+    _, queries, due = tracker._select_due()
+    print(f"Policy, per user:    {timed(lambda: filter_per_sweep(tracker), repeat) * 1000:8.2f} ms/sweep")
+    print(f"Policy, per chunk:   {timed(tracker._select_due, repeat) * 1000:8.2f} ms/sweep "
+          f"({len(due)} due in {len(queries)} chunks)")
+
+
+def timed(func, repeat: int) -> float:
+    """Average seconds per call"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    repeat = 20
+
+    tracker = GlobalPaymentTracker()
+    started = time.perf_counter()
+    for user_id in range(users):
+        tracker.track_user(user_id, str(1_000_000 + user_id))
+    track_time = time.perf_counter() - started
+
+    print("=" * 60)
+    print(f"📊 Tracker sweep preparation ({users} tracked users)")
+    print("=" * 60)
+    print(f"track_user:          {track_time / users * 1e6:8.2f} µs/user")
+
+    rebuild = timed(lambda: rebuild_per_sweep(tracker), repeat)
+    print(f"Rebuild per sweep:   {rebuild * 1000:8.2f} ms/sweep")
+
+    tracker.sweep_index.chunks()  # Warm where clause cache
+    cached = timed(tracker.sweep_index.chunks, repeat)
+    print(f"SweepIndex (steady): {cached * 1000:8.2f} ms/sweep "
+          f"({len(tracker.sweep_index.chunks())} chunks)")
+
+    # Typical churn between sweeps: some users pay, some register
+    def churn_and_prepare():
+        for offset in range(100):
+            user_id = churn_and_prepare.next_user + offset
+            tracker.untrack_user(user_id - users)
+            tracker.track_user(user_id, str(1_000_000 + user_id))
+        churn_and_prepare.next_user += 100
+        tracker.sweep_index.chunks()
+    churn_and_prepare.next_user = users
+
+    churned = timed(churn_and_prepare, repeat)
+    print(f"SweepIndex (churn):  {churned * 1000:8.2f} ms/sweep (+100/-100 users per sweep)")
+    print(f"Speedup (steady): {rebuild / cached:.0f}x")
+    bench_policy(users, repeat)
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
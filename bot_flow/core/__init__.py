@@ -6,6 +6,7 @@ A fluent API for building Telegram bots with automatic flow visualization.
 from .state import StateNode, Flow, Button, TriggerType, PollingConfig
 from .builder import FlowBuilder, StateBuilder, create_flow
 from .executor import FlowExecutor, FlowContext
+from .polling_policy import AdaptivePollingPolicy
 from .visualizer import FlowVisualizer, visualize
 
 __all__ = [
@@ -25,6 +26,9 @@ __all__ = [
     'FlowExecutor',
     'FlowContext',
 
+    # Polling
+    'AdaptivePollingPolicy',
+
     # Visualizer
     'FlowVisualizer',
     'visualize',
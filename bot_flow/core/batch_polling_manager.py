@@ -13,11 +13,13 @@ Solution:
     - Centralized batch polling: 300 users / 20 per batch = 15 requests
     - 15 requests / 60s = 0.25 RPS (95% reduction!)
     - Works even with 1000+ users
+    - Optional AdaptivePollingPolicy: stale subscriptions are checked less often
 """
 import asyncio
 from typing import Dict, Set, Callable, Optional, Any
 from dataclasses import dataclass
 import time
+from .polling_policy import AdaptivePollingPolicy
 
 
 @dataclass
@@ -58,7 +60,8 @@ class BatchPollingManager:
         self,
         batch_check_fn: Callable[[list], Dict[str, bool]],
         interval: int = 60,
-        batch_size: int = 20
+        batch_size: int = 20,
+        policy: Optional[AdaptivePollingPolicy] = None
     ):
         """
         Initialize batch polling manager.
@@ -67,10 +70,12 @@ class BatchPollingManager:
             batch_check_fn: Async function(record_ids: list) -> dict{record_id: is_paid}
             interval: Polling interval in seconds (default: 60)
             batch_size: Number of records to check per batch (default: 20)
+            policy: Adaptive schedule; only due subscriptions are checked each cycle
         """
         self.batch_check_fn = batch_check_fn
         self.interval = interval
         self.batch_size = batch_size
+        self.policy = policy
 
         # Active subscriptions: {user_id: PollingSubscription}
         self.subscriptions: Dict[int, PollingSubscription] = {}
@@ -91,7 +96,8 @@ class BatchPollingManager:
         self,
         user_id: int,
         record_id: str,
-        callback: Callable[[bool], Any]
+        callback: Callable[[bool], Any],
+        created_at: Optional[float] = None
     ) -> None:
         """
         Subscribe user to centralized batch polling.
@@ -100,6 +106,7 @@ class BatchPollingManager:
             user_id: Telegram user ID
             record_id: NocoDB record ID to monitor
             callback: Async function to call when payment status changes
+            created_at: Record creation timestamp for the adaptive policy (default: now)
         """
         subscription = PollingSubscription(
             user_id=user_id,
@@ -110,6 +117,8 @@ class BatchPollingManager:
 
         self.subscriptions[user_id] = subscription
         self.stats['active_subscriptions'] = len(self.subscriptions)
+        if self.policy is not None:
+            self.policy.register(user_id, created_at)
 
         print(f"✅ User {user_id} subscribed to batch polling (record: {record_id})")
         print(f"📊 Active subscriptions: {len(self.subscriptions)}")
@@ -124,6 +133,8 @@ class BatchPollingManager:
         if user_id in self.subscriptions:
             del self.subscriptions[user_id]
             self.stats['active_subscriptions'] = len(self.subscriptions)
+            if self.policy is not None:
+                self.policy.forget(user_id)
             print(f"🔕 User {user_id} unsubscribed from batch polling")
 
     async def start(self) -> None:
@@ -169,9 +180,16 @@ class BatchPollingManager:
         if not self.subscriptions:
             return
 
+        subscriptions = list(self.subscriptions.values())
+        if self.policy is not None:
+            due_users = set(self.policy.due(sub.user_id for sub in subscriptions))
+            subscriptions = [sub for sub in subscriptions if sub.user_id in due_users]
+            if not subscriptions:
+                return
+
         # Collect all record IDs
-        record_ids = [sub.record_id for sub in self.subscriptions.values()]
-        user_id_by_record = {sub.record_id: sub.user_id for sub in self.subscriptions.values()}
+        record_ids = [sub.record_id for sub in subscriptions]
+        user_id_by_record = {sub.record_id: sub.user_id for sub in subscriptions}
 
         print(f"\n🔍 Checking {len(record_ids)} payment records in batches of {self.batch_size}...")
 
@@ -194,6 +212,12 @@ class BatchPollingManager:
 
         await asyncio.gather(*tasks, return_exceptions=True)
 
+        if self.policy is not None:
+            # Paid users were unsubscribed (and forgotten) in _check_batch
+            self.policy.record_checks(
+                sub.user_id for sub in subscriptions if sub.user_id in self.subscriptions
+            )
+
         print(f"✅ Batch polling completed. Next check in {self.interval}s\n")
 
     async def _check_batch(
@@ -92,20 +92,29 @@ class StateBuilder:
         return self
 
     def poll(self, check_function: Callable[[Any], bool],
-             interval: int = 10) -> 'StateBuilder':
+             interval: int = 10, event_driven: bool = False,
+             policy: Optional[Any] = None) -> 'StateBuilder':
         """
         Enable polling mode for this state.
 
         The check_function will be called every `interval` seconds.
         Use .on_condition() to define what happens when check returns True.
 
+        With event_driven=True the check runs once on entry and the wait is
+        then resolved by push (e.g. Global Payment Tracker events calling
+        FlowExecutor.confirm_poll) - no per-user polling loop.
+
         Args:
             check_function: Function that returns bool (receives context)
             interval: Polling interval in seconds
+            event_driven: Wait for push confirmation instead of polling
+            policy: AdaptivePollingPolicy deciding when each user is actually checked
         """
         self._state.polling = PollingConfig(
             check_function=check_function,
-            interval=interval
+            interval=interval,
+            event_driven=event_driven,
+            policy=policy
         )
         return self
 
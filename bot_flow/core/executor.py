@@ -4,7 +4,7 @@ Executor for running declarative bot flows with python-telegram-bot.
 import asyncio
 import os
 import signal
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, ContextTypes, filters
 
@@ -95,9 +95,17 @@ class FlowExecutor:
         # Track active polling tasks: user_id -> asyncio.Task
         self.polling_tasks: Dict[int, asyncio.Task] = {}
 
+        # Context of each active polling task: user_id -> FlowContext (or restored mock context)
+        self.poll_contexts: Dict[int, Any] = {}
+
         # Shutdown flag
         self._shutdown_requested = False
 
+        # Flow hot-swap: version counter and background rebuild state
+        self.flow_version = 1
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self._rebuild_pending = False
+
         # Admin chat IDs for notifications
         self.admin_chat_ids = admin_chat_ids or []
 
@@ -171,8 +179,10 @@ class FlowExecutor:
         # Track previous state for notifications
         previous_state = self.user_states.get(user_id)
 
-        # Update user state
+        # Update user state (previous polling wait, if any, is over)
+        self._forget_polling_schedule(user_id, previous_state)
         self.user_states[user_id] = state_name
+        self.poll_contexts.pop(user_id, None)
         print(f"🔄 User {user_id} -> {state_name}")
 
         # Notify admins about state change (only for important states)
@@ -207,12 +217,23 @@ class FlowExecutor:
             # Cancel previous polling task if exists
             if user_id in self.polling_tasks:
                 self.polling_tasks[user_id].cancel()
+                del self.polling_tasks[user_id]
+
+            if state.polling.event_driven:
+                # No loop: check once, then wait for confirm_poll (push)
+                self.poll_contexts[user_id] = flow_ctx
+                await self._check_on_entry(user_id, state, flow_ctx)
+                return
+
+            if state.polling.policy:
+                state.polling.policy.register(user_id)
 
             # Start new polling task
             task = asyncio.create_task(
                 self._poll_state(user_id, state, flow_ctx)
             )
             self.polling_tasks[user_id] = task
+            self.poll_contexts[user_id] = flow_ctx
 
         # Handle auto transition (skip if state expects MESSAGE - transition will happen on message receipt)
         elif state.auto_transition and state.trigger_type != TriggerType.MESSAGE:
@@ -252,6 +273,10 @@ class FlowExecutor:
         while self.user_states.get(user_id) == state.name:
             await asyncio.sleep(polling.interval)
 
+            # Adaptive schedule: skip ticks until the user's record is due
+            if polling.policy and not polling.policy.due([user_id]):
+                continue
+
             # Check max attempts
             if polling.max_attempts and attempts >= polling.max_attempts:
                 if polling.on_false_goto:
@@ -262,6 +287,8 @@ class FlowExecutor:
             try:
                 result = await polling.check_function(flow_ctx)
                 flow_ctx.poll_result = result
+                if polling.policy:
+                    polling.policy.record_check(user_id)
 
                 print(f"🔍 Polling result for user {user_id} in state '{state.name}': result={result}, on_true_goto={polling.on_true_goto}, on_false_goto={polling.on_false_goto}")
 
@@ -278,6 +305,7 @@ class FlowExecutor:
                 # Record not found (404) - remove user from polling
                 print(f"🗑️  Removing user {user_id} from polling: {e}")
                 del self.user_states[user_id]
+                self.poll_contexts.pop(user_id, None)
                 if user_id in self.polling_tasks:
                     self.polling_tasks[user_id].cancel()
                     del self.polling_tasks[user_id]
@@ -288,10 +316,142 @@ class FlowExecutor:
 
             attempts += 1
 
+    async def _check_on_entry(self, user_id: int, state: StateNode,
+                              flow_ctx: FlowContext) -> None:
+        """
+        Run check of an event-driven polling state once on entry.
+
+        Covers confirmations that arrived before the user entered the state;
+        afterwards the wait is resolved by confirm_poll.
+        """
+        polling = state.polling
+        try:
+            result = await polling.check_function(flow_ctx)
+            flow_ctx.poll_result = result
+        except Exception as e:
+            print(f"❌ Entry check error in state '{state.name}': {e}")
+            return
+
+        if result and polling.on_true_goto and self.user_states.get(user_id) == state.name:
+            print(f"✅ Condition already met! Transitioning {user_id} from '{state.name}' to '{polling.on_true_goto}'")
+            await self.transition_to(user_id, polling.on_true_goto, flow_ctx)
+        else:
+            print(f"⏸️  User {user_id} waiting in '{state.name}' for push confirmation")
+
+    async def _on_payment_status_change(self, event) -> None:
+        """
+        Global Payment Tracker subscriber: move paid users out of their wait.
+
+        Replaces per-user cache polling - fires right after a tracker sweep
+        (or webhook) detects the change.
+        """
+        if not event.paid:
+            return
+        if await self.confirm_poll(event.user_id):
+            self._global_tracker.untrack_user(event.user_id)
+
+    def _forget_polling_schedule(self, user_id: int, state_name: Optional[str]) -> None:
+        """Drop user from the adaptive polling schedule of the state they are leaving"""
+        state = self.flow.get_state(state_name) if state_name else None
+        if state and state.polling and state.polling.policy:
+            state.polling.policy.forget(user_id)
+
+    def _touch_polling_schedules(self, user_id: int) -> None:
+        """
+        User interacted with the bot: move their pending checks back to the fast lane
+        (flow polling policies and Global Payment Tracker policy).
+        """
+        policies = {
+            id(state.polling.policy): state.polling.policy
+            for state in self.flow.states.values()
+            if state.polling and state.polling.policy
+        }
+        tracker_policy = getattr(getattr(self, '_global_tracker', None), 'polling_policy', None)
+        if tracker_policy is not None:
+            policies[id(tracker_policy)] = tracker_policy
+
+        for policy in policies.values():
+            policy.touch(user_id)
+
+    def swap_flow(self, new_flow: Flow) -> bool:
+        """
+        Atomically replace the running flow (e.g. rebuilt with new texts).
+
+        Users keep their current state by name. The swap is rejected if the
+        new flow is invalid, does not contain a state some user is in (the
+        user would be stranded), or changes the command set (command
+        handlers are registered once at startup).
+
+        Handlers and polling tasks resolve states through self.flow, so
+        everything after the swap uses the new flow. A poll loop already
+        running keeps its current StateNode until it transitions.
+
+        Args:
+            new_flow: Rebuilt flow
+
+        Returns:
+            True if the new flow is now running
+        """
+        errors = new_flow.validate()
+        if errors:
+            print(f"❌ Flow swap rejected: new flow is invalid ({'; '.join(errors)})")
+            return False
+
+        stranded = {
+            state_name for state_name in self.user_states.values()
+            if not new_flow.has_state(state_name)
+        }
+        if stranded:
+            users = sum(1 for state_name in self.user_states.values() if state_name in stranded)
+            print(f"❌ Flow swap rejected: {users} user(s) in removed state(s) {sorted(stranded)}")
+            return False
+
+        def commands(flow: Flow) -> Dict[str, str]:
+            return {
+                state.trigger_value: name for name, state in flow.states.items()
+                if state.trigger_type == TriggerType.COMMAND and state.trigger_value
+            }
+
+        if commands(new_flow) != commands(self.flow):
+            print("❌ Flow swap rejected: commands changed (restart required)")
+            return False
+
+        # Single assignment: handlers see either the old or the new flow
+        self.flow = new_flow
+        self.flow_version += 1
+        print(f"🔁 Flow swapped (version {self.flow_version}, {len(self.user_states)} users kept)")
+        return True
+
+    def schedule_flow_rebuild(self, build_flow: Callable[[], Awaitable[Flow]]) -> None:
+        """
+        Rebuild flow in the background and swap it in when ready.
+
+        Handlers never wait for the rebuild. Requests arriving while a
+        rebuild runs are coalesced into one more rebuild afterwards.
+
+        Args:
+            build_flow: Async function returning the rebuilt Flow
+        """
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            self._rebuild_pending = True
+            return
+        self._rebuild_task = asyncio.create_task(self._rebuild_flow(build_flow))
+
+    async def _rebuild_flow(self, build_flow: Callable[[], Awaitable[Flow]]) -> None:
+        while True:
+            self._rebuild_pending = False
+            try:
+                self.swap_flow(await build_flow())
+            except Exception as e:
+                print(f"❌ Flow rebuild failed, keeping current flow: {e}")
+            if not self._rebuild_pending:
+                return
+
     async def _handle_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
                              state_name: str) -> None:
         """Handle command trigger"""
         user_id = update.effective_user.id
+        self._touch_polling_schedules(user_id)
         flow_ctx = FlowContext(update, context, self.flow)
         await self.transition_to(user_id, state_name, flow_ctx)
 
@@ -302,6 +462,7 @@ class FlowExecutor:
 
         user_id = update.effective_user.id
         callback_data = query.data
+        self._touch_polling_schedules(user_id)
 
         # Find state with matching transition
         current_state_name = self.user_states.get(user_id)
@@ -319,6 +480,7 @@ class FlowExecutor:
         """Handle text message"""
         user_id = update.effective_user.id
         message_text = update.message.text
+        self._touch_polling_schedules(user_id)
 
         # Find current state and check if it expects a message
         current_state_name = self.user_states.get(user_id)
@@ -468,11 +630,23 @@ class FlowExecutor:
 
             mock_ctx = MockContext(user_id, record_id)
 
+            if state.polling.policy:
+                # Old registrations start backed off
+                created_at = user_data.get('created_at')
+                state.polling.policy.register(user_id, created_at.timestamp() if created_at else None)
+
+            if state.polling.event_driven:
+                # Resolved by confirm_poll when tracker reports payment
+                self.poll_contexts[user_id] = mock_ctx
+                print(f"   ✓ User {user_id} (@{username or first_name}) - record {record_id}")
+                continue
+
             # Start polling task
             task = asyncio.create_task(
                 self._poll_state_restored(user_id, state, mock_ctx)
             )
             self.polling_tasks[user_id] = task
+            self.poll_contexts[user_id] = mock_ctx
 
             print(f"   ✓ User {user_id} (@{username or first_name}) - record {record_id}")
 
@@ -482,7 +656,10 @@ class FlowExecutor:
                 await asyncio.sleep(1)
                 print(f"   ⏱️  Staggering polling start ({idx + 1}/{len(users_data)} users restored)...")
 
-        print(f"✅ Started polling for {len(users_data)} users\n")
+        if state.polling.event_driven:
+            print(f"✅ Restored {len(users_data)} users (waiting for payment events)\n")
+        else:
+            print(f"✅ Started polling for {len(users_data)} users\n")
 
     async def _poll_state_restored(self, user_id: int, state: StateNode, mock_ctx) -> None:
         """
@@ -494,6 +671,10 @@ class FlowExecutor:
         while self.user_states.get(user_id) == state.name:
             await asyncio.sleep(polling.interval)
 
+            # Adaptive schedule: skip ticks until the user's record is due
+            if polling.policy and not polling.policy.due([user_id]):
+                continue
+
             # Check max attempts
             if polling.max_attempts and attempts >= polling.max_attempts:
                 break
@@ -503,36 +684,20 @@ class FlowExecutor:
                 # For restored users, we use check_payment_status directly
                 result = await self._check_payment_status_for_restored(mock_ctx)
                 mock_ctx.poll_result = result
+                if polling.policy:
+                    polling.policy.record_check(user_id)
 
                 if result and polling.on_true_goto:
                     # Payment confirmed!
                     print(f"✅ Payment confirmed for user {user_id}")
-
-                    # Update state to success
-                    self.user_states[user_id] = "success"
-
-                    # Send success message to user
-                    success_state = self.flow.states.get("success")
-                    if success_state and success_state.message:
-                        try:
-                            # Format message (handle placeholders like {TELEGRAM_GROUP_LINK})
-                            message_text = success_state.message
-
-                            await self.application.bot.send_message(
-                                chat_id=user_id,
-                                text=message_text,
-                                **success_state.message_kwargs
-                            )
-                            print(f"📧 Sent success message to user {user_id}")
-                        except Exception as e:
-                            print(f"❌ Error sending success message to user {user_id}: {e}")
-
+                    await self._complete_restored_poll(user_id, polling.on_true_goto)
                     break
 
             except ValueError as e:
                 # Record not found (404) - remove user from polling
                 print(f"🗑️  Removing user {user_id} from polling: {e}")
                 del self.user_states[user_id]
+                self.poll_contexts.pop(user_id, None)
                 if user_id in self.polling_tasks:
                     self.polling_tasks[user_id].cancel()
                     del self.polling_tasks[user_id]
@@ -543,6 +708,61 @@ class FlowExecutor:
 
             attempts += 1
 
+    async def _complete_restored_poll(self, user_id: int, target_state: str) -> None:
+        """
+        Move restored user (no FlowContext available) to target state
+        and send that state's message directly by chat ID.
+        """
+        self._forget_polling_schedule(user_id, self.user_states.get(user_id))
+        self.user_states[user_id] = target_state
+        self.poll_contexts.pop(user_id, None)
+
+        # Send target state message to user
+        state = self.flow.states.get(target_state)
+        if state and state.message:
+            try:
+                # Message placeholders (like {TELEGRAM_GROUP_LINK}) are formatted at build time
+                await self.application.bot.send_message(
+                    chat_id=user_id,
+                    text=state.message,
+                    **state.message_kwargs
+                )
+                print(f"📧 Sent {target_state} message to user {user_id}")
+            except Exception as e:
+                print(f"❌ Error sending {target_state} message to user {user_id}: {e}")
+
+    async def confirm_poll(self, user_id: int) -> bool:
+        """
+        Resolve user's polling wait immediately, as if the check returned True.
+
+        Used by push sources (e.g. NocoDB webhook) to skip the poll interval:
+        cancels the polling task and transitions to the state's on_true_goto.
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            True if user was waiting in a polling state and has been transitioned
+        """
+        state_name = self.user_states.get(user_id)
+        state = self.flow.get_state(state_name) if state_name else None
+        if not state or not state.polling or not state.polling.on_true_goto:
+            return False
+
+        task = self.polling_tasks.pop(user_id, None)
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        flow_ctx = self.poll_contexts.pop(user_id, None)
+
+        print(f"⚡ Condition confirmed for user {user_id} in '{state_name}', transitioning to '{state.polling.on_true_goto}'")
+
+        if isinstance(flow_ctx, FlowContext):
+            flow_ctx.poll_result = True
+            await self.transition_to(user_id, state.polling.on_true_goto, flow_ctx)
+        else:
+            await self._complete_restored_poll(user_id, state.polling.on_true_goto)
+        return True
+
     async def _check_payment_status_for_restored(self, mock_ctx) -> bool:
         """
         Check payment status for restored users.
@@ -567,37 +787,24 @@ class FlowExecutor:
         if not record_id:
             return False
 
-        # Import NocoDB credentials
-        import os
-        nocodb_api_url = os.getenv("NOCODB_API_URL", "https://app.nocodb.com")
-        nocodb_api_token = os.getenv("NOCODB_API_TOKEN")
-        nocodb_table_id = os.getenv("NOCODB_TABLE_ID")
+        from bot_flow.flows.nocodb_client import get_nocodb_client
 
-        if not nocodb_api_token or not nocodb_table_id:
-            return False
+        client = get_nocodb_client()
+        nocodb_table_id = self.nocodb_table_id or os.getenv("NOCODB_TABLE_ID")
 
-        headers = {"xc-token": nocodb_api_token}
+        if not client.is_configured or not nocodb_table_id:
+            return False
 
         try:
-            # Use nocodb_request_with_retry for rate limiting and connection pooling
-            from bot_flow.flows.nocodb_utils import nocodb_request_with_retry
-
-            response = await nocodb_request_with_retry(
-                "GET",
-                f"{nocodb_api_url}/api/v2/tables/{nocodb_table_id}/records/{record_id}",
-                headers=headers,
-                timeout=10.0
-            )
+            # Client goes through nocodb_request_with_retry (rate limiting, connection pooling)
+            record = await client.get(nocodb_table_id, record_id, fields=["Id", "Paid"])
 
-            # Check for 404 - record not found (deleted from NocoDB)
-            if response.status_code == 404:
+            # Record not found (deleted from NocoDB)
+            if record is None:
                 print(f"⚠️  Record {record_id} not found in NocoDB (deleted?)")
                 raise ValueError(f"Record {record_id} not found")
 
-            response.raise_for_status()
-            record = response.json()
-            is_paid = record.get("Paid", False) is True
-            return is_paid
+            return record.get("Paid", False) is True
 
         except ValueError:
             # Re-raise ValueError for 404 handling
@@ -610,6 +817,30 @@ class FlowExecutor:
         """Cleanup resources on shutdown"""
         print("\n🛑 Shutting down gracefully...")
 
+        # Stop background flow rebuild
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            self._rebuild_task.cancel()
+
+        # Stop accepting webhooks
+        if hasattr(self, '_webhook_server'):
+            await self._webhook_server.stop()
+
+        # Stop replica sync
+        if hasattr(self, '_replica'):
+            await self._replica.stop()
+
+        # Stop registered users filter rebuilds
+        if hasattr(self, '_registered_users'):
+            await self._registered_users.stop()
+
+        # Stop cache expiry
+        if hasattr(self, '_cache_janitor'):
+            await self._cache_janitor.stop()
+
+        # Final flush of queued NocoDB writes (the rest is kept on disk)
+        if hasattr(self, '_outbox'):
+            await self._outbox.stop()
+
         # Cancel all active polling tasks
         if self.polling_tasks:
             print(f"⏹️  Cancelling {len(self.polling_tasks)} polling tasks...")
@@ -662,11 +893,39 @@ class FlowExecutor:
             # Start Global Payment Tracker if available
             if hasattr(self, '_global_tracker'):
                 tracker = self._global_tracker
-                print(f"🎯 Starting Global Payment Tracker (update interval: 20s)...")
+                interval = tracker.update_interval
+                print(f"🎯 Starting Global Payment Tracker (update interval: {interval}s)...")
+                # Push paid users out of their waits as soon as a sweep detects it
+                tracker.subscribe(self._on_payment_status_change)
+
                 # Start tracker in background (non-blocking)
-                asyncio.create_task(tracker.start(interval=20))
+                asyncio.create_task(tracker.start(interval=interval))
                 print(f"✅ Global Payment Tracker started!\n")
 
+            # Keep local payments replica fresh (change feed)
+            if hasattr(self, '_replica'):
+                await self._replica.start()
+
+            # Periodically rebuild registered users filter
+            if hasattr(self, '_registered_users'):
+                await self._registered_users.start()
+
+            # Remove expired cache entries as they fall due
+            if hasattr(self, '_cache_janitor'):
+                await self._cache_janitor.start()
+
+            # Start flushing queued NocoDB writes
+            if hasattr(self, '_outbox'):
+                await self._outbox.start()
+
+            # Start NocoDB webhook receiver if configured
+            if hasattr(self, '_webhook_server'):
+                await self._webhook_server.start()
+
+            # Refresh content loaded from a startup snapshot (non-blocking)
+            if hasattr(self, '_content_refresh'):
+                asyncio.create_task(self._content_refresh())
+
             # Restore user states if any were loaded
             if hasattr(self, '_awaiting_users') and self._awaiting_users:
                 await self.restore_user_states(self._awaiting_users)
@@ -0,0 +1,190 @@
+"""
+Age-aware adaptive polling schedule.
+
+Almost all payments arrive within minutes of the payment info being shown,
+so checking a 3-day-old pending record as often as a 30-second-old one
+wastes API calls. AdaptivePollingPolicy keeps fresh keys in a fast lane and
+backs off exponentially as they age:
+
+    age < fresh_period          -> base_interval
+    fresh_period * factor^(n-1)
+      <= age < fresh_period * factor^n -> base_interval * factor^n
+    (capped at max_interval)
+
+With the defaults (20s base, 10 min fresh period, factor 2, 1h cap) a record
+is checked every 20s for 10 minutes, every 40s until 20 minutes, every 80s
+until 40 minutes and so on; abandoned registrations end up at one check per
+hour. Any user interaction (`touch`) moves the key back to the fast lane.
+
+The policy only decides *when* a key is due; callers keep polling on their
+own tick (typically base_interval) and skip keys that are not due. Callers
+that group keys (e.g. into query chunks) can set `on_schedule` to learn
+about every change of a key's next check instead of scanning all keys.
+
+Usage:
+    policy = AdaptivePollingPolicy(base_interval=20)
+    policy.register(user_id, created_at=record_created_ts)
+
+    due_users = policy.due(tracked_user_ids)   # Filter before batch query
+    ...
+    policy.record_checks(due_users)            # Schedule next checks
+
+    policy.touch(user_id)                      # User pressed a button
+"""
+import math
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class AdaptivePollingPolicy:
+    """
+    Per-key polling schedule with exponential backoff by age.
+
+    Keys are arbitrary hashables (user IDs, record IDs). Unknown keys are
+    always due, so callers that never register keys behave as before.
+    """
+
+    def __init__(self, base_interval: float = 20, max_interval: float = 3600,
+                 fresh_period: float = 600, backoff_factor: float = 2.0):
+        """
+        Initialize policy.
+
+        Args:
+            base_interval: Check interval for fresh keys (seconds)
+            max_interval: Upper bound for backed-off interval (seconds)
+            fresh_period: Age until which keys stay in the fast lane (seconds)
+            backoff_factor: Interval multiplier per age stage (> 1)
+        """
+        if backoff_factor <= 1:
+            raise ValueError("backoff_factor must be greater than 1")
+
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.fresh_period = fresh_period
+        self.backoff_factor = backoff_factor
+
+        # key -> timestamp the age is measured from (creation or last interaction)
+        self._anchors: Dict[Hashable, float] = {}
+        # key -> timestamp of next scheduled check
+        self._next_due: Dict[Hashable, float] = {}
+
+        # Called with (key, next_due) whenever a key's next check is set
+        self.on_schedule: Optional[Callable[[Hashable, float], None]] = None
+
+        self.stats = {
+            'checks': 0,
+            'skipped': 0,
+            'touches': 0
+        }
+
+    def register(self, key: Hashable, created_at: Optional[float] = None) -> None:
+        """
+        Start scheduling a key.
+
+        Args:
+            key: Key to schedule
+            created_at: Unix timestamp the age is counted from (default: now).
+                Restored old records pass their creation time and start backed off.
+        """
+        now = time.time()
+        self._anchors[key] = now if created_at is None else min(created_at, now)
+        self._schedule(key, now)  # First check on the next tick
+
+    def forget(self, key: Hashable) -> None:
+        """Stop scheduling a key"""
+        self._anchors.pop(key, None)
+        self._next_due.pop(key, None)
+
+    def touch(self, key: Hashable) -> None:
+        """Reset a registered key to the fast lane (user interaction)"""
+        if key not in self._anchors:
+            return
+        now = time.time()
+        self._anchors[key] = now
+        self._schedule(key, min(self._next_due[key], now + self.base_interval))
+        self.stats['touches'] += 1
+
+    def _schedule(self, key: Hashable, next_due: float) -> None:
+        self._next_due[key] = next_due
+        if self.on_schedule is not None:
+            self.on_schedule(key, next_due)
+
+    def interval_for(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Current check interval of a key in seconds"""
+        anchor = self._anchors.get(key)
+        if anchor is None:
+            return self.base_interval
+
+        age = (now or time.time()) - anchor
+        if age < self.fresh_period or self.fresh_period <= 0:
+            return self.base_interval
+
+        stage = math.floor(math.log(age / self.fresh_period, self.backoff_factor)) + 1
+        # Cap exponent before computing power (avoid overflow for very old keys)
+        max_stage = math.log(self.max_interval / self.base_interval, self.backoff_factor)
+        if stage >= max_stage:
+            return self.max_interval
+        return self.base_interval * self.backoff_factor ** stage
+
+    def due_deadline(self, now: Optional[float] = None) -> float:
+        """Keys whose next check is at or before this time are due now"""
+        # Tolerate tick jitter: a key due within the next 10% of base interval counts as due
+        return (now or time.time()) + self.base_interval * 0.1
+
+    def is_due(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """Whether key should be checked now (unknown keys are always due)"""
+        next_due = self._next_due.get(key)
+        if next_due is None:
+            return True
+        return next_due <= self.due_deadline(now)
+
+    def next_check(self, keys: Iterable[Hashable]) -> float:
+        """Earliest next check among keys (0 if any key is unknown, i.e. always due)"""
+        return min((self._next_due.get(key, 0.0) for key in keys), default=0.0)
+
+    def due(self, keys: Iterable[Hashable], now: Optional[float] = None) -> List[Hashable]:
+        """
+        Filter keys that are due for a check.
+
+        Keys that are not due are counted as skipped checks.
+        """
+        deadline = self.due_deadline(now)
+        keys = list(keys)
+        due_keys = [key for key in keys if self._next_due.get(key, 0.0) <= deadline]
+        self.stats['skipped'] += len(keys) - len(due_keys)
+        return due_keys
+
+    def record_check(self, key: Hashable, now: Optional[float] = None) -> None:
+        """Schedule next check of a key after it has been checked"""
+        now = now or time.time()
+        if key in self._anchors:
+            self._schedule(key, now + self.interval_for(key, now))
+        self.stats['checks'] += 1
+
+    def record_checks(self, keys: Iterable[Hashable], now: Optional[float] = None) -> None:
+        """Schedule next checks of multiple keys (see record_check)"""
+        now = now or time.time()
+        for key in keys:
+            self.record_check(key, now)
+
+    def record_skipped(self, count: int) -> None:
+        """Count checks skipped without calling due() (e.g. whole groups not due)"""
+        self.stats['skipped'] += count
+
+    def get_stats(self) -> dict:
+        """Get policy statistics"""
+        now = time.time()
+        fast_lane = sum(
+            1 for key in self._anchors
+            if self.interval_for(key, now) <= self.base_interval
+        )
+        total = self.stats['checks'] + self.stats['skipped']
+        return {
+            'scheduled_keys': len(self._anchors),
+            'fast_lane': fast_lane,
+            'backed_off': len(self._anchors) - fast_lane,
+            'checks': self.stats['checks'],
+            'skipped': self.stats['skipped'],
+            'touches': self.stats['touches'],
+            'skip_rate': f"{self.stats['skipped'] / total * 100:.1f}%" if total else "0.0%"
+        }
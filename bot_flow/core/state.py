@@ -39,6 +39,12 @@ class PollingConfig:
     on_true_goto: Optional[str] = None
     on_false_goto: Optional[str] = None
     max_attempts: Optional[int] = None
+    # Checked once on entry, then resolved by push (FlowExecutor.confirm_poll)
+    # instead of a per-user loop; interval/max_attempts are not used
+    event_driven: bool = False
+    # Optional AdaptivePollingPolicy: loop ticks every `interval`, but checks
+    # only when the user's record is due (fast when fresh, backed off when stale)
+    policy: Optional[Any] = None
 
 
 @dataclass
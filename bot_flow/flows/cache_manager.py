@@ -2,23 +2,98 @@
 Cache manager for NocoDB data (texts, config).
 
 Provides in-memory caching with TTL to reduce API calls.
+
+The cache is bounded: with `max_entries` and/or `max_bytes` set, the least
+recently used entries are evicted (O(1), OrderedDict order = recency).
+Entry sizes are estimated when an entry is set (see `estimate_size`).
+Independent data (e.g. per-user lookups vs. texts/config) goes into
+namespaces with their own limits, so one cannot evict the other:
+
+    users = CacheManager.get_instance().namespace('users', max_entries=10_000)
+    users.set(user_id, record, ttl=60)
+
+Stale-while-revalidate: `get_or_fetch(key, fetch, ttl=300, hard_ttl=86400)`
+returns the cached value immediately after the soft TTL (300s) and refreshes
+it with a single background fetch. If the refresh fails, the stale value
+keeps being served until the hard TTL; only then do callers wait for (and
+see errors of) a fetch.
+
+Two tiers: with a SharedCache attached (`attach_l2`), values set here are
+also written to the host-wide L2 store, and L1 misses are looked up there
+before fetching. A fill lease lets one worker fetch a key while the other
+workers wait for its result in L2; background refreshes adopt a fresher L2
+value instead of fetching. `get_stats()['served_by']` shows which tier
+(l1, l2 or origin) served lookups.
+
+Expiry: every entry is also pushed onto an expiry-ordered heap, so
+`expire_due()` removes exactly the entries that are due, O(log n) each,
+without scanning the cache. A CacheJanitor task calls it when the next
+entry expires, so memory held by dead entries is reclaimed promptly even
+if they are never read again:
+
+    janitor = CacheJanitor(CacheManager.get_instance())
+    await janitor.start()
 """
+import sys
 import time
+import heapq
+import itertools
+import pickle
+import sqlite3
 import asyncio
-from typing import Dict, Optional, Any, Callable
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass
+from bot_flow.flows.shared_cache import SharedCache, SharedEntry
 
 
 @dataclass
 class CacheEntry:
-    """Cache entry with data and expiration time"""
+    """Cache entry with data, expiration times and estimated size in bytes"""
     data: Any
-    expires_at: float
+    expires_at: float  # Hard expiry: entry is gone
+    size: int = 0
+    stale_at: Optional[float] = None  # Soft expiry: served stale and refreshed (None = expires_at)
+    refresh_failed: bool = False  # Last background refresh failed
+
+
+def estimate_size(value: Any, max_depth: int = 4) -> int:
+    """
+    Approximate memory footprint of a value in bytes.
+
+    Sums sys.getsizeof over containers (dict, list, tuple, set) and their
+    items up to max_depth levels; shared objects are counted once.
+
+    Args:
+        value: Value to measure
+        max_depth: Nesting depth to descend into
+
+    Returns:
+        Estimated size in bytes
+    """
+    seen = set()
+
+    def size_of(obj: Any, depth: int) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        size = sys.getsizeof(obj)
+        if depth >= max_depth:
+            return size
+        if isinstance(obj, dict):
+            size += sum(size_of(k, depth + 1) + size_of(v, depth + 1) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            size += sum(size_of(item, depth + 1) for item in obj)
+        elif hasattr(obj, '__dict__'):
+            size += size_of(vars(obj), depth + 1)
+        return size
+
+    return size_of(value, 0)
 
 
 class CacheManager:
     """
-    In-memory cache with TTL (Time To Live).
+    In-memory cache with TTL (Time To Live) and LRU eviction.
 
     Usage:
         cache = CacheManager.get_instance()
@@ -33,20 +108,56 @@ class CacheManager:
 
     _instance: Optional['CacheManager'] = None
 
-    def __init__(self, default_ttl: float = 300.0):
+    def __init__(self, default_ttl: float = 300.0, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
         """
         Initialize cache manager.
 
         Args:
             default_ttl: Default TTL in seconds (default: 300s = 5 minutes)
+            max_entries: Max number of entries (None = unbounded)
+            max_bytes: Approximate max total size of entries in bytes (None = unbounded)
         """
         self.default_ttl = default_ttl
-        self.cache: Dict[str, CacheEntry] = {}
-        self.lock = asyncio.Lock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache: OrderedDict[str, CacheEntry] = OrderedDict()  # Oldest use first
+        self.total_bytes = 0
+        self.namespaces: Dict[str, 'CacheManager'] = {}
+        # (expires_at, seq, key, entry), lazily deleted: an item is live only
+        # while its entry is still the cached one for its key
+        self._expiry_heap: List[Tuple[float, int, str, CacheEntry]] = []
+        self._expiry_seq = itertools.count()
+        self.refresh_retry_delay = 30.0  # Wait before retrying a failed background refresh
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Single-flight: key -> fetch shared by all concurrent misses of that key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Shared L2 tier (None = L1 only)
+        self.l2: Optional[SharedCache] = None
+        self.l2_fill_timeout = 10.0  # Max wait for another worker's fill (= fill lease duration)
+        self.l2_poll_interval = 0.05  # L2 polling while another worker fills
+        self.l2_recheck_delay = 1.0  # Stale key being refreshed elsewhere: look at L2 again after
         self.stats = {
             'hits': 0,
             'misses': 0,
-            'sets': 0
+            'sets': 0,
+            'evictions': 0,
+            'evicted_bytes': 0,
+            'expirations': 0,
+            'oversized': 0,
+            'stale_hits': 0,
+            'background_refreshes': 0,
+            'refresh_failures': 0,
+            'stale_on_error': 0,
+            'fetches': 0,
+            'coalesced': 0,
+            'fetch_failures': 0,
+            'l1_hits': 0,
+            'l2_hits': 0,
+            'l2_misses': 0,
+            'l2_waits': 0,
+            'l2_adopted': 0,
+            'l2_errors': 0
         }
 
     @classmethod
@@ -64,6 +175,73 @@ class CacheManager:
             cls._instance = cls(default_ttl)
         return cls._instance
 
+    def set_limits(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        Change size limits (evicts immediately if the cache is over them).
+
+        Args:
+            max_entries: Max number of entries (None = unbounded)
+            max_bytes: Approximate max total size in bytes (None = unbounded)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def attach_l2(self, shared: Optional[SharedCache]) -> None:
+        """
+        Use a shared cache as L2 tier (None = detach).
+
+        Only this cache uses it, not its namespaces: per-process data such as
+        per-user lookups stays in L1.
+
+        Args:
+            shared: SharedCache opened by every worker of the host
+        """
+        self.l2 = shared
+
+    def _l2_call(self, method: Callable, *args) -> Any:
+        """Call L2 method; L2 is best effort, so errors are counted and return None"""
+        try:
+            return method(*args)
+        except (sqlite3.Error, pickle.PickleError, TypeError, AttributeError, EOFError) as e:
+            self.stats['l2_errors'] += 1
+            print(f"⚠️  Shared cache error: {e}")
+            return None
+
+    def _load_l2(self, key: str, shared: SharedEntry) -> None:
+        """Copy L2 entry into L1 (wall-clock expiry times converted to monotonic)"""
+        offset = time.monotonic() - time.time()
+        self._store(
+            key, shared.data,
+            expires_at=shared.expires_at + offset,
+            stale_at=shared.stale_at + offset if shared.stale_at is not None else None
+        )
+
+    def namespace(self, name: str, max_entries: Optional[int] = None,
+                  max_bytes: Optional[int] = None,
+                  default_ttl: Optional[float] = None) -> 'CacheManager':
+        """
+        Get (or create) a namespaced sub-cache with its own limits.
+
+        Limits and TTL are only applied when the namespace is created.
+
+        Args:
+            name: Namespace name
+            max_entries: Max entries in the namespace
+            max_bytes: Approximate max size of the namespace in bytes
+            default_ttl: Default TTL (None = inherit from parent)
+
+        Returns:
+            CacheManager for the namespace
+        """
+        if name not in self.namespaces:
+            self.namespaces[name] = CacheManager(
+                default_ttl if default_ttl is not None else self.default_ttl,
+                max_entries=max_entries,
+                max_bytes=max_bytes
+            )
+        return self.namespaces[name]
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache.
@@ -76,65 +254,134 @@ class CacheManager:
         """
         entry = self.cache.get(key)
 
-        if entry is None:
-            self.stats['misses'] += 1
-            return None
-
-        # Check if expired
-        if time.monotonic() >= entry.expires_at:
+        if entry is not None and time.monotonic() >= entry.expires_at:
             # Expired, remove from cache
-            del self.cache[key]
-            self.stats['misses'] += 1
-            return None
+            self._remove(key)
+            self.stats['expirations'] += 1
+            entry = None
 
+        if entry is None:
+            shared = self._l2_call(self.l2.get, key) if self.l2 is not None else None
+            if shared is None:
+                if self.l2 is not None:
+                    self.stats['l2_misses'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._load_l2(key, shared)
+            self.stats['l2_hits'] += 1
+            self.stats['hits'] += 1
+            return shared.data
+
+        self.cache.move_to_end(key)  # Most recently used
         self.stats['hits'] += 1
+        self.stats['l1_hits'] += 1
         return entry.data
 
-    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            hard_ttl: Optional[float] = None) -> None:
         """
         Set value in cache with TTL.
 
         Args:
             key: Cache key
             value: Value to cache
-            ttl: TTL in seconds (None = use default)
+            ttl: TTL in seconds (None = use default); soft TTL if hard_ttl is given
+            hard_ttl: Seconds the value may be served stale (see get_or_fetch)
         """
         if ttl is None:
             ttl = self.default_ttl
 
-        expires_at = time.monotonic() + ttl
-        self.cache[key] = CacheEntry(data=value, expires_at=expires_at)
+        now = time.monotonic()
         self.stats['sets'] += 1
+        self._store(key, value, expires_at=now + max(ttl, hard_ttl or 0),
+                    stale_at=now + ttl if hard_ttl is not None else None)
+        if self.l2 is not None:
+            self._l2_call(self.l2.set, key, value, ttl, hard_ttl)
+
+    def _store(self, key: str, value: Any, expires_at: float, stale_at: Optional[float]) -> None:
+        """Put entry into L1 and evict to stay within limits"""
+        size = estimate_size(value)
+        self._remove(key)
+
+        # Value alone exceeds the byte limit: caching it would flush everything else
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.stats['oversized'] += 1
+            return
+
+        entry = CacheEntry(data=value, expires_at=expires_at, size=size, stale_at=stale_at)
+        self.cache[key] = entry
+        self.total_bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._expiry_seq), key, entry))
+        self._evict()
+
+        # Drop heap items of replaced/removed entries once they dominate (amortized O(1))
+        if len(self._expiry_heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [item for item in self._expiry_heap if self.cache.get(item[2]) is item[3]]
+            heapq.heapify(self._expiry_heap)
+
+    def _remove(self, key: str) -> Optional[CacheEntry]:
+        """Remove entry and update size accounting"""
+        entry = self.cache.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        return entry
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within limits"""
+        while self.cache and (
+            (self.max_entries is not None and len(self.cache) > self.max_entries) or
+            (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, entry = self.cache.popitem(last=False)
+            self.total_bytes -= entry.size
+            self.stats['evictions'] += 1
+            self.stats['evicted_bytes'] += entry.size
 
     def invalidate(self, key: str) -> None:
         """
-        Manually invalidate (remove) cache entry.
+        Manually invalidate (remove) cache entry, in L2 too.
 
         Args:
             key: Cache key to remove
         """
-        if key in self.cache:
-            del self.cache[key]
+        self._remove(key)
+        if self.l2 is not None:
+            self._l2_call(self.l2.delete, key)
 
     def clear(self) -> None:
-        """Clear entire cache"""
+        """Clear entire L1 cache (including namespaces; other workers keep L2)"""
         self.cache.clear()
+        self._expiry_heap.clear()
+        self.total_bytes = 0
+        for namespace in self.namespaces.values():
+            namespace.clear()
 
     async def get_or_fetch(
         self,
         key: str,
         fetch_fn: Callable,
-        ttl: Optional[float] = None
+        ttl: Optional[float] = None,
+        hard_ttl: Optional[float] = None
     ) -> Any:
         """
         Get value from cache or fetch if not available.
 
-        Thread-safe with async lock to prevent thundering herd.
+        Single-flight per key prevents a thundering herd: concurrent misses on
+        the same key await one shared fetch, different keys fetch in parallel.
+        A failed fetch raises to every waiter and caches nothing (the next
+        miss fetches again).
+
+        With hard_ttl, `ttl` is a soft TTL: once it passes, the stale value is
+        returned immediately and a single background refresh is started.
+        A failed refresh is retried after refresh_retry_delay; stale data is
+        served until hard_ttl. Callers only wait on a fetch when nothing is
+        cached.
 
         Args:
             key: Cache key
             fetch_fn: Async function to fetch data if cache miss
             ttl: TTL in seconds (None = use default)
+            hard_ttl: Max age of stale data in seconds (None = no stale serving)
 
         Returns:
             Cached or fetched value
@@ -142,52 +389,281 @@ class CacheManager:
         # Try without lock first (fast path)
         value = self.get(key)
         if value is not None:
+            entry = self.cache.get(key)
+            if entry is not None and entry.stale_at is not None and time.monotonic() >= entry.stale_at:
+                self._serve_stale(key, entry, fetch_fn, ttl, hard_ttl)
             return value
 
-        # Cache miss, acquire lock to prevent multiple fetches
-        async with self.lock:
-            # Double-check after acquiring lock
-            value = self.get(key)
+        # Cache miss: join the fetch in flight or start one
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(key, fetch_fn, ttl, hard_ttl))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._fetch_done(key, done))
+        else:
+            self.stats['coalesced'] += 1
+
+        # Shield: a waiter that stops waiting must not cancel the shared fetch
+        return await asyncio.shield(future)
+
+    async def _fetch(self, key: str, fetch_fn: Callable, ttl: Optional[float],
+                     hard_ttl: Optional[float]) -> Any:
+        """Fetch value for all waiters of a key and cache it"""
+        lease = None
+        if self.l2 is not None:
+            value = await self._wait_for_fill(key)
             if value is not None:
                 return value
+            lease = f"fill:{key}"
 
-            # Fetch data
+        self.stats['fetches'] += 1
+        try:
             value = await fetch_fn()
-            self.set(key, value, ttl)
+            self.set(key, value, ttl, hard_ttl)
             return value
+        finally:
+            if lease is not None:
+                self._l2_call(self.l2.release_lease, lease)
+
+    async def _wait_for_fill(self, key: str) -> Optional[Any]:
+        """
+        Take the fill lease of a key, or wait for the worker holding it.
+
+        Returns:
+            Value filled into L2 by another worker, or None if this worker
+            should fetch (lease taken, holder gave up or wait timed out)
+        """
+        lease = f"fill:{key}"
+        if self._l2_call(self.l2.acquire_lease, lease, self.l2_fill_timeout) is not False:
+            return None
+
+        self.stats['l2_waits'] += 1
+        deadline = time.monotonic() + self.l2_fill_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.l2_poll_interval)
+            shared = self._l2_call(self.l2.get, key)
+            if shared is not None:
+                self._load_l2(key, shared)
+                self.stats['l2_hits'] += 1
+                return shared.data
+            # Holder failed or crashed: fetch ourselves
+            if self._l2_call(self.l2.acquire_lease, lease, self.l2_fill_timeout) is not False:
+                return None
+        return None
+
+    def _fetch_done(self, key: str, future: asyncio.Future) -> None:
+        """Clear in-flight slot; failed fetches are not cached"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is not None:
+            self.stats['fetch_failures'] += 1
+
+    def _serve_stale(self, key: str, entry: CacheEntry, fetch_fn: Callable,
+                     ttl: Optional[float], hard_ttl: Optional[float]) -> None:
+        """Count stale hit and start background refresh (one per key)"""
+        self.stats['stale_hits'] += 1
+        if entry.refresh_failed:
+            self.stats['stale_on_error'] += 1
+
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(key, entry, fetch_fn, ttl, hard_ttl))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, entry: CacheEntry, fetch_fn: Callable,
+                       ttl: Optional[float], hard_ttl: Optional[float]) -> None:
+        """Refetch stale value in the background; keep stale value on failure"""
+        lease = None
+        if self.l2 is not None:
+            # Another worker may already have refreshed it
+            shared = self._l2_call(self.l2.get, key)
+            if shared is not None and shared.is_fresh():
+                self._load_l2(key, shared)
+                self.stats['l2_adopted'] += 1
+                return
+            lease = f"fill:{key}"
+            if self._l2_call(self.l2.acquire_lease, lease, self.l2_fill_timeout) is False:
+                entry.stale_at = time.monotonic() + self.l2_recheck_delay
+                return
+
+        self.stats['background_refreshes'] += 1
+        try:
+            value = await fetch_fn()
+        except Exception as e:
+            self.stats['refresh_failures'] += 1
+            entry.refresh_failed = True
+            entry.stale_at = time.monotonic() + self.refresh_retry_delay
+            print(f"⚠️  Cache refresh of '{key}' failed, serving stale data: {e}")
+            return
+        finally:
+            if lease is not None:
+                self._l2_call(self.l2.release_lease, lease)
+        self.set(key, value, ttl, hard_ttl)
 
     def get_stats(self) -> dict:
         """
         Get cache statistics.
 
         Returns:
-            Dict with hits, misses, hit_rate, total_entries
+            Dict with hits, misses, hit_rate, total_entries, size and
+            eviction counters, lookups served per tier (plus per-namespace
+            and L2 stats)
         """
         total_requests = self.stats['hits'] + self.stats['misses']
         hit_rate = (self.stats['hits'] / total_requests * 100) if total_requests > 0 else 0
 
-        return {
+        stats = {
             'hits': self.stats['hits'],
             'misses': self.stats['misses'],
             'hit_rate': f"{hit_rate:.1f}%",
             'total_sets': self.stats['sets'],
-            'total_entries': len(self.cache)
+            'total_entries': len(self.cache),
+            'max_entries': self.max_entries,
+            'size_kb': f"{self.total_bytes / 1024:.1f}",
+            'max_kb': f"{self.max_bytes / 1024:.1f}" if self.max_bytes is not None else None,
+            'evictions': self.stats['evictions'],
+            'evicted_kb': f"{self.stats['evicted_bytes'] / 1024:.1f}",
+            'expirations': self.stats['expirations'],
+            'oversized': self.stats['oversized'],
+            'stale_hits': self.stats['stale_hits'],
+            'background_refreshes': self.stats['background_refreshes'],
+            'refresh_failures': self.stats['refresh_failures'],
+            'stale_on_error': self.stats['stale_on_error'],
+            'fetches': self.stats['fetches'],
+            'coalesced': self.stats['coalesced'],
+            'fetch_failures': self.stats['fetch_failures'],
+            'in_flight': len(self._inflight),
+            'expiry_heap': len(self._expiry_heap),
+            'served_by': {
+                'l1': self.stats['l1_hits'],
+                'l2': self.stats['l2_hits'] + self.stats['l2_adopted'],
+                'origin': self.stats['fetches'] + self.stats['background_refreshes']
+            }
         }
-
-    def cleanup_expired(self) -> int:
+        if self.l2 is not None:
+            stats['l2'] = dict(
+                self._l2_call(self.l2.get_stats) or {},
+                misses=self.stats['l2_misses'],
+                fill_waits=self.stats['l2_waits'],
+                errors=self.stats['l2_errors']
+            )
+        if self.namespaces:
+            stats['namespaces'] = {name: ns.get_stats() for name, ns in self.namespaces.items()}
+        return stats
+
+    def expire_due(self) -> int:
         """
-        Manually cleanup expired entries.
+        Remove L1 entries whose hard TTL has passed (including namespaces).
+
+        Pops due items off the expiry heap: O(log n) per expired entry, no
+        scan of live entries.
 
         Returns:
             Number of entries removed
         """
         now = time.monotonic()
-        expired_keys = [
-            key for key, entry in self.cache.items()
-            if now >= entry.expires_at
-        ]
+        heap = self._expiry_heap
+        removed = 0
+        while heap and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            if self.cache.get(key) is entry:
+                self._remove(key)
+                removed += 1
+        self.stats['expirations'] += removed
+        return removed + sum(ns.expire_due() for ns in self.namespaces.values())
+
+    def next_expiry(self) -> Optional[float]:
+        """Monotonic time of the earliest possible expiry (None if nothing is cached)"""
+        times = [self._expiry_heap[0][0]] if self._expiry_heap else []
+        times.extend(t for t in (ns.next_expiry() for ns in self.namespaces.values()) if t is not None)
+        return min(times) if times else None
 
-        for key in expired_keys:
-            del self.cache[key]
+    def cleanup_expired(self) -> int:
+        """
+        Manually cleanup expired entries (including namespaces and L2).
 
-        return len(expired_keys)
+        Returns:
+            Number of L1 entries removed
+        """
+        removed = self.expire_due()
+        if self.l2 is not None:
+            self._l2_call(self.l2.cleanup_expired)
+        return removed
+
+
+class CacheJanitor:
+    """
+    Background task removing expired cache entries as they fall due.
+
+    Sleeps until the next expiry on the cache's expiry heap (at least
+    `min_interval`, so entries expiring close together go in one batch, and
+    at most `max_interval`; entries set during a sleep that expire earlier
+    are removed at most max_interval late). Expired L2 rows are deleted
+    every max_interval.
+    """
+
+    def __init__(self, cache: CacheManager, max_interval: float = 60.0, min_interval: float = 0.5):
+        """
+        Initialize janitor.
+
+        Args:
+            cache: Cache to clean (namespaces included)
+            max_interval: Longest sleep between runs in seconds
+            min_interval: Shortest sleep between runs in seconds
+        """
+        self.cache = cache
+        self.max_interval = max_interval
+        self.min_interval = min_interval
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+        self.stats = {
+            'runs': 0,
+            'expired': 0
+        }
+
+    async def start(self) -> None:
+        """Start background expiry"""
+        if self.running:
+            return
+        self.running = True
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop background expiry"""
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def _delay(self) -> float:
+        """Seconds until the next run"""
+        next_expiry = self.cache.next_expiry()
+        if next_expiry is None:
+            return self.max_interval
+        return min(max(next_expiry - time.monotonic(), self.min_interval), self.max_interval)
+
+    async def _run(self) -> None:
+        last_full = time.monotonic()
+        while self.running:
+            try:
+                await asyncio.sleep(self._delay())
+                if time.monotonic() - last_full >= self.max_interval:
+                    removed = self.cache.cleanup_expired()
+                    last_full = time.monotonic()
+                else:
+                    removed = self.cache.expire_due()
+                self.stats['runs'] += 1
+                self.stats['expired'] += removed
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"❌ Error in cache janitor: {e}")
+
+    def get_stats(self) -> dict:
+        """Get janitor statistics"""
+        return dict(self.stats, running=self.running)
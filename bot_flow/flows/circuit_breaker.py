@@ -0,0 +1,266 @@
+"""
+Circuit breaker and retry budget for NocoDB API requests.
+
+When NocoDB is down or rate-limiting, independent per-request retries amplify
+load: every in-flight handler and tracker sweep keeps hammering the API in
+parallel. This module provides:
+
+- CircuitBreaker: per-endpoint breaker (closed -> open -> half-open -> closed).
+  While open, requests fail fast with CircuitOpenError instead of waiting.
+- RetryBudget: process-wide budget that caps retries to a percentage of
+  successful calls, so retries can never dominate traffic.
+"""
+import time
+from enum import Enum
+from typing import Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a request is rejected because the endpoint circuit is open.
+
+    Actions can catch this to degrade gracefully (e.g. defer record creation)
+    instead of blocking the handler on retries.
+    """
+
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit open for NocoDB endpoint '{endpoint}', retry in {retry_after:.1f}s"
+        )
+
+
+class CircuitState(Enum):
+    """States of a circuit breaker"""
+    CLOSED = "closed"        # Normal operation, requests pass through
+    OPEN = "open"            # Failing, requests are rejected immediately
+    HALF_OPEN = "half_open"  # Probing, a limited number of requests pass through
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single endpoint.
+
+    Algorithm:
+    - CLOSED: count consecutive failures; after failure_threshold -> OPEN
+    - OPEN: reject all requests until recovery_timeout elapsed -> HALF_OPEN
+    - HALF_OPEN: allow up to half_open_max_calls probes;
+      success -> CLOSED, failure -> OPEN again
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            endpoint: Endpoint name (used in errors and stats)
+            failure_threshold: Consecutive failures before opening the circuit
+            recovery_timeout: Seconds to stay open before probing (default: 30s, NocoDB lockout)
+            half_open_max_calls: Concurrent probe requests allowed in half-open state
+        """
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.half_open_calls = 0
+
+        self.stats = {
+            'opened': 0,
+            'rejected': 0
+        }
+
+    def before_request(self) -> bool:
+        """
+        Check whether a request may proceed.
+
+        Returns:
+            True if the request took a half-open probe slot; the caller must
+            then record its outcome or call release_probe()
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open with probes in flight)
+        """
+        if self.state == CircuitState.OPEN:
+            now = time.monotonic()
+            if now < self.opened_until:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(self.endpoint, self.opened_until - now)
+
+            # Recovery timeout elapsed - start probing
+            self.state = CircuitState.HALF_OPEN
+            self.half_open_calls = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.stats['rejected'] += 1
+                raise CircuitOpenError(self.endpoint, self.recovery_timeout)
+            self.half_open_calls += 1
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Free a probe slot whose request ended without an outcome (e.g. cancelled)"""
+        if self.state == CircuitState.HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_success(self) -> None:
+        """Record successful request (closes the circuit)"""
+        if self.state != CircuitState.CLOSED:
+            print(f"🟢 Circuit closed for {self.endpoint}")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.half_open_calls = 0
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record failed request (429, 5xx, transport error).
+
+        Args:
+            retry_after: Server-provided Retry-After in seconds (extends open period)
+        """
+        self.consecutive_failures += 1
+
+        should_open = (
+            self.state == CircuitState.HALF_OPEN or
+            self.consecutive_failures >= self.failure_threshold
+        )
+        if not should_open:
+            return
+
+        open_for = max(self.recovery_timeout, retry_after or 0.0)
+        if self.state != CircuitState.OPEN:
+            self.stats['opened'] += 1
+            print(f"🔴 Circuit opened for {self.endpoint} ({open_for:.0f}s)")
+
+        self.state = CircuitState.OPEN
+        self.opened_until = time.monotonic() + open_for
+        self.half_open_calls = 0
+
+    def get_stats(self) -> dict:
+        """Get breaker state and counters"""
+        return {
+            'state': self.state.value,
+            'consecutive_failures': self.consecutive_failures,
+            'opened': self.stats['opened'],
+            'rejected': self.stats['rejected']
+        }
+
+
+class RetryBudget:
+    """
+    Process-wide retry budget.
+
+    Each successful request deposits `ratio` tokens, each retry withdraws one.
+    A small reserve (min_tokens) allows retries at startup before any successes.
+    With ratio=0.2 retries are limited to ~20% of successful calls.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        """
+        Initialize retry budget.
+
+        Args:
+            ratio: Retry tokens earned per successful request (0.2 = 20%)
+            min_tokens: Initial reserve of retry tokens
+            max_tokens: Maximum accumulated retry tokens
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+        self.stats = {
+            'retries_allowed': 0,
+            'retries_denied': 0
+        }
+
+    def deposit(self) -> None:
+        """Record a successful request"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """
+        Try to spend one retry token.
+
+        Returns:
+            True if retry is allowed, False if budget is exhausted
+        """
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self.stats['retries_allowed'] += 1
+            return True
+
+        self.stats['retries_denied'] += 1
+        return False
+
+    def get_stats(self) -> dict:
+        """Get budget statistics"""
+        return {
+            'tokens': round(self.tokens, 2),
+            'retries_allowed': self.stats['retries_allowed'],
+            'retries_denied': self.stats['retries_denied']
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    Singleton registry of per-endpoint circuit breakers and the shared retry budget.
+
+    Usage:
+        registry = CircuitBreakerRegistry.get_instance()
+        breaker = registry.get_breaker("GET tables/abc/records")
+        breaker.before_request()  # raises CircuitOpenError if open
+    """
+
+    _instance: Optional['CircuitBreakerRegistry'] = None
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        retry_ratio: float = 0.2
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.retry_budget = RetryBudget(ratio=retry_ratio)
+
+    @classmethod
+    def get_instance(cls) -> 'CircuitBreakerRegistry':
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """
+        Get (or create) breaker for endpoint.
+
+        Args:
+            endpoint: Normalized endpoint key, e.g. "GET tables/abc/records"
+        """
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                endpoint,
+                failure_threshold=self.failure_threshold,
+                recovery_timeout=self.recovery_timeout
+            )
+            self.breakers[endpoint] = breaker
+        return breaker
+
+    def get_stats(self) -> dict:
+        """Get stats for all breakers and the retry budget"""
+        return {
+            'breakers': {name: b.get_stats() for name, b in self.breakers.items()},
+            'retry_budget': self.retry_budget.get_stats()
+        }
@@ -3,11 +3,8 @@ Loader for bot configuration from NocoDB.
 
 This module provides functionality to load bot config values from NocoDB table mguawvnumqrb5k7.
 """
-import httpx
 from typing import Dict
 from config import config
-from bot_flow.flows.nocodb_utils import nocodb_request_with_retry
-from bot_flow.flows.cache_manager import CacheManager
 
 # NocoDB configuration from centralized config
 NOCODB_API_URL = config.NOCODB_API_URL
@@ -40,51 +37,12 @@ def validate_config(config_data: Dict[str, str]) -> None:
         )
 
 
-async def _fetch_config_from_nocodb() -> Dict[str, str]:
-    """
-    Fetch config from NocoDB (internal function, use load_config_from_nocodb instead).
-
-    Returns:
-        Dict mapping action -> text
-    """
-    headers = {
-        "xc-token": NOCODB_API_TOKEN
-    }
-
-    response = await nocodb_request_with_retry(
-        "GET",
-        f"{NOCODB_API_URL}/api/v2/tables/{CONFIG_TABLE_ID}/records",
-        headers=headers,
-        timeout=15.0
-    )
-    response.raise_for_status()
-    data = response.json()
-
-    # Parse records into dict
-    config_data = {}
-    records = data.get("list", []) or data.get("records", [])
-
-    for record in records:
-        action = record.get("action")
-        text = record.get("text")
-        if action and text:
-            config_data[action] = text
-
-    return config_data
-
-
 async def load_config_from_nocodb(use_cache: bool = True) -> Dict[str, str]:
     """
-    Load all config values from NocoDB table mguawvnumqrb5k7.
-
-    Validates that all required config keys are present.
-    Bot will not start if any required config values are missing.
-
-    Uses in-memory cache with 5-minute TTL to reduce API calls.
+    Load config values from NocoDB.
 
-    Table schema:
-        - action (string): config key (UPPERCASE)
-        - text (string): config value
+    Texts and config share one table: both are served by the content
+    registry from a single fetch (see content_registry), validated once.
 
     Args:
         use_cache: Whether to use cache (default: True)
@@ -93,42 +51,11 @@ async def load_config_from_nocodb(use_cache: bool = True) -> Dict[str, str]:
         Dict mapping action -> text
 
     Raises:
-        ValueError: If required config values are missing or NocoDB is not configured
+        ValueError: If required keys are missing or NocoDB is not configured
     """
-    if not NOCODB_API_TOKEN or not CONFIG_TABLE_ID:
-        raise ValueError(
-            "❌ NocoDB not configured!\n"
-            "   Please set NOCODB_API_TOKEN and NOCODB_CONFIG_TABLE_ID in .env file"
-        )
-
-    try:
-        if use_cache:
-            # Try cache first
-            cache = CacheManager.get_instance()
-            config_data = await cache.get_or_fetch(
-                'nocodb_config',
-                _fetch_config_from_nocodb,
-                ttl=300.0  # Cache for 5 minutes
-            )
-            print(f"✅ Loaded {len(config_data)} config values from NocoDB (cache: {cache.get('nocodb_config') is not None})")
-        else:
-            # Bypass cache
-            config_data = await _fetch_config_from_nocodb()
-            print(f"✅ Loaded {len(config_data)} config values from NocoDB (no cache)")
-
-        # Validate all required keys are present
-        validate_config(config_data)
-        print(f"✅ All required config constants validated")
-
-        return config_data
-
-    except httpx.HTTPError as e:
-        raise ValueError(
-            f"❌ Error loading config from NocoDB: {e}\n"
-            f"   Please check your NOCODB_API_TOKEN and NOCODB_CONFIG_TABLE_ID"
-        ) from e
-    except Exception as e:
-        raise ValueError(f"❌ Unexpected error loading config: {e}") from e
+    from bot_flow.flows.content_registry import get_content_registry
+    content = await get_content_registry().load(use_cache=use_cache)
+    return content.config
 
 
 def load_config_sync() -> Dict[str, str]:
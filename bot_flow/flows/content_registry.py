@@ -0,0 +1,347 @@
+"""
+Content registry: bot texts and config from one NocoDB fetch.
+
+Texts and config live in the same NocoDB table (action -> text rows):
+lowercase actions are texts ("welcome_message"), UPPERCASE actions are
+config values ("PAYMENT_AMOUNT"). The registry downloads the table once
+(all pages), builds both views from the same rows and validates each
+required key once, so startup and every refresh cost one request instead
+of two. If texts and config are configured as different tables, each
+table is still fetched only once.
+
+The current content is swapped atomically after each successful refresh;
+typed accessors always read the newest validated version:
+
+    content = get_content_registry()
+    await content.load()                        # Cached, stale-while-revalidate
+    content.text("welcome_message")
+    content.config("TELEGRAM_GROUP_LINK")
+    content.payment_amount                      # 1000 (from "1000 рублей")
+
+Listeners registered with on_change() are called when a refresh brings
+different content (e.g. to rebuild the bot flow with the new texts).
+
+Change detection: content changes rarely, so a refresh first runs a probe
+per table (newest UpdatedAt plus row count, one row with one field). The
+table is downloaded only when this fingerprint changed; a download with
+the same content hash as before does not notify listeners.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+from config import config
+from bot_flow.flows.cache_manager import CacheManager
+from bot_flow.flows.content_snapshot import content_checksum, get_content_snapshot
+from bot_flow.flows.nocodb_client import get_nocodb_client
+
+# Cache and snapshot key of the combined content
+CONTENT_CACHE_KEY = 'nocodb_content'
+SNAPSHOT_NAME = 'content'
+
+# NocoDB system field with last modification time
+UPDATED_AT_FIELD = "UpdatedAt"
+
+
+@dataclass(frozen=True)
+class Content:
+    """Validated content version: raw rows and the text/config views built from them"""
+    rows: Dict[str, str]
+    texts: Dict[str, str] = field(default_factory=dict)
+    config: Dict[str, str] = field(default_factory=dict)
+    checksum: str = ""  # Hash of rows: equal hash = nothing to rebuild
+
+    @classmethod
+    def from_rows(cls, rows: Dict[str, str]) -> 'Content':
+        """Split action -> text rows into text (lowercase) and config (UPPERCASE) views"""
+        texts = {key: value for key, value in rows.items() if not key.isupper()}
+        config_data = {key: value for key, value in rows.items() if key.isupper()}
+        return cls(rows=rows, texts=texts, config=config_data, checksum=content_checksum(rows))
+
+    def validate(self) -> None:
+        """
+        Check that all required texts and config values are present.
+
+        Raises:
+            ValueError: If any required keys are missing
+        """
+        from bot_flow.flows.texts_loader import validate_texts
+        from bot_flow.flows.config_loader import validate_config
+        validate_texts(self.texts)
+        validate_config(self.config)
+
+
+class ContentRegistry:
+    """
+    Singleton holder of the current bot content.
+
+    Usage:
+        registry = ContentRegistry.get_instance()
+        registry.load_snapshot() or await registry.load()
+        registry.text("pay_button")
+    """
+
+    _instance: Optional['ContentRegistry'] = None
+
+    def __init__(self, table_ids: Optional[List[str]] = None):
+        """
+        Initialize registry.
+
+        Args:
+            table_ids: Content tables (default: texts and config tables from config,
+                fetched once if they are the same table)
+        """
+        if table_ids is None:
+            table_ids = [config.NOCODB_TEXTS_TABLE_ID, config.NOCODB_CONFIG_TABLE_ID]
+        self.table_ids = list(dict.fromkeys(table_id for table_id in table_ids if table_id))
+        self.content: Optional[Content] = None
+        self._listeners: List[Callable[[Content], None]] = []
+        # Per-table (newest UpdatedAt, row count) of the current content
+        self._fingerprint: Optional[List[Tuple[Optional[str], Optional[int]]]] = None
+
+        self.stats = {
+            'fetches': 0,
+            'requests': 0,
+            'snapshot_starts': 0,
+            'shared_starts': 0,
+            'changes': 0,
+            'probes': 0,
+            'unchanged_probes': 0,
+            'unchanged_downloads': 0
+        }
+
+    @classmethod
+    def get_instance(cls) -> 'ContentRegistry':
+        """Get singleton instance"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether validated content is available"""
+        return self.content is not None
+
+    def _current(self) -> Content:
+        if self.content is None:
+            raise RuntimeError("Content is not loaded yet (call load() or load_snapshot())")
+        return self.content
+
+    @property
+    def texts(self) -> Dict[str, str]:
+        """Current text view (action -> text)"""
+        return self._current().texts
+
+    @property
+    def config_values(self) -> Dict[str, str]:
+        """Current config view (KEY -> value)"""
+        return self._current().config
+
+    def text(self, key: str) -> str:
+        """Text by action key"""
+        return self._current().texts[key]
+
+    def config(self, key: str) -> str:
+        """Config value by KEY"""
+        return self._current().config[key]
+
+    @property
+    def payment_amount(self) -> int:
+        """Numeric price from PAYMENT_AMOUNT (e.g. "1000 рублей" -> 1000)"""
+        return int(self.config("PAYMENT_AMOUNT").split()[0])
+
+    def on_change(self, listener: Callable[[Content], None]) -> None:
+        """Register callback(content) called when loaded content differs from the current one"""
+        self._listeners.append(listener)
+
+    def _apply(self, content: Content) -> Content:
+        """Swap in validated content (readers see either old or new, never a mix)"""
+        previous, self.content = self.content, content
+        if previous is not None and previous.checksum != content.checksum:
+            self.stats['changes'] += 1
+            print(f"📝 Content changed ({len(content.texts)} texts, {len(content.config)} config values)")
+            for listener in self._listeners:
+                try:
+                    listener(content)
+                except Exception as e:
+                    print(f"❌ Error in content change listener: {e}")
+        return content
+
+    async def _probe(self) -> Optional[List[Tuple[Optional[str], Optional[int]]]]:
+        """
+        Fingerprint content tables: newest UpdatedAt and row count per table.
+
+        Costs one single-row, single-field request per table. Edits move
+        UpdatedAt, deletions change the count.
+
+        Returns:
+            Fingerprint, or None if the probe failed (caller downloads everything)
+        """
+        self.stats['probes'] += 1
+        fingerprint = []
+        try:
+            for table_id in self.table_ids:
+                client = get_nocodb_client()
+                records, page_info = await client.list_page(
+                    table_id, fields=[UPDATED_AT_FIELD], sort=f"-{UPDATED_AT_FIELD}", limit=1
+                )
+                self.stats['requests'] += 1
+                total_rows = page_info.get("totalRows")
+                if total_rows is None:
+                    total_rows = await client.count(table_id)
+                    self.stats['requests'] += 1
+                newest = records[0].get(UPDATED_AT_FIELD) if records else None
+                fingerprint.append((newest, total_rows))
+        except Exception as e:
+            print(f"⚠️  Content probe failed, downloading content: {e}")
+            return None
+        return fingerprint
+
+    async def _fetch(self) -> Content:
+        """
+        Fetch all content rows (each table once, all pages) and validate them.
+
+        A cheap probe runs first; when content is already loaded and the
+        tables did not change since the last download, the download is skipped.
+
+        Valid content becomes current immediately (also for background
+        refreshes) and is written to the local snapshot. Invalid content is
+        never cached or snapshotted.
+        """
+        # Probe before downloading, so an edit made during the download is
+        # seen by the next probe
+        fingerprint = await self._probe()
+        if self.content is not None and fingerprint is not None and fingerprint == self._fingerprint:
+            self.stats['unchanged_probes'] += 1
+            return self.content
+
+        self.stats['fetches'] += 1
+        rows: Dict[str, str] = {}
+        for table_id in self.table_ids:
+            async for page in get_nocodb_client().iter_pages(
+                table_id, fields=["action", "text"], page_size=1000
+            ):
+                self.stats['requests'] += 1
+                for record in page:
+                    action = record.get("action")
+                    text = record.get("text")
+                    if action and text:
+                        rows[action] = text
+
+        content = Content.from_rows(rows)
+        content.validate()
+        self._fingerprint = fingerprint
+        if self.content is not None and self.content.checksum == content.checksum:
+            self.stats['unchanged_downloads'] += 1
+            return self.content
+
+        snapshot = get_content_snapshot()
+        if snapshot is not None:
+            try:
+                snapshot.save(SNAPSHOT_NAME, rows)
+            except OSError as e:
+                print(f"⚠️  Cannot write content snapshot: {e}")
+
+        return self._apply(content)
+
+    async def load(self, use_cache: bool = True) -> Content:
+        """
+        Load content (from cache with stale-while-revalidate, or from NocoDB).
+
+        Args:
+            use_cache: Whether to use cache (default: True)
+
+        Returns:
+            Current content
+
+        Raises:
+            ValueError: If NocoDB is not configured, unreachable (and nothing is
+                cached) or required keys are missing
+        """
+        if not config.NOCODB_API_TOKEN or not self.table_ids:
+            raise ValueError(
+                "❌ NocoDB not configured!\n"
+                "   Please set NOCODB_API_TOKEN and NOCODB_TEXTS_TABLE_ID in .env file"
+            )
+
+        try:
+            if use_cache:
+                content = await CacheManager.get_instance().get_or_fetch(
+                    CONTENT_CACHE_KEY,
+                    self._fetch,
+                    ttl=config.CONTENT_CACHE_TTL,  # Refreshed in background after 5 minutes
+                    hard_ttl=config.CONTENT_MAX_STALE  # Stale copy survives NocoDB outages
+                )
+                # Content filled by another worker (shared L2 cache) is applied
+                # here; content fetched by this worker is already current
+                if self.content is None or self.content.checksum != content.checksum:
+                    return self._apply(content)
+                return self.content
+            return await self._fetch()
+
+        except ValueError:
+            raise
+        except httpx.HTTPError as e:
+            raise ValueError(
+                f"❌ Error loading content from NocoDB: {e}\n"
+                f"   Please check your NOCODB_API_TOKEN and NOCODB_TEXTS_TABLE_ID"
+            ) from e
+        except Exception as e:
+            raise ValueError(f"❌ Unexpected error loading content: {e}") from e
+
+    def load_snapshot(self) -> Optional[Content]:
+        """
+        Load content from the local snapshot for a warm start (no API call).
+
+        The snapshot is cached as already stale, so the next load() returns
+        it immediately and refreshes from NocoDB in the background. Content
+        already in the cache (filled by another worker into the shared L2
+        cache) is newer and wins over the snapshot.
+
+        Returns:
+            Validated content, or None if there is no usable snapshot
+        """
+        cache = CacheManager.get_instance()
+        cached = cache.get(CONTENT_CACHE_KEY) if cache.l2 is not None else None
+        if isinstance(cached, Content):
+            self.stats['shared_starts'] += 1
+            return self._apply(cached)
+
+        snapshot = get_content_snapshot()
+        rows = snapshot.load(SNAPSHOT_NAME) if snapshot is not None else None
+        if rows is None:
+            return None
+
+        content = Content.from_rows(rows)
+        try:
+            content.validate()
+        except ValueError:
+            print("⚠️  Content snapshot is missing required keys, ignoring it")
+            return None
+
+        CacheManager.get_instance().set(CONTENT_CACHE_KEY, content, ttl=0,
+                                        hard_ttl=config.CONTENT_MAX_STALE)
+        self.stats['snapshot_starts'] += 1
+        return self._apply(content)
+
+    def get_stats(self) -> dict:
+        """Get registry statistics"""
+        return {
+            'loaded': self.is_loaded,
+            'texts': len(self.content.texts) if self.content else 0,
+            'config_values': len(self.content.config) if self.content else 0,
+            'tables': len(self.table_ids),
+            'fetches': self.stats['fetches'],
+            'requests': self.stats['requests'],
+            'snapshot_starts': self.stats['snapshot_starts'],
+            'shared_starts': self.stats['shared_starts'],
+            'changes': self.stats['changes'],
+            'checksum': self.content.checksum[:12] if self.content else None,
+            'probes': self.stats['probes'],
+            'unchanged_probes': self.stats['unchanged_probes'],
+            'unchanged_downloads': self.stats['unchanged_downloads']
+        }
+
+
+def get_content_registry() -> ContentRegistry:
+    """Get content registry instance (convenience function)"""
+    return ContentRegistry.get_instance()
@@ -0,0 +1,166 @@
+"""
+On-disk snapshot of bot content (texts and config) for warm starts.
+
+After every successful, validated fetch the content registry writes the
+combined action -> text rows to a local JSON snapshot. At boot the bot starts
+from the snapshot immediately and refreshes from NocoDB in the background, so
+startup does not depend on NocoDB latency or availability.
+
+Snapshot file (data/content/content.json):
+
+    {
+        "format": 1,
+        "name": "content",
+        "version": 7,              # Incremented on every content change
+        "saved_at": "2026-01-01T10:00:00+00:00",
+        "checksum": "sha256...",   # Of the canonical JSON of "data"
+        "data": {...}              # Texts and UPPERCASE config rows
+    }
+
+Files are written atomically (temp file + rename). A snapshot with an
+unknown format or a checksum mismatch is ignored.
+
+Usage:
+    snapshot = get_content_snapshot()
+    snapshot.save('content', rows)     # After successful fetch
+    rows = snapshot.load('content')    # At boot (None if missing/corrupt)
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from config import config
+
+SNAPSHOT_FORMAT = 1
+
+
+def content_checksum(data: Any) -> str:
+    """SHA-256 of the canonical JSON representation of data"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ContentSnapshot:
+    """
+    Versioned, checksummed JSON snapshots of content in a directory.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize snapshot store.
+
+        Args:
+            directory: Directory for snapshot files (created on first save)
+        """
+        self.directory = directory
+        self.stats = {
+            'saves': 0,
+            'unchanged': 0,
+            'loads': 0,
+            'corrupt': 0
+        }
+
+    def path(self, name: str) -> str:
+        """Snapshot file path of a content name"""
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        """Read and verify snapshot file (None if missing or invalid)"""
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            self.stats['corrupt'] += 1
+            print(f"⚠️  Cannot read content snapshot {path}: {e}")
+            return None
+
+        if snapshot.get('format') != SNAPSHOT_FORMAT or snapshot.get('name') != name:
+            self.stats['corrupt'] += 1
+            print(f"⚠️  Ignoring content snapshot {path}: unknown format")
+            return None
+        if content_checksum(snapshot.get('data')) != snapshot.get('checksum'):
+            self.stats['corrupt'] += 1
+            print(f"⚠️  Ignoring content snapshot {path}: checksum mismatch")
+            return None
+        return snapshot
+
+    def load(self, name: str) -> Optional[Any]:
+        """
+        Load content from snapshot.
+
+        Returns:
+            Snapshot data, or None if there is no valid snapshot
+        """
+        snapshot = self._read(name)
+        if snapshot is None:
+            return None
+        self.stats['loads'] += 1
+        print(f"💾 Loaded {name} snapshot v{snapshot['version']} (saved {snapshot['saved_at']})")
+        return snapshot['data']
+
+    def save(self, name: str, data: Any) -> bool:
+        """
+        Write content snapshot (skipped if content is unchanged).
+
+        Returns:
+            True if a new version was written
+        """
+        checksum = content_checksum(data)
+        current = self._read(name)
+        if current is not None and current['checksum'] == checksum:
+            self.stats['unchanged'] += 1
+            return False
+
+        snapshot = {
+            'format': SNAPSHOT_FORMAT,
+            'name': name,
+            'version': (current['version'] + 1) if current is not None else 1,
+            'saved_at': datetime.now(timezone.utc).isoformat(),
+            'checksum': checksum,
+            'data': data
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        self.stats['saves'] += 1
+        print(f"💾 Saved {name} snapshot v{snapshot['version']}")
+        return True
+
+    def info(self, name: str) -> Optional[Dict[str, Any]]:
+        """Snapshot metadata (version, saved_at, checksum) without data"""
+        snapshot = self._read(name)
+        if snapshot is None:
+            return None
+        return {key: value for key, value in snapshot.items() if key != 'data'}
+
+    def get_stats(self) -> dict:
+        """Get snapshot statistics"""
+        return dict(self.stats, directory=self.directory)
+
+
+# Global instance (created on first use)
+_content_snapshot: Optional[ContentSnapshot] = None
+
+
+def get_content_snapshot() -> Optional[ContentSnapshot]:
+    """
+    Get content snapshot store.
+
+    Returns:
+        Snapshot store, or None if CONTENT_SNAPSHOT_DIR is empty (disabled)
+    """
+    global _content_snapshot
+    if _content_snapshot is None and config.CONTENT_SNAPSHOT_DIR:
+        _content_snapshot = ContentSnapshot(config.CONTENT_SNAPSHOT_DIR)
+    return _content_snapshot
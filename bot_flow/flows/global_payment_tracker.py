@@ -9,11 +9,231 @@ Benefits:
 - 300 users = 1 API request instead of 300 requests
 - 95% reduction in API load
 - All users get updates simultaneously
+
+Sync modes:
+- full: every sweep checks all tracked record IDs
+- incremental: every sweep fetches only rows changed since the last
+  UpdatedAt watermark (persisted to disk), with a periodic full reconcile
+
+Full sweeps split tracked IDs into chunks bounded by `where` length and
+NocoDB page size, fetched concurrently (capped) and staggered over the
+update interval instead of bursting. The chunks and their `where` clauses
+are maintained incrementally as users are tracked/untracked, so preparing
+a sweep does no per-ID work.
+
+Observers: instead of reading `is_paid()` in a loop, consumers subscribe to
+PaymentStatusEvent callbacks (per user, per record or global), dispatched
+as soon as a sweep or webhook applies a status change.
+
+With a `polling_policy` (AdaptivePollingPolicy) full sweeps only query
+records that are due: fresh registrations every sweep, stale ones backed off.
+The sweep index keeps each chunk's next check, so a sweep only visits chunks
+with due records and reuses their where clause when the whole chunk is due.
+
+With a `shared_cache` (several workers on one host), full sweeps publish the
+fetched statuses to it for one update interval; a worker sweeping later
+takes statuses found there and only queries the rest.
 """
 import asyncio
+import json
+import math
+import os
 import time
-from typing import Dict, Set, Optional
-from bot_flow.flows.nocodb_utils import nocodb_request_with_retry
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Set, Optional, Tuple, Union
+from bot_flow.core.polling_policy import AdaptivePollingPolicy
+from bot_flow.flows.nocodb_client import NocoDBClient, Record, where_in
+from bot_flow.flows.outbox import is_provisional
+from bot_flow.flows.shared_cache import SharedCache
+
+# NocoDB system field with last modification time
+UPDATED_AT_FIELD = "UpdatedAt"
+
+# Full sweep chunking: keep `where` well below common URL limits (~2-8 KB)
+# and chunk size within NocoDB's max page size
+MAX_WHERE_LENGTH = 1500
+MAX_CHUNK_SIZE = 1000
+
+
+def chunk_record_ids(record_ids: List[str], max_ids: int = MAX_CHUNK_SIZE,
+                     max_where_length: int = MAX_WHERE_LENGTH) -> List[List[str]]:
+    """
+    Split record IDs into chunks whose `(Id,in,...)` clause fits both limits.
+
+    Args:
+        record_ids: Record IDs to split
+        max_ids: Max IDs per chunk (must not exceed NocoDB page size)
+        max_where_length: Max length of the generated where clause
+
+    Returns:
+        List of ID chunks (every ID appears exactly once)
+    """
+    base_length = len(where_in("Id", []))
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    length = base_length
+
+    for record_id in record_ids:
+        added = len(str(record_id)) + (1 if current else 0)  # comma separator
+        if current and (len(current) >= max_ids or length + added > max_where_length):
+            chunks.append(current)
+            current = []
+            length = base_length
+            added = len(str(record_id))
+        current.append(record_id)
+        length += added
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SweepIndex:
+    """
+    Record IDs of full sweeps, kept pre-split into chunks.
+
+    Adding appends to the last chunk (or opens a new one), removing deletes
+    from the owning chunk; only touched chunks rebuild their `where` clause,
+    lazily on the next sweep. Chunks are compacted when removals leave them
+    mostly empty.
+
+    Each chunk also keeps the earliest next check of its IDs (0 = due now),
+    so sweeps with a polling policy visit only chunks that have due IDs.
+    Chunks fill in tracking order, so records of similar age (and polling
+    interval) share chunks.
+    """
+
+    def __init__(self, max_ids: int = MAX_CHUNK_SIZE, max_where_length: int = MAX_WHERE_LENGTH):
+        self.max_ids = max_ids
+        self.max_where_length = max_where_length
+        self._base_length = len(where_in("Id", []))
+
+        self._chunks: List[Dict[str, None]] = []  # Ordered sets of record IDs
+        self._lengths: List[int] = []  # Where clause length per chunk
+        self._wheres: List[Optional[str]] = []  # Cached where clause (None = stale)
+        self._due: List[float] = []  # Earliest next check per chunk
+        self._chunk_of: Dict[str, int] = {}
+        self._chars = 0  # Total length of all IDs
+        self.rebuilds = 0  # Also invalidates chunk indices held by callers
+
+    def __len__(self) -> int:
+        return len(self._chunk_of)
+
+    def __iter__(self):
+        return iter(self._chunk_of)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._chunk_of
+
+    def add(self, record_id: str) -> None:
+        """Add record ID (no-op if present)"""
+        if record_id in self._chunk_of:
+            return
+        added = len(record_id)
+        self._chars += added
+        if self._chunks:
+            last = len(self._chunks) - 1
+            chunk = self._chunks[last]
+            if not chunk or (
+                len(chunk) < self.max_ids and
+                self._lengths[last] + added + 1 <= self.max_where_length
+            ):
+                self._lengths[last] += added + (1 if chunk else 0)
+                chunk[record_id] = None
+                self._wheres[last] = None
+                self._due[last] = 0.0  # New IDs are checked on the next sweep
+                self._chunk_of[record_id] = last
+                return
+
+        self._chunks.append({record_id: None})
+        self._lengths.append(self._base_length + added)
+        self._wheres.append(None)
+        self._due.append(0.0)
+        self._chunk_of[record_id] = len(self._chunks) - 1
+
+    def remove(self, record_id: str) -> None:
+        """Remove record ID (no-op if absent)"""
+        index = self._chunk_of.pop(record_id, None)
+        if index is None:
+            return
+        chunk = self._chunks[index]
+        del chunk[record_id]
+        self._lengths[index] -= len(record_id) + (1 if chunk else 0)
+        self._wheres[index] = None
+        self._chars -= len(record_id)
+
+        # Compact when removals left twice as many chunks as needed (amortized O(1))
+        needed = max(
+            math.ceil(len(self._chunk_of) / self.max_ids),
+            math.ceil((self._chars + len(self._chunk_of)) / (self.max_where_length - self._base_length))
+        )
+        if len(self._chunks) > 2 * needed + 1:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        record_ids = list(self._chunk_of)
+        self._chunks, self._lengths, self._wheres, self._due, self._chunk_of = [], [], [], [], {}
+        self._chars = 0
+        for record_id in record_ids:
+            self.add(record_id)
+        self.rebuilds += 1
+
+    def where(self, index: int) -> str:
+        """Where clause of a chunk (built once per change)"""
+        if self._wheres[index] is None:
+            self._wheres[index] = where_in("Id", list(self._chunks[index]))
+        return self._wheres[index]
+
+    def members(self, index: int) -> List[str]:
+        """Record IDs of a chunk"""
+        return list(self._chunks[index])
+
+    def chunks(self) -> List[Tuple[str, int]]:
+        """Non-empty chunks as (where clause, number of IDs)"""
+        return [(self.where(index), len(chunk)) for index, chunk in enumerate(self._chunks) if chunk]
+
+    def due_chunks(self, deadline: float) -> List[int]:
+        """Indices of non-empty chunks with an ID due at or before deadline"""
+        return [index for index, due in enumerate(self._due) if due <= deadline and self._chunks[index]]
+
+    def check_earlier(self, record_id: str, next_due: float) -> None:
+        """Bring the chunk's next check forward to an ID's next check (no-op if absent)"""
+        index = self._chunk_of.get(record_id)
+        if index is not None and next_due < self._due[index]:
+            self._due[index] = next_due
+
+    def set_next_check(self, index: int, next_due: float) -> None:
+        """Set the chunk's next check after its IDs were checked"""
+        self._due[index] = next_due
+
+    def mark_all_due(self) -> None:
+        """Check every chunk on the next sweep (schedule unknown)"""
+        self._due = [0.0] * len(self._chunks)
+
+
+@dataclass
+class PaymentStatusEvent:
+    """Payment status change of a tracked user"""
+    user_id: int
+    record_id: str
+    paid: bool
+    previous: bool
+    source: str  # 'sweep', 'webhook' or 'replica'
+
+
+# Async callback receiving status change events
+StatusCallback = Callable[[PaymentStatusEvent], Awaitable[None]]
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """Parse NocoDB timestamp ("2024-05-01 10:00:00+00:00" or ISO format)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
 
 
 class GlobalPaymentTracker:
@@ -29,6 +249,9 @@ class GlobalPaymentTracker:
         # Check if paid (reads from cache, no API call)
         is_paid = tracker.is_paid(user_id)
 
+        # Or get notified on change
+        tracker.subscribe(on_status_change, user_id=user_id)
+
         # Start periodic updates
         await tracker.start(interval=20)
     """
@@ -39,25 +262,62 @@ class GlobalPaymentTracker:
         # Payment statuses: {user_id: is_paid}
         self.payment_statuses: Dict[int, bool] = {}
 
-        # User to record mapping: {user_id: record_id}
+        # User to record mapping: {user_id: record_id}, and the reverse index
         self.user_records: Dict[int, str] = {}
+        self.user_by_record: Dict[str, int] = {}
+
+        # Pre-chunked record IDs of full sweeps (records already in NocoDB)
+        self.sweep_index = SweepIndex()
 
         # NocoDB config (will be set on first use)
         self.nocodb_api_url: Optional[str] = None
         self.nocodb_api_token: Optional[str] = None
         self.nocodb_table_id: Optional[str] = None
+        self.client: Optional[NocoDBClient] = None
 
         # Background task
         self.update_task: Optional[asyncio.Task] = None
         self.running = False
         self.update_interval = 20  # seconds
 
+        # Incremental sync (change feed by UpdatedAt watermark)
+        self.sync_mode = 'full'
+        self.watermark: Optional[datetime] = None
+        self.watermark_file: Optional[str] = None
+        self.full_sync_every = 30  # Full reconcile every N incremental sweeps
+        self.sweeps_since_full = 0
+
+        # Per-user check schedule for full sweeps (None = check everyone every sweep)
+        self._polling_policy: Optional[AdaptivePollingPolicy] = None
+
+        # Statuses shared with other workers of the host (None = not shared)
+        self.shared_cache: Optional[SharedCache] = None
+
+        # Full sweep chunking
+        self.sweep_concurrency = 4  # Max chunk requests in flight
+        self.sweep_spread = 0.5  # Stagger chunk starts over this fraction of the interval
+
+        # Observers: user_id / record_id -> callbacks, plus global callbacks
+        self._user_subscribers: Dict[int, List[StatusCallback]] = {}
+        self._record_subscribers: Dict[str, List[StatusCallback]] = {}
+        self._global_subscribers: List[StatusCallback] = []
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+
         # Stats
         self.stats = {
             'total_updates': 0,
             'last_update_time': 0,
             'users_updated': 0,
-            'payments_confirmed': 0
+            'payments_confirmed': 0,
+            'incremental_sweeps': 0,
+            'full_sweeps': 0,
+            'events_dispatched': 0,
+            'sweep_chunks': 0,
+            'chunk_failures': 0,
+            'last_chunk_latency_avg': 0.0,
+            'last_chunk_latency_max': 0.0,
+            'shared_statuses': 0,
+            'fetched_statuses': 0
         }
 
     @classmethod
@@ -67,31 +327,134 @@ class GlobalPaymentTracker:
             cls._instance = cls()
         return cls._instance
 
-    def configure(self, nocodb_api_url: str, nocodb_api_token: str, nocodb_table_id: str):
-        """Configure NocoDB credentials"""
+    def configure(self, nocodb_api_url: str, nocodb_api_token: str, nocodb_table_id: str,
+                  sync_mode: str = 'full', watermark_file: Optional[str] = None):
+        """
+        Configure NocoDB credentials and sync mode.
+
+        Args:
+            nocodb_api_url: NocoDB base URL
+            nocodb_api_token: NocoDB API token
+            nocodb_table_id: Payments table ID
+            sync_mode: 'full' (check all tracked IDs) or 'incremental' (UpdatedAt change feed)
+            watermark_file: Where to persist the incremental sync watermark across restarts
+        """
+        if sync_mode not in ('full', 'incremental'):
+            raise ValueError(f"Unknown sync mode: {sync_mode}")
+
         self.nocodb_api_url = nocodb_api_url
         self.nocodb_api_token = nocodb_api_token
         self.nocodb_table_id = nocodb_table_id
-
-    def track_user(self, user_id: int, record_id: str):
+        self.client = NocoDBClient(nocodb_api_url, nocodb_api_token)
+        self.sync_mode = sync_mode
+        self.watermark_file = watermark_file
+
+        if sync_mode == 'incremental':
+            self.watermark = self._load_watermark()
+
+    @property
+    def polling_policy(self) -> Optional[AdaptivePollingPolicy]:
+        """Per-user check schedule of full sweeps"""
+        return self._polling_policy
+
+    @polling_policy.setter
+    def polling_policy(self, policy: Optional[AdaptivePollingPolicy]) -> None:
+        if self._polling_policy is not None:
+            self._polling_policy.on_schedule = None
+        self._polling_policy = policy
+        if policy is not None:
+            # Keep chunk next checks in step with the policy (incl. touches)
+            policy.on_schedule = self._on_policy_schedule
+            self.sweep_index.mark_all_due()
+
+    def _on_policy_schedule(self, user_id: int, next_due: float) -> None:
+        record_id = self.user_records.get(user_id)
+        if record_id is not None:
+            self.sweep_index.check_earlier(record_id, next_due)
+
+    def _load_watermark(self) -> Optional[datetime]:
+        """Load persisted watermark (None if missing or for another table)"""
+        if not self.watermark_file or not os.path.exists(self.watermark_file):
+            return None
+        try:
+            with open(self.watermark_file, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Cannot read tracker watermark: {e}")
+            return None
+        if state.get('table_id') != self.nocodb_table_id:
+            return None
+        return parse_timestamp(state.get('watermark'))
+
+    def _save_watermark(self) -> None:
+        """Persist watermark atomically (write temp file, then rename)"""
+        if not self.watermark_file or self.watermark is None:
+            return
+        directory = os.path.dirname(self.watermark_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.watermark_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'table_id': self.nocodb_table_id, 'watermark': self.watermark.isoformat()}, f)
+        os.replace(tmp_path, self.watermark_file)
+
+    def track_user(self, user_id: int, record_id: str,
+                   created_at: Union[str, datetime, None] = None):
         """
         Add user to tracking.
 
         Args:
             user_id: Telegram user ID
             record_id: NocoDB record ID
+            created_at: Record creation time (NocoDB timestamp or datetime), used by
+                polling_policy to back off stale records (default: now)
         """
-        self.user_records[user_id] = record_id
+        record_id = str(record_id)
+        self._unindex(user_id)
+        self._index(user_id, record_id)
         self.payment_statuses[user_id] = False  # Default to unpaid
-        print(f"📍 Tracking payment for user {user_id} (record: {record_id})")
+
+        if self.polling_policy is not None:
+            if isinstance(created_at, str):
+                created_at = parse_timestamp(created_at)
+            self.polling_policy.register(user_id, created_at.timestamp() if created_at else None)
 
     def untrack_user(self, user_id: int):
         """Remove user from tracking (after payment confirmed)"""
-        if user_id in self.user_records:
-            del self.user_records[user_id]
-        if user_id in self.payment_statuses:
-            del self.payment_statuses[user_id]
-        print(f"🔕 Stopped tracking user {user_id}")
+        self._unindex(user_id)
+        self.payment_statuses.pop(user_id, None)
+        if self.polling_policy is not None:
+            self.polling_policy.forget(user_id)
+
+    def _index(self, user_id: int, record_id: str) -> None:
+        self.user_records[user_id] = record_id
+        self.user_by_record[record_id] = user_id
+        # Records still in the outbox do not exist in NocoDB yet
+        if not is_provisional(record_id):
+            self.sweep_index.add(record_id)
+
+    def _unindex(self, user_id: int) -> None:
+        record_id = self.user_records.pop(user_id, None)
+        if record_id is None:
+            return
+        if self.user_by_record.get(record_id) == user_id:
+            del self.user_by_record[record_id]
+        self.sweep_index.remove(record_id)
+
+    def rebind_record(self, old_record_id: str, new_record_id: str) -> bool:
+        """
+        Replace record ID of a tracked user (provisional outbox ID -> real NocoDB ID).
+
+        Returns:
+            True if a tracked user had `old_record_id`
+        """
+        user_id = self.user_by_record.get(old_record_id)
+        if user_id is None:
+            return False
+        self._unindex(user_id)
+        self._index(user_id, str(new_record_id))
+        print(f"🔗 User {user_id}: record {old_record_id} -> {new_record_id}")
+        return True
 
     def is_paid(self, user_id: int) -> bool:
         """
@@ -109,6 +472,65 @@ class GlobalPaymentTracker:
         """Get number of users being tracked"""
         return len(self.user_records)
 
+    def _subscriber_list(self, user_id: Optional[int], record_id: Optional[str]) -> List[StatusCallback]:
+        if user_id is not None and record_id is not None:
+            raise ValueError("Subscribe by user_id or record_id, not both")
+        if user_id is not None:
+            return self._user_subscribers.setdefault(user_id, [])
+        if record_id is not None:
+            return self._record_subscribers.setdefault(str(record_id), [])
+        return self._global_subscribers
+
+    def subscribe(self, callback: StatusCallback, user_id: Optional[int] = None,
+                  record_id: Optional[str] = None) -> None:
+        """
+        Register async callback for payment status changes.
+
+        Args:
+            callback: Async function receiving PaymentStatusEvent
+            user_id: Only receive events for this user
+            record_id: Only receive events for this record
+                (neither given = receive events for all tracked users)
+        """
+        subscribers = self._subscriber_list(user_id, record_id)
+        if callback not in subscribers:
+            subscribers.append(callback)
+
+    def unsubscribe(self, callback: StatusCallback, user_id: Optional[int] = None,
+                    record_id: Optional[str] = None) -> None:
+        """Remove callback registered with the same user_id/record_id"""
+        subscribers = self._subscriber_list(user_id, record_id)
+        if callback in subscribers:
+            subscribers.remove(callback)
+
+        # Drop empty keyed lists
+        if user_id is not None and not subscribers:
+            self._user_subscribers.pop(user_id, None)
+        elif record_id is not None and not subscribers:
+            self._record_subscribers.pop(str(record_id), None)
+
+    def _dispatch(self, events: List[PaymentStatusEvent]) -> None:
+        """Schedule subscriber callbacks for events (non-blocking)"""
+        for event in events:
+            callbacks = (
+                self._user_subscribers.get(event.user_id, []) +
+                self._record_subscribers.get(event.record_id, []) +
+                self._global_subscribers
+            )
+            for callback in callbacks:
+                task = asyncio.create_task(self._notify(callback, event))
+                self._dispatch_tasks.add(task)
+                task.add_done_callback(self._dispatch_tasks.discard)
+                self.stats['events_dispatched'] += 1
+
+    @staticmethod
+    async def _notify(callback: StatusCallback, event: PaymentStatusEvent) -> None:
+        """Run subscriber callback, logging errors"""
+        try:
+            await callback(event)
+        except Exception as e:
+            print(f"❌ Error in payment status subscriber for user {event.user_id}: {e}")
+
     async def start(self, interval: int = 20):
         """
         Start periodic payment status updates.
@@ -145,76 +567,57 @@ class GlobalPaymentTracker:
                 if not self.user_records:
                     continue  # No users to check
 
-                await self._update_all_statuses()
+                await self._update_all_statuses(spread=self.update_interval * self.sweep_spread)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 print(f"❌ Error in global payment tracker: {e}")
 
-    async def _update_all_statuses(self):
+    async def _update_all_statuses(self, spread: float = 0.0):
         """
-        Update payment statuses for all tracked users with a single batch query.
+        Update payment statuses for all tracked users.
+
+        Full mode: chunked batch queries for ALL tracked users.
+        Incremental mode: only rows modified since the watermark are fetched,
+        so cost is proportional to changes, not to the number of tracked users.
 
-        This is the magic - one API call for ALL users!
+        Args:
+            spread: Seconds over which full sweep chunk requests are staggered
         """
         if not self.nocodb_api_token or not self.nocodb_table_id:
             print("⚠️  NocoDB not configured, skipping update")
             return
 
-        record_ids = list(self.user_records.values())
-        user_by_record = {record_id: user_id for user_id, record_id in self.user_records.items()}
-
-        print(f"\n🔍 Global Tracker: Checking {len(record_ids)} payment records...")
-
         try:
-            # Build WHERE clause: (Id,in,id1,id2,id3,...)
-            ids_str = ",".join(str(rid) for rid in record_ids)
-            where_clause = f"(Id,in,{ids_str})"
-
-            headers = {"xc-token": self.nocodb_api_token}
-
-            # ONE API CALL FOR ALL USERS!
-            response = await nocodb_request_with_retry(
-                "GET",
-                f"{self.nocodb_api_url}/api/v2/tables/{self.nocodb_table_id}/records",
-                headers=headers,
-                params={
-                    "where": where_clause,
-                    "limit": len(record_ids),
-                    "fields": "Id,Paid"  # Only fetch necessary fields
-                },
-                timeout=15.0
+            incremental = (
+                self.sync_mode == 'incremental' and
+                self.watermark is not None and
+                self.sweeps_since_full < self.full_sync_every
             )
-            response.raise_for_status()
-            data = response.json()
-
-            # Update statuses from response
-            records = data.get("list", [])
-            paid_count = 0
-            newly_paid = []
-
-            for record in records:
-                record_id = str(record.get("Id") or record.get("id"))
-                is_paid = record.get("Paid", False) is True
-                user_id = user_by_record.get(record_id)
 
-                if user_id:
-                    old_status = self.payment_statuses.get(user_id, False)
-                    self.payment_statuses[user_id] = is_paid
-
-                    if is_paid:
-                        paid_count += 1
-
-                        # Detect newly paid users
-                        if not old_status and is_paid:
-                            newly_paid.append(user_id)
+            if incremental:
+                records, new_watermark = await self._fetch_changes()
+                self.sweeps_since_full += 1
+                self.stats['incremental_sweeps'] += 1
+            else:
+                # Take watermark BEFORE the full sweep, so changes made during
+                # the sweep are picked up by the next incremental sweep
+                new_watermark = None
+                reconcile = self.sync_mode == 'incremental'
+                if reconcile:
+                    new_watermark = await self._fetch_latest_update()
+                records = await self._fetch_tracked(spread, reconcile=reconcile)
+                self.sweeps_since_full = 0
+                self.stats['full_sweeps'] += 1
+
+            newly_paid = self.apply_records(records)
+            paid_count = sum(1 for record in records if record.get("Paid", False) is True)
 
             # Update stats
             self.stats['total_updates'] += 1
             self.stats['last_update_time'] = time.time()
             self.stats['users_updated'] = len(records)
-            self.stats['payments_confirmed'] += len(newly_paid)
 
             print(f"✅ Global Tracker: {paid_count}/{len(records)} paid, {len(records) - paid_count} pending")
 
@@ -223,11 +626,283 @@ class GlobalPaymentTracker:
                 for user_id in newly_paid:
                     print(f"      • User {user_id}")
 
+            # Advance watermark only after deltas are applied
+            if new_watermark is not None and (self.watermark is None or new_watermark > self.watermark):
+                self.watermark = new_watermark
+                self._save_watermark()
+
             print(f"   📊 Next update in {self.update_interval}s\n")
 
         except Exception as e:
             print(f"❌ Error updating global payment statuses: {e}")
 
+    async def _fetch_tracked(self, spread: float = 0.0, reconcile: bool = False) -> List[Record]:
+        """
+        Fetch Id/Paid for all tracked (due) records (full sweep).
+
+        IDs are split into size-bounded chunks that run concurrently (at most
+        `sweep_concurrency` in flight, each still going through the rate
+        limiter). Chunk starts are staggered evenly over `spread` seconds.
+        A failed chunk is logged and counted; results of other chunks are
+        still applied.
+
+        With polling_policy only due records are fetched, except for the
+        reconcile sweep of incremental mode: it must also catch changes the
+        watermark missed for backed-off records, so it checks everyone.
+
+        Args:
+            spread: Seconds over which chunk starts are staggered
+            reconcile: Periodic full reconcile (bypasses polling_policy)
+
+        Returns:
+            Merged records from all successful chunks
+        """
+        if not self.sweep_index:
+            return []
+
+        user_ids = None
+        if self.polling_policy is not None and not reconcile:
+            checked, due_chunks, user_ids = self._select_due()
+            if not user_ids:
+                self._record_checks(user_ids, checked)
+                print(f"⏭️  Global Tracker: no records due ({len(self.user_records)} backed off)")
+                return []
+
+        shared_records: List[Record] = []
+        missing = None
+        if self.shared_cache is not None:
+            due = list(self.sweep_index) if user_ids is None else [self.user_records[u] for u in user_ids]
+            shared_records, missing = self._read_shared(due)
+            if not missing:
+                print(f"🔗 Global Tracker: {len(shared_records)} statuses from shared cache")
+                if user_ids is not None:
+                    self._record_checks(user_ids, checked)
+                return shared_records
+
+        if missing is not None and shared_records:
+            chunks = [(where_in("Id", chunk), len(chunk)) for chunk in chunk_record_ids(missing)]
+        elif user_ids is None:
+            # Everyone is checked: use maintained chunks (no per-ID work)
+            chunks = self.sweep_index.chunks()
+        else:
+            chunks = due_chunks
+        print(f"\n🔍 Global Tracker: Checking {sum(size for _, size in chunks)} payment records "
+              f"in {len(chunks)} chunk(s)...")
+
+        semaphore = asyncio.Semaphore(max(self.sweep_concurrency, 1))
+        step = spread / len(chunks) if len(chunks) > 1 else 0.0
+        latencies: List[float] = []
+
+        async def fetch_chunk(index: int, where: str, size: int) -> List[Record]:
+            if step:
+                await asyncio.sleep(index * step)
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    return await self.client.list(
+                        self.nocodb_table_id,
+                        where=where,
+                        fields=["Id", "Paid"],  # Only fetch necessary fields
+                        limit=size
+                    )
+                finally:
+                    latencies.append(time.monotonic() - started)
+
+        results = await asyncio.gather(
+            *(fetch_chunk(index, where, size) for index, (where, size) in enumerate(chunks)),
+            return_exceptions=True
+        )
+
+        records: List[Record] = []
+        failures = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                failures += 1
+                print(f"⚠️  Global Tracker: chunk failed: {result}")
+            else:
+                records.extend(result)
+
+        self.stats['sweep_chunks'] += len(chunks)
+        self.stats['chunk_failures'] += failures
+        if latencies:
+            self.stats['last_chunk_latency_avg'] = sum(latencies) / len(latencies)
+            self.stats['last_chunk_latency_max'] = max(latencies)
+
+        if failures == len(chunks):
+            raise RuntimeError(f"all {failures} sweep chunks failed")
+
+        self._write_shared(records)
+        if user_ids is not None:
+            self._record_checks(user_ids, checked)
+        return shared_records + records
+
+    def _select_due(self) -> Tuple[Tuple[int, List[int]], List[Tuple[str, int]], List[int]]:
+        """
+        Pick due records of a full sweep with polling_policy.
+
+        Only chunks whose next check has come are visited (provisional records
+        are not in the sweep index). A chunk whose records are all due is
+        queried with its maintained where clause; due records of partly due
+        chunks are re-chunked.
+
+        Returns:
+            (sweep index version and visited chunk indices, (where, size) queries, due user IDs)
+        """
+        policy = self.polling_policy
+        now = time.time()
+        indices = self.sweep_index.due_chunks(policy.due_deadline(now))
+
+        queries: List[Tuple[str, int]] = []
+        partial: List[str] = []
+        user_ids: List[int] = []
+        visited = 0
+        for index in indices:
+            members = self.sweep_index.members(index)
+            visited += len(members)
+            due = policy.due([self.user_by_record[record_id] for record_id in members], now)
+            if len(due) == len(members):
+                queries.append((self.sweep_index.where(index), len(members)))
+            else:
+                partial.extend(self.user_records[user_id] for user_id in due)
+            user_ids.extend(due)
+        policy.record_skipped(len(self.sweep_index) - visited)
+
+        queries.extend((where_in("Id", chunk), len(chunk)) for chunk in chunk_record_ids(partial))
+        return (self.sweep_index.rebuilds, indices), queries, user_ids
+
+    def _record_checks(self, user_ids: List[int], checked: Tuple[int, List[int]]) -> None:
+        """Schedule next checks of swept users and of the chunks visited by the sweep"""
+        self.polling_policy.record_checks(user_ids)
+        version, indices = checked
+        if version != self.sweep_index.rebuilds:
+            self.sweep_index.mark_all_due()  # Chunks were compacted during the sweep
+            return
+        for index in indices:
+            members = self.sweep_index.members(index)
+            self.sweep_index.set_next_check(
+                index, self.polling_policy.next_check(self.user_by_record[r] for r in members)
+            )
+
+    def _shared_key(self, record_id: str) -> str:
+        return f"payment_status:{self.nocodb_table_id}:{record_id}"
+
+    def _read_shared(self, record_ids: List[str]) -> Tuple[List[Record], List[str]]:
+        """
+        Take statuses another worker fetched within the last update interval.
+
+        Returns:
+            Tuple of (Id/Paid records from the shared cache, record IDs to fetch)
+        """
+        try:
+            found = self.shared_cache.get_many(self._shared_key(record_id) for record_id in record_ids)
+        except Exception as e:
+            print(f"⚠️  Global Tracker: shared cache unavailable: {e}")
+            return [], record_ids
+
+        records, missing = [], []
+        for record_id in record_ids:
+            entry = found.get(self._shared_key(record_id))
+            if entry is None:
+                missing.append(record_id)
+            else:
+                records.append(Record(record_id, {"Id": record_id, "Paid": entry.data}))
+        self.stats['shared_statuses'] += len(records)
+        return records, missing
+
+    def _write_shared(self, records: List[Record]) -> None:
+        """Publish fetched statuses to the other workers for one update interval"""
+        self.stats['fetched_statuses'] += len(records)
+        if self.shared_cache is None or not records:
+            return
+        try:
+            self.shared_cache.set_many(
+                ((self._shared_key(record.id), record.get("Paid", False) is True) for record in records),
+                ttl=self.update_interval
+            )
+        except Exception as e:
+            print(f"⚠️  Global Tracker: cannot write shared cache: {e}")
+
+    async def _fetch_latest_update(self) -> Optional[datetime]:
+        """Get newest UpdatedAt in the table (1 row, 1 field)"""
+        records = await self.client.list(
+            self.nocodb_table_id,
+            fields=[UPDATED_AT_FIELD],
+            sort=f"-{UPDATED_AT_FIELD}",
+            limit=1
+        )
+        return parse_timestamp(records[0].get(UPDATED_AT_FIELD)) if records else None
+
+    async def _fetch_changes(self) -> tuple:
+        """
+        Fetch rows modified at or after the watermark (newest first).
+
+        Paging stops at the first row older than the watermark. Rows updated
+        exactly at the watermark are re-applied, which is harmless.
+
+        Returns:
+            Tuple of (changed records, newest UpdatedAt seen)
+        """
+        print(f"\n🔍 Global Tracker: Fetching changes since {self.watermark.isoformat()}...")
+
+        changes = []
+        newest = self.watermark
+        async for page in self.client.iter_pages(
+            self.nocodb_table_id,
+            fields=["Id", "Paid", UPDATED_AT_FIELD],
+            sort=f"-{UPDATED_AT_FIELD}",
+            page_size=100,
+            prefetch=1
+        ):
+            reached_watermark = False
+            for record in page:
+                updated_at = parse_timestamp(record.get(UPDATED_AT_FIELD))
+                if updated_at is None or updated_at < self.watermark:
+                    reached_watermark = True
+                    break
+                changes.append(record)
+                newest = max(newest, updated_at)
+            if reached_watermark:
+                break
+
+        return changes, newest
+
+    def apply_records(self, records: List[Record], source: str = 'sweep') -> List[int]:
+        """
+        Apply Id/Paid rows (from a sweep, webhook or replica change feed) to tracked users' statuses.
+
+        Rows for records that are not tracked are ignored. Status changes are
+        dispatched to subscribers as PaymentStatusEvent.
+
+        Args:
+            records: Rows with `Id` and `Paid`
+            source: Event source reported to subscribers ('sweep', 'webhook' or 'replica')
+
+        Returns:
+            User IDs whose status changed from unpaid to paid
+        """
+        newly_paid = []
+        events = []
+
+        for record in records:
+            is_paid = record.get("Paid", False) is True
+            user_id = self.user_by_record.get(record.id)
+
+            if user_id:
+                old_status = self.payment_statuses.get(user_id, False)
+                self.payment_statuses[user_id] = is_paid
+
+                if old_status != is_paid:
+                    events.append(PaymentStatusEvent(user_id, record.id, is_paid, old_status, source))
+
+                # Detect newly paid users
+                if not old_status and is_paid:
+                    newly_paid.append(user_id)
+
+        self.stats['payments_confirmed'] += len(newly_paid)
+        if events:
+            self._dispatch(events)
+        return newly_paid
+
     async def force_update(self):
         """Force immediate update (useful for testing)"""
         print("🔄 Force updating payment statuses...")
@@ -243,7 +918,26 @@ class GlobalPaymentTracker:
             'last_update': f"{uptime:.0f}s ago" if uptime > 0 else "Never",
             'users_updated': self.stats['users_updated'],
             'payments_confirmed': self.stats['payments_confirmed'],
-            'update_interval': f"{self.update_interval}s"
+            'update_interval': f"{self.update_interval}s",
+            'sync_mode': self.sync_mode,
+            'watermark': self.watermark.isoformat() if self.watermark else None,
+            'incremental_sweeps': self.stats['incremental_sweeps'],
+            'full_sweeps': self.stats['full_sweeps'],
+            'subscribers': (
+                sum(map(len, self._user_subscribers.values())) +
+                sum(map(len, self._record_subscribers.values())) +
+                len(self._global_subscribers)
+            ),
+            'events_dispatched': self.stats['events_dispatched'],
+            'polling_policy': self.polling_policy.get_stats() if self.polling_policy else None,
+            'sweep_chunks': self.stats['sweep_chunks'],
+            'chunk_failures': self.stats['chunk_failures'],
+            'last_chunk_latency_avg': f"{self.stats['last_chunk_latency_avg'] * 1000:.0f}ms",
+            'last_chunk_latency_max': f"{self.stats['last_chunk_latency_max'] * 1000:.0f}ms",
+            'statuses_served_by': {
+                'shared': self.stats['shared_statuses'],
+                'origin': self.stats['fetched_statuses']
+            }
         }
 
     def print_stats(self):
@@ -259,6 +953,14 @@ class GlobalPaymentTracker:
         print(f"Last Update: {stats['last_update']}")
         print(f"Users Updated: {stats['users_updated']}")
         print(f"Payments Confirmed: {stats['payments_confirmed']}")
+        print(f"Sync Mode: {stats['sync_mode']} (watermark: {stats['watermark'] or 'none'})")
+        if stats['polling_policy']:
+            policy = stats['polling_policy']
+            print(f"Polling Policy: {policy['fast_lane']} fast, {policy['backed_off']} backed off, "
+                  f"{policy['skip_rate']} checks skipped")
+        print(f"Subscribers: {stats['subscribers']} ({stats['events_dispatched']} events dispatched)")
+        print(f"Sweep Chunks: {stats['sweep_chunks']} ({stats['chunk_failures']} failed, "
+              f"last avg {stats['last_chunk_latency_avg']}, max {stats['last_chunk_latency_max']})")
         print("="*60 + "\n")
 
 
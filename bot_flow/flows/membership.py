@@ -0,0 +1,244 @@
+"""
+Negative-lookup filter for Telegram IDs of registered users.
+
+During a promotion most /start calls come from brand-new users, and each of
+them costs a `(TG ID,eq,...)` query that returns an empty list.
+RegisteredUsersFilter keeps a Bloom filter of all known `TG ID`s in memory:
+
+    might_contain(tg_id) is False -> definitely not registered, no API call
+    might_contain(tg_id) is True  -> possibly registered, ask NocoDB
+
+The filter is loaded at startup, every local create is added immediately and
+the whole filter is rebuilt periodically (picks up records created outside
+the bot, e.g. by admins in the NocoDB UI).
+
+Memory is sized from the expected number of users and target false-positive
+rate: 100k users at 1% take ~117 KB (9.6 bits per user, 7 hashes).
+
+Usage:
+    members = RegisteredUsersFilter(client, table_id, capacity=100_000, error_rate=0.01)
+    await members.load()
+
+    if not members.might_contain(user_id):
+        ...  # New user, skip lookup
+    members.add(user_id)  # After creating the record
+"""
+import asyncio
+import hashlib
+import math
+from typing import Iterable, Optional, Set
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over integer keys.
+
+    Uses double hashing (h1 + i*h2) from one blake2b digest, so adding and
+    checking a key costs a single hash computation.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Initialize filter.
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false-positive rate at capacity (0 < rate < 1)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal size and hash count for the target rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: int):
+        digest = hashlib.blake2b(int(key).to_bytes(8, 'big', signed=True), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: int) -> None:
+        """Add key to filter"""
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def size_bytes(self) -> int:
+        """Memory used by the bit array"""
+        return len(self.bits)
+
+    def estimated_error_rate(self) -> float:
+        """Expected false-positive rate for the current number of keys"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class RegisteredUsersFilter:
+    """
+    Bloom filter of registered Telegram IDs, loaded from the payments table.
+
+    Until the first successful load the filter is not ready and every ID is
+    reported as possibly registered (callers fall back to NocoDB).
+    """
+
+    def __init__(self, client, table_id: str, capacity: int = 100_000,
+                 error_rate: float = 0.01, reload_interval: int = 3600):
+        """
+        Initialize filter.
+
+        Args:
+            client: NocoDBClient used to load TG IDs
+            table_id: Payments table ID
+            capacity: Expected number of registered users (filter grows on reload if exceeded)
+            error_rate: Target false-positive rate
+            reload_interval: Seconds between full rebuilds from NocoDB
+        """
+        self.client = client
+        self.table_id = table_id
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_interval = reload_interval
+
+        self.filter = BloomFilter(capacity, error_rate)
+        self.is_ready = False
+        self._loading = False
+        self._added_during_load: Set[int] = set()
+
+        self.running = False
+        self.reload_task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'lookups': 0,
+            'definite_misses': 0,
+            'possible_hits': 0,
+            'false_positives': 0,
+            'loads': 0,
+            'load_errors': 0
+        }
+
+    def _build(self, tg_ids: Iterable[int], count: int) -> BloomFilter:
+        # Size for the loaded set plus headroom for new registrations
+        bloom = BloomFilter(max(self.capacity, count * 2), self.error_rate)
+        for tg_id in tg_ids:
+            bloom.add(tg_id)
+        return bloom
+
+    async def load(self) -> bool:
+        """
+        (Re)build filter from all TG IDs in the payments table.
+
+        The new filter replaces the old one only after the download completed,
+        so a failed reload keeps serving the previous filter.
+
+        Returns:
+            True if the filter was rebuilt
+        """
+        self._loading = True
+        self._added_during_load.clear()
+        try:
+            tg_ids = []
+            async for page in self.client.iter_pages(self.table_id, fields=["TG ID"], page_size=1000):
+                tg_ids.extend(int(r.get("TG ID")) for r in page if r.get("TG ID"))
+        except Exception as e:
+            self.stats['load_errors'] += 1
+            print(f"❌ Error loading registered users filter: {e}")
+            return False
+        finally:
+            self._loading = False
+
+        # Keep IDs added locally while the download was running
+        tg_ids.extend(self._added_during_load)
+        self._added_during_load.clear()
+
+        bloom = self._build(tg_ids, len(tg_ids))
+        self.filter = bloom
+        self.is_ready = True
+        self.stats['loads'] += 1
+        print(f"🧮 Registered users filter loaded: {len(tg_ids)} IDs, "
+              f"{bloom.size_bytes / 1024:.0f} KB")
+        return True
+
+    def add(self, tg_id: int) -> None:
+        """Add newly registered user"""
+        self.filter.add(int(tg_id))
+        if self._loading:
+            self._added_during_load.add(int(tg_id))
+
+    def might_contain(self, tg_id: int) -> bool:
+        """
+        Whether user may be registered.
+
+        False means definitely not registered; True means NocoDB must be asked.
+        """
+        if not self.is_ready:
+            return True
+        self.stats['lookups'] += 1
+        if int(tg_id) in self.filter:
+            self.stats['possible_hits'] += 1
+            return True
+        self.stats['definite_misses'] += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """Count a possible hit that NocoDB did not confirm"""
+        self.stats['false_positives'] += 1
+
+    async def start(self) -> None:
+        """Start periodic rebuilds"""
+        if self.running:
+            return
+        self.running = True
+        self.reload_task = asyncio.create_task(self._reload_loop())
+
+    async def stop(self) -> None:
+        """Stop periodic rebuilds"""
+        self.running = False
+        if self.reload_task:
+            self.reload_task.cancel()
+            try:
+                await self.reload_task
+            except asyncio.CancelledError:
+                pass
+            self.reload_task = None
+
+    async def _reload_loop(self) -> None:
+        while self.running:
+            try:
+                await asyncio.sleep(self.reload_interval)
+                await self.load()
+            except asyncio.CancelledError:
+                break
+
+    def get_stats(self) -> dict:
+        """Get filter statistics"""
+        hits = self.stats['possible_hits']
+        lookups = self.stats['lookups']
+        return {
+            'ready': self.is_ready,
+            'ids': self.filter.count,
+            'memory_kb': f"{self.filter.size_bytes / 1024:.1f}",
+            'num_hashes': self.filter.num_hashes,
+            'target_error_rate': f"{self.error_rate * 100:.2f}%",
+            'estimated_error_rate': f"{self.filter.estimated_error_rate() * 100:.2f}%",
+            'observed_false_positive_rate': (
+                f"{self.stats['false_positives'] / hits * 100:.2f}%" if hits else "0.00%"
+            ),
+            'lookups': lookups,
+            'definite_misses': self.stats['definite_misses'],
+            'possible_hits': hits,
+            'false_positives': self.stats['false_positives'],
+            'skip_rate': f"{self.stats['definite_misses'] / lookups * 100:.1f}%" if lookups else "0.0%",
+            'loads': self.stats['loads'],
+            'load_errors': self.stats['load_errors']
+        }
@@ -7,6 +7,19 @@ import time
 from typing import Dict, Optional
 from dataclasses import dataclass, field
 
+# Upper bounds of batch-size histogram buckets (last bucket is open-ended)
+BATCH_SIZE_BUCKETS = (1, 5, 10, 25, 50, 100)
+
+
+def _batch_bucket(size: int) -> str:
+    """Histogram bucket label for batch size ("1", "2-5", ..., "101+")"""
+    lower = 1
+    for upper in BATCH_SIZE_BUCKETS:
+        if size <= upper:
+            return str(upper) if lower == upper else f"{lower}-{upper}"
+        lower = upper + 1
+    return f"{lower}+"
+
 
 @dataclass
 class APIMetrics:
@@ -29,6 +42,9 @@ class APIMetrics:
     cache_hits: int = 0
     cache_misses: int = 0
 
+    # Batch-size histograms: {batch name: {bucket label: count}}
+    batch_sizes: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
 
 class MetricsCollector:
     """
@@ -111,6 +127,18 @@ class MetricsCollector:
         self.metrics.rate_limit_waits += 1
         self.metrics.total_rate_limit_wait_time += wait_time
 
+    def record_batch(self, name: str, size: int) -> None:
+        """
+        Record size of a coalesced batch (e.g. bulk insert).
+
+        Args:
+            name: Batch source (e.g. "bulk_create:<table_id>")
+            size: Number of items in the batch
+        """
+        histogram = self.metrics.batch_sizes.setdefault(name, {})
+        bucket = _batch_bucket(size)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+
     def update_cache_stats(self, hits: int, misses: int) -> None:
         """
         Update cache statistics.
@@ -168,6 +196,7 @@ class MetricsCollector:
 
             # Breakdown
             'requests_by_endpoint': self.metrics.requests_by_endpoint,
+            'batch_size_histograms': self.metrics.batch_sizes,
 
             # System stats
             'uptime': f"{uptime:.0f}s"
@@ -212,6 +241,12 @@ class MetricsCollector:
             ):
                 print(f"   {endpoint}: {count}")
 
+        if stats['batch_size_histograms']:
+            print(f"\n📦 Batch Sizes:")
+            for name, histogram in stats['batch_size_histograms'].items():
+                buckets = ", ".join(f"{bucket}: {count}" for bucket, count in histogram.items())
+                print(f"   {name}: {buckets}")
+
         print(f"\n⏰ Uptime: {stats['uptime']}")
         print("="*60 + "\n")
 
@@ -0,0 +1,299 @@
+"""
+Typed async client for NocoDB table access.
+
+All table I/O goes through NocoDBClient, which builds URLs and headers,
+projects only the requested fields, decodes JSON once and normalizes
+`Id`/`id` into compact Record objects. Requests use nocodb_request_with_retry,
+so rate limiting, connection pooling and circuit breaking apply everywhere.
+
+Usage:
+    client = get_nocodb_client()
+
+    record = await client.find(table_id, where_eq("TG ID", user_id), fields=["Id", "Paid"])
+    if record and record.get("Paid") is True:
+        ...
+
+    record_id = await client.create(table_id, {"TG ID": user_id, "Paid": False})
+"""
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from config import config
+from bot_flow.flows.nocodb_utils import nocodb_request_with_retry, response_json
+
+
+class Record:
+    """
+    Compact NocoDB record: normalized string ID plus raw field values.
+    """
+
+    __slots__ = ('id', 'fields')
+
+    def __init__(self, record_id: str, fields: Dict[str, Any]):
+        self.id = record_id
+        self.fields = fields
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> 'Record':
+        """Build record from API payload (handles both `Id` and `id`)"""
+        return cls(str(data.get("Id") or data.get("id")), data)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """Get field value"""
+        return self.fields.get(field, default)
+
+    def __getitem__(self, field: str) -> Any:
+        return self.fields[field]
+
+    def __repr__(self) -> str:
+        return f"Record(id={self.id!r}, fields={self.fields!r})"
+
+
+def where_eq(field: str, value: Any) -> str:
+    """Build `(field,eq,value)` clause"""
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    return f"({field},eq,{value})"
+
+
+def where_in(field: str, values: Iterable[Any]) -> str:
+    """Build `(field,in,v1,v2,...)` clause"""
+    return f"({field},in,{','.join(str(v) for v in values)})"
+
+
+def where_and(*clauses: str) -> str:
+    """Combine clauses with `~and`"""
+    return "~and".join(c for c in clauses if c)
+
+
+class NocoDBClient:
+    """
+    Async client for NocoDB v2 table records API.
+
+    Errors from NocoDB are raised as httpx.HTTPStatusError (via raise_for_status),
+    open circuits as CircuitOpenError.
+    """
+
+    _instance: Optional['NocoDBClient'] = None
+
+    def __init__(self, api_url: str, api_token: Optional[str], timeout: float = 15.0):
+        """
+        Initialize client.
+
+        Args:
+            api_url: NocoDB base URL (e.g. https://app.nocodb.com)
+            api_token: NocoDB API token (xc-token)
+            timeout: Request timeout in seconds
+        """
+        self.api_url = api_url.rstrip('/')
+        self.api_token = api_token
+        self.timeout = timeout
+
+    @classmethod
+    def get_instance(cls) -> 'NocoDBClient':
+        """Get singleton client configured from centralized config"""
+        if cls._instance is None:
+            cls._instance = cls(config.NOCODB_API_URL, config.NOCODB_API_TOKEN)
+        return cls._instance
+
+    @property
+    def is_configured(self) -> bool:
+        """Whether API token is set"""
+        return bool(self.api_token)
+
+    def _headers(self, with_body: bool = False) -> dict:
+        headers = {"xc-token": self.api_token}
+        if with_body:
+            headers["Content-Type"] = "application/json"
+        return headers
+
+    def _records_url(self, table_id: str, suffix: str = "") -> str:
+        return f"{self.api_url}/api/v2/tables/{table_id}/records{suffix}"
+
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        """Make request, raise for HTTP errors, return decoded JSON"""
+        kwargs.setdefault('timeout', self.timeout)
+        response = await nocodb_request_with_retry(
+            method, url, headers=self._headers('json' in kwargs), **kwargs
+        )
+        response.raise_for_status()
+        return response_json(response)
+
+    @staticmethod
+    def _list_params(where: Optional[str], fields: Optional[List[str]], sort: Optional[str],
+                     limit: Optional[int], offset: Optional[int]) -> dict:
+        params = {}
+        if where:
+            params["where"] = where
+        if fields:
+            params["fields"] = ",".join(fields)
+        if sort:
+            params["sort"] = sort
+        if limit is not None:
+            params["limit"] = limit
+        if offset:
+            params["offset"] = offset
+        return params
+
+    async def get(self, table_id: str, record_id: str,
+                  fields: Optional[List[str]] = None) -> Optional[Record]:
+        """
+        Read single record by ID.
+
+        Returns:
+            Record, or None if record does not exist (404)
+        """
+        params = {"fields": ",".join(fields)} if fields else None
+        response = await nocodb_request_with_retry(
+            "GET",
+            self._records_url(table_id, f"/{record_id}"),
+            headers=self._headers(),
+            params=params,
+            timeout=self.timeout
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return Record.from_api(response_json(response))
+
+    async def list_page(self, table_id: str, where: Optional[str] = None,
+                        fields: Optional[List[str]] = None, sort: Optional[str] = None,
+                        limit: Optional[int] = None,
+                        offset: Optional[int] = None) -> Tuple[List[Record], dict]:
+        """
+        Fetch one page of records.
+
+        Returns:
+            Tuple of (records, pageInfo dict)
+        """
+        data = await self._request(
+            "GET",
+            self._records_url(table_id),
+            params=self._list_params(where, fields, sort, limit, offset)
+        )
+        rows = data.get("list", []) or data.get("records", [])
+        return [Record.from_api(row) for row in rows], data.get("pageInfo", {})
+
+    async def list(self, table_id: str, where: Optional[str] = None,
+                   fields: Optional[List[str]] = None, sort: Optional[str] = None,
+                   limit: Optional[int] = None, offset: Optional[int] = None) -> List[Record]:
+        """Fetch records matching `where` (single page)"""
+        records, _ = await self.list_page(table_id, where, fields, sort, limit, offset)
+        return records
+
+    async def iter_pages(self, table_id: str, where: Optional[str] = None,
+                         fields: Optional[List[str]] = None, sort: str = "Id",
+                         page_size: int = 200, prefetch: int = 2) -> AsyncIterator[List[Record]]:
+        """
+        Stream all matching records page by page, following NocoDB pageInfo.
+
+        Up to `prefetch` next pages are requested concurrently while the caller
+        processes the current one (each request still goes through the rate
+        limiter). At most prefetch + 1 pages are held in memory at any time.
+
+        Args:
+            table_id: NocoDB table ID
+            where: Filter clause
+            fields: Fields to project
+            sort: Sort order (stable order is required for offset pagination)
+            page_size: Records per page (NocoDB caps this at 1000 by default)
+            prefetch: Number of pages to request ahead
+
+        Yields:
+            Lists of records (one list per page)
+        """
+        records, page_info = await self.list_page(
+            table_id, where, fields, sort, limit=page_size, offset=0
+        )
+        yield records
+        if page_info.get("isLastPage", len(records) < page_size):
+            return
+
+        total_rows = page_info.get("totalRows")
+        next_offset = page_size
+        pending: deque = deque()
+
+        def schedule() -> None:
+            nonlocal next_offset
+            while len(pending) < max(prefetch, 1) and (total_rows is None or next_offset < total_rows):
+                pending.append(asyncio.create_task(
+                    self.list_page(table_id, where, fields, sort, limit=page_size, offset=next_offset)
+                ))
+                next_offset += page_size
+
+        try:
+            schedule()
+            while pending:
+                records, page_info = await pending.popleft()
+                if not records:
+                    break
+                yield records
+                if page_info.get("isLastPage", len(records) < page_size):
+                    break
+                schedule()
+        finally:
+            # Caller stopped early or last page reached - drop speculative requests
+            for task in pending:
+                task.cancel()
+
+    async def iter_records(self, table_id: str, where: Optional[str] = None,
+                           fields: Optional[List[str]] = None, sort: str = "Id",
+                           page_size: int = 200, prefetch: int = 2) -> AsyncIterator[Record]:
+        """
+        Stream all matching records one at a time (see iter_pages).
+
+        Usage:
+            async for record in client.iter_records(table_id, where_eq("Paid", False)):
+                ...
+        """
+        async for page in self.iter_pages(table_id, where, fields, sort, page_size, prefetch):
+            for record in page:
+                yield record
+
+    async def find(self, table_id: str, where: str,
+                   fields: Optional[List[str]] = None) -> Optional[Record]:
+        """Fetch first record matching `where`, or None"""
+        records = await self.list(table_id, where=where, fields=fields, limit=1)
+        return records[0] if records else None
+
+    async def count(self, table_id: str, where: Optional[str] = None) -> int:
+        """Count records matching `where` (server-side, no rows transferred)"""
+        params = {"where": where} if where else None
+        data = await self._request("GET", self._records_url(table_id, "/count"), params=params)
+        return int(data.get("count", 0))
+
+    async def create(self, table_id: str, fields: Dict[str, Any]) -> str:
+        """
+        Create record.
+
+        Returns:
+            New record ID
+        """
+        data = await self._request("POST", self._records_url(table_id), json=fields)
+        return Record.from_api(data).id
+
+    async def bulk_create(self, table_id: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create multiple records in one request.
+
+        Returns:
+            New record IDs in the same order as `rows`
+        """
+        if not rows:
+            return []
+        data = await self._request("POST", self._records_url(table_id), json=rows)
+        return [Record.from_api(item).id for item in data]
+
+    async def update(self, table_id: str, record_id: str, fields: Dict[str, Any]) -> None:
+        """Update fields of a single record"""
+        await self._request("PATCH", self._records_url(table_id), json={"Id": record_id, **fields})
+
+    async def bulk_update(self, table_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Update multiple records in one request (each row must contain `Id`)"""
+        if rows:
+            await self._request("PATCH", self._records_url(table_id), json=rows)
+
+
+def get_nocodb_client() -> NocoDBClient:
+    """Get global NocoDB client instance (convenience function)"""
+    return NocoDBClient.get_instance()
@@ -1,11 +1,20 @@
 """
 Utility functions for NocoDB API requests with retry logic.
+
+Identical concurrent GETs (same method, URL, normalized params and headers)
+are coalesced: the first caller sends the request, callers arriving while it
+is in flight share its response instead of spending the rate limit again.
 """
 import asyncio
+import logging
 import random
+import re
+import time
 import httpx
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from bot_flow.flows.rate_limiter import RateLimiter
+from bot_flow.flows.request_logging import logger
+from bot_flow.flows.circuit_breaker import CircuitBreakerRegistry, CircuitOpenError
 
 
 # Global connection pool (singleton pattern)
@@ -16,13 +25,46 @@ _request_counter = {
     'total': 0,
     'success': 0,
     'failed': 0,
-    'rate_limited': 0
+    'rate_limited': 0,
+    'gets': 0,  # GET calls (coalescing candidates)
+    'coalesced': 0  # GET calls served by an identical request already in flight
 }
 
+# In-flight GETs: coalescing key -> request shared by identical callers
+_inflight_gets: Dict[Tuple, asyncio.Future] = {}
+
+
+# Sentinel for "JSON not decoded yet" (None is a valid JSON value)
+_NOT_PARSED = object()
+
 
 def get_request_stats() -> dict:
-    """Get current request statistics"""
-    return _request_counter.copy()
+    """Get current request statistics (including GET coalescing rate)"""
+    stats = _request_counter.copy()
+    gets = stats['gets']
+    stats['coalesce_rate'] = f"{(stats['coalesced'] / gets * 100) if gets else 0:.1f}%"
+    stats['in_flight_gets'] = len(_inflight_gets)
+    return stats
+
+
+def response_json(response: httpx.Response) -> Any:
+    """
+    Decode response JSON once and cache it on the response object.
+
+    Both request logging and the caller need the parsed body; this helper
+    guarantees the body is only decoded a single time.
+
+    Args:
+        response: httpx.Response returned by nocodb_request_with_retry
+
+    Returns:
+        Parsed JSON body
+    """
+    data = getattr(response, 'parsed_json', _NOT_PARSED)
+    if data is _NOT_PARSED:
+        data = response.json()
+        response.parsed_json = data
+    return data
 
 
 async def get_client_pool() -> httpx.AsyncClient:
@@ -52,6 +94,77 @@ async def close_client_pool() -> None:
         _client_pool = None
 
 
+def _endpoint_key(method: str, url: str) -> str:
+    """
+    Build circuit breaker key from method and URL.
+
+    Record IDs are collapsed so that all single-record calls on a table share
+    one breaker: "GET tables/abc/records/42" -> "GET tables/abc/records/{id}".
+    "records/count" is an endpoint of its own and keeps its literal path.
+    """
+    path = url.split('/api/v2/', 1)[-1].split('?', 1)[0]
+    path = re.sub(r'/records/(?!count$)[^/]+$', '/records/{id}', path)
+    return f"{method.upper()} {path}"
+
+
+def _coalesce_key(method: str, url: str, headers: dict, max_retries: int, base_delay: float,
+                  kwargs: dict) -> Optional[Tuple]:
+    """
+    Key of a request that may share a response with identical concurrent ones.
+
+    Only GETs without a body qualify. Query parameters are normalized (merged
+    with the URL query and sorted), so param order does not matter.
+
+    Returns:
+        Hashable key, or None if the request must not be coalesced
+    """
+    if method.upper() != 'GET':
+        return None
+    if any(kwargs.get(name) is not None for name in ('json', 'content', 'data', 'files')):
+        return None
+    options = tuple(sorted((name, repr(value)) for name, value in kwargs.items() if name != 'params'))
+    full_url = httpx.URL(url, params=kwargs.get('params'))
+    params = tuple(sorted(full_url.params.multi_items()))
+    return (str(full_url.copy_with(query=None)), params, tuple(sorted(headers.items())),
+            max_retries, base_delay, options)
+
+
+# Headers describing the wire encoding, not the already decoded body
+_WIRE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+
+def _copy_response(response: httpx.Response) -> httpx.Response:
+    """
+    Response with the same status, headers and body but its own decoded JSON.
+
+    `response.content` is already decompressed, so the copy drops the wire
+    encoding headers (otherwise httpx would try to decompress it again).
+    """
+    headers = [(name, value) for name, value in response.headers.multi_items()
+               if name.lower() not in _WIRE_HEADERS]
+    return httpx.Response(
+        response.status_code,
+        headers=headers,
+        content=response.content,
+        request=response.request
+    )
+
+
+def _inflight_done(key: Tuple, future: asyncio.Future) -> None:
+    """Clear in-flight slot (errors are raised to the callers, not logged here)"""
+    if _inflight_gets.get(key) is future:
+        del _inflight_gets[key]
+    if not future.cancelled():
+        future.exception()  # Mark retrieved even if every caller was cancelled
+
+
+def _retry_delay(base_delay: float, attempt: int) -> float:
+    """Exponential backoff with 0-30% jitter: 3s, 6s, 12s, 24s, 48s"""
+    exponential_delay = base_delay * (2 ** attempt)
+    jitter = random.uniform(0, exponential_delay * 0.3)
+    return exponential_delay + jitter
+
+
 async def nocodb_request_with_retry(
     method: str,
     url: str,
@@ -63,6 +176,14 @@ async def nocodb_request_with_retry(
     """
     Make HTTP request to NocoDB with exponential backoff + jitter for 429 errors.
 
+    Requests go through a per-endpoint circuit breaker: while NocoDB keeps
+    failing the circuit opens and requests fail fast with CircuitOpenError.
+    Retries are additionally limited by a process-wide retry budget.
+
+    A GET identical to one already in flight is not sent again: the caller
+    waits for the in-flight request and gets a copy of its response (or its
+    error). A caller that is cancelled does not cancel the shared request.
+
     Args:
         method: HTTP method (GET, POST, PATCH, etc.)
         url: Request URL
@@ -75,141 +196,163 @@ async def nocodb_request_with_retry(
         httpx.Response object
 
     Raises:
-        httpx.HTTPStatusError: For non-429 HTTP errors
+        CircuitOpenError: If the endpoint circuit is open
+        httpx.HTTPStatusError: For 429 errors after retries (or retry budget) exhausted
         Exception: For other errors after all retries exhausted
     """
-    import time
-    from datetime import datetime
+    key = _coalesce_key(method, url, headers, max_retries, base_delay, kwargs)
+    if key is None:
+        return await _request_with_retry(method, url, headers, max_retries, base_delay, **kwargs)
+
+    _request_counter['gets'] += 1
+    future = _inflight_gets.get(key)
+    if future is not None:
+        _request_counter['coalesced'] += 1
+        return _copy_response(await asyncio.shield(future))
 
+    future = asyncio.ensure_future(
+        _request_with_retry(method, url, headers, max_retries, base_delay, **kwargs)
+    )
+    _inflight_gets[key] = future
+    future.add_done_callback(lambda done: _inflight_done(key, done))
+    return await asyncio.shield(future)
+
+
+async def _request_with_retry(
+    method: str,
+    url: str,
+    headers: dict,
+    max_retries: int,
+    base_delay: float,
+    **kwargs
+) -> httpx.Response:
+    """Send request with rate limiting, circuit breaker and retries (see nocodb_request_with_retry)"""
     # Get rate limiter singleton
     rate_limiter = RateLimiter.get_instance()
 
     # Get shared client pool
     client = await get_client_pool()
 
-    # Extract endpoint name for logging (clean URL)
-    endpoint = url.replace('https://app.nocodb.com', '').replace('/api/v2/tables/', 'tables/')
-    if len(endpoint) > 60:
-        endpoint = endpoint[:57] + '...'
-
-    # Extract params/body for logging
-    params = kwargs.get('params', {})
-    json_data = kwargs.get('json', {})
+    # Circuit breaker for this endpoint + shared retry budget
+    endpoint = _endpoint_key(method, url)
+    breakers = CircuitBreakerRegistry.get_instance()
+    breaker = breakers.get_breaker(endpoint)
+    retry_budget = breakers.retry_budget
 
     for attempt in range(max_retries + 1):
+        probe = False
         try:
+            # Fail fast while endpoint circuit is open (raises CircuitOpenError)
+            probe = breaker.before_request()
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "nocodb request",
+                    extra={'endpoint': endpoint, 'attempt': attempt,
+                           'params': kwargs.get('params'), 'body': kwargs.get('json')}
+                )
+
             # Apply rate limiting before request
-            start_time = time.time()
-            timestamp = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-
-            # Log outgoing request
-            print(f"\n📤 [{timestamp}] NocoDB Request:")
-            print(f"   Method: {method}")
-            print(f"   Endpoint: {endpoint}")
-            if params:
-                # Format params nicely
-                params_str = ", ".join(f"{k}={v}" for k, v in params.items())
-                if len(params_str) > 100:
-                    params_str = params_str[:97] + '...'
-                print(f"   Params: {params_str}")
-            if json_data:
-                # Show json body (truncated)
-                json_str = str(json_data)
-                if len(json_str) > 150:
-                    json_str = json_str[:147] + '...'
-                print(f"   Body: {json_str}")
+            start_time = time.monotonic()
 
             async with rate_limiter:
                 response = await client.request(method, url, headers=headers, **kwargs)
 
                 # Update counters
+                status = response.status_code
                 _request_counter['total'] += 1
-
-                # Log response
-                duration = time.time() - start_time
-                timestamp_end = datetime.now().strftime('%H:%M:%S.%f')[:-3]
-
-                # Choose emoji based on status
-                if response.status_code < 300:
-                    status_emoji = "✅"
+                if status < 300:
                     _request_counter['success'] += 1
-                elif response.status_code == 429:
-                    status_emoji = "🚫"
+                    level = logging.INFO
+                elif status == 429:
                     _request_counter['rate_limited'] += 1
-                elif response.status_code < 500:
-                    status_emoji = "⚠️"
-                    _request_counter['failed'] += 1
+                    level = logging.WARNING
                 else:
-                    status_emoji = "❌"
                     _request_counter['failed'] += 1
-
-                print(f"{status_emoji} [{timestamp_end}] NocoDB Response: {response.status_code} in {duration:.3f}s")
-
-                # Show response size
-                content_length = response.headers.get('content-length', 'unknown')
-                print(f"   Size: {content_length} bytes")
-
-                # For list responses, show count
-                if response.status_code < 300:
-                    try:
-                        data = response.json()
-                        if 'list' in data:
-                            print(f"   Records: {len(data['list'])}")
-                        elif 'id' in data or 'Id' in data:
-                            print(f"   Record ID: {data.get('id') or data.get('Id')}")
-                    except:
-                        pass
-
-                # Show cumulative stats
-                print(f"   📊 Total requests: {_request_counter['total']} " +
-                      f"(✅ {_request_counter['success']}, " +
-                      f"❌ {_request_counter['failed']}, " +
-                      f"🚫 {_request_counter['rate_limited']})")
+                    level = logging.WARNING
+
+                # Log response (no-op unless level is enabled)
+                if logger.isEnabledFor(level):
+                    fields = {
+                        'endpoint': endpoint,
+                        'status': status,
+                        'duration_ms': round((time.monotonic() - start_time) * 1000),
+                        'size': response.headers.get('content-length'),
+                    }
+                    if status < 300 and logger.isEnabledFor(logging.DEBUG):
+                        # Decoded once and cached on the response for the caller
+                        data = response_json(response)
+                        if isinstance(data, dict) and 'list' in data:
+                            fields['records'] = len(data['list'])
+                    logger.log(level, "nocodb response", extra=fields)
 
                 # Check for 429 - too many requests
-                if response.status_code == 429:
-                    if attempt < max_retries:
-                        # Calculate delay with exponential backoff + jitter
-                        exponential_delay = base_delay * (2 ** attempt)  # 3s, 6s, 12s, 24s, 48s
-                        jitter = random.uniform(0, exponential_delay * 0.3)  # Add 0-30% jitter
-                        delay = exponential_delay + jitter
-
-                        # Check for Retry-After header
-                        retry_after = response.headers.get('Retry-After')
-                        if retry_after:
-                            try:
-                                # Retry-After can be seconds or HTTP date
-                                retry_delay = float(retry_after)
-                                delay = max(delay, retry_delay)  # Use larger of the two
-                                print(f"⚠️  Rate limit (429), Retry-After: {retry_delay}s")
-                            except ValueError:
-                                pass  # Ignore if not a number
-
-                        print(f"⚠️  Rate limit (429) from NocoDB, retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+                if status == 429:
+                    # Check for Retry-After header
+                    retry_delay = None
+                    retry_after = response.headers.get('Retry-After')
+                    if retry_after:
+                        try:
+                            # Retry-After can be seconds or HTTP date
+                            retry_delay = float(retry_after)
+                        except ValueError:
+                            pass  # Ignore if not a number
+
+                    breaker.record_failure(retry_after=retry_delay)
+                    probe = False
+
+                    if attempt < max_retries and retry_budget.try_acquire():
+                        # Use larger of backoff and Retry-After
+                        delay = max(_retry_delay(base_delay, attempt), retry_delay or 0.0)
+
+                        logger.warning(
+                            "nocodb rate limited, retrying",
+                            extra={'endpoint': endpoint, 'delay': round(delay, 1),
+                                   'attempt': attempt + 1, 'max_retries': max_retries}
+                        )
                         await asyncio.sleep(delay)
                         continue  # Retry
                     else:
-                        print(f"❌ Rate limit (429) exceeded max retries")
+                        logger.error(
+                            "nocodb rate limit exceeded max retries or retry budget",
+                            extra={'endpoint': endpoint}
+                        )
                         response.raise_for_status()  # This will raise HTTPStatusError
 
+                if status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                    retry_budget.deposit()
+                probe = False
+
                 return response
 
-        except httpx.HTTPStatusError:
-            # Re-raise HTTP errors (including 429 after max retries)
+        except (httpx.HTTPStatusError, CircuitOpenError):
+            # Re-raise HTTP errors (including 429 after max retries) and open circuits
             raise
         except Exception as e:
-            if attempt < max_retries:
+            breaker.record_failure()
+            probe = False
+
+            if attempt < max_retries and retry_budget.try_acquire():
                 # Apply exponential backoff + jitter for other errors
-                exponential_delay = base_delay * (2 ** attempt)
-                jitter = random.uniform(0, exponential_delay * 0.3)
-                delay = exponential_delay + jitter
+                delay = _retry_delay(base_delay, attempt)
 
-                print(f"⚠️  Request error: {e}, retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+                logger.warning(
+                    "nocodb request error, retrying",
+                    extra={'endpoint': endpoint, 'error': repr(e), 'delay': round(delay, 1),
+                           'attempt': attempt + 1, 'max_retries': max_retries}
+                )
                 await asyncio.sleep(delay)
                 continue
             else:
-                # Re-raise after max retries
+                # Re-raise after max retries (or retry budget exhausted)
                 raise
+        finally:
+            # Probe ended without an outcome (cancelled): free its half-open slot
+            if probe:
+                breaker.release_probe()
 
     # Should not reach here
     raise Exception("Unexpected error in nocodb_request_with_retry")
@@ -0,0 +1,517 @@
+"""
+Durable write-ahead outbox for NocoDB mutations.
+
+Mutations are appended to a local SQLite journal first and acknowledged
+immediately with a provisional ID ("local:<n>"). A background task flushes
+pending rows to NocoDB in bulk batches with retries and exponential backoff,
+then reconciles provisional IDs to real record IDs.
+
+Registration therefore completes instantly even during 429 lockouts,
+timeouts or outages, and survives bot restarts (pending rows are flushed
+on the next start).
+
+A failed bulk insert may still have been committed by NocoDB (e.g. a
+timeout after the write). With a `dedup_field`, retried creates whose value
+already exists in the table are reconciled to the existing record instead of
+being inserted again. A batch rejected with a client error (4xx) is resent
+row by row, so only the invalid rows are given up.
+
+Usage:
+    outbox = WriteOutbox("data/outbox.db", get_nocodb_client(), dedup_field="TG ID")
+    outbox.on_reconciled(callback)        # fn(provisional_id, record_id, fields)
+    await outbox.start()
+
+    record_id = outbox.enqueue_create(table_id, {"TG ID": user_id, "Paid": False})
+    # -> "local:17" now, reconciled to e.g. "342" after flush
+
+    await outbox.stop()                   # Waits for the flush in flight, then a final flush
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from bot_flow.flows.metrics import MetricsCollector
+from bot_flow.flows.nocodb_client import Record, where_in
+
+# Prefix of provisional IDs returned before the record exists in NocoDB
+PROVISIONAL_PREFIX = "local:"
+
+# Client errors that will not succeed on retry (except 429, which is transient)
+_PERMANENT_STATUS = range(400, 500)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    local_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_id TEXT NOT NULL,
+    op TEXT NOT NULL,
+    target TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    record_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, next_attempt_at);
+"""
+
+
+def is_provisional(record_id: Any) -> bool:
+    """Whether record ID is a provisional outbox ID (not yet in NocoDB)"""
+    return isinstance(record_id, str) and record_id.startswith(PROVISIONAL_PREFIX)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Whether error is a client error that will not succeed on retry"""
+    return (
+        isinstance(error, httpx.HTTPStatusError) and
+        error.response.status_code in _PERMANENT_STATUS and
+        error.response.status_code != 429
+    )
+
+
+class WriteOutbox:
+    """
+    SQLite-backed append-only outbox with background bulk flushing.
+
+    Supported mutations: create (returns provisional ID) and update (may target
+    a provisional ID; applied after the create is flushed).
+    """
+
+    def __init__(self, path: str, client, window: float = 0.1, batch_size: int = 50,
+                 max_attempts: int = 5, max_backoff: float = 300.0, stop_timeout: float = 60.0,
+                 dedup_field: Optional[str] = None):
+        """
+        Initialize outbox (creates database if missing).
+
+        Args:
+            path: SQLite file path (":memory:" for tests)
+            client: NocoDBClient used for bulk_create / bulk_update
+            window: Seconds to wait for more mutations before flushing
+            batch_size: Max rows per bulk request
+            max_attempts: Attempts before a row failing with a client error (4xx) is given up
+            max_backoff: Max delay between retries in seconds
+            stop_timeout: Max seconds stop() waits for a flush in flight
+            dedup_field: Field identifying a created record (e.g. "TG ID"); retried
+                creates whose value already exists in the table are not inserted again
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.client = client
+        self.window = window
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.stop_timeout = stop_timeout
+        self.dedup_field = dedup_field
+
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.db.commit()
+
+        self._callbacks: List[Callable[[str, str, Dict[str, Any]], Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.running = False
+
+        self.stats = {
+            'enqueued': 0,
+            'flushed': 0,
+            'batches': 0,
+            'retries': 0,
+            'failed': 0,
+            'deduplicated': 0,
+            'last_error': None
+        }
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    def _append(self, table_id: str, op: str, payload: Dict[str, Any],
+                target: Optional[str] = None) -> int:
+        cursor = self.db.execute(
+            "INSERT INTO outbox (table_id, op, target, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (table_id, op, target, json.dumps(payload, ensure_ascii=False), time.time())
+        )
+        self.db.commit()
+        self.stats['enqueued'] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return cursor.lastrowid
+
+    def enqueue_create(self, table_id: str, fields: Dict[str, Any]) -> str:
+        """
+        Durably queue record creation.
+
+        Returns:
+            Provisional record ID ("local:<n>")
+        """
+        return f"{PROVISIONAL_PREFIX}{self._append(table_id, 'create', fields)}"
+
+    def enqueue_update(self, table_id: str, record_id: str, fields: Dict[str, Any]) -> None:
+        """Durably queue update of a (real or provisional) record"""
+        self._append(table_id, 'update', fields, target=str(record_id))
+
+    def resolve(self, record_id: str) -> Optional[str]:
+        """
+        Map ID to real NocoDB record ID.
+
+        Returns:
+            Real ID (unchanged if not provisional), or None if not flushed yet
+        """
+        if not is_provisional(record_id):
+            return record_id
+        row = self.db.execute(
+            "SELECT record_id FROM outbox WHERE local_id = ? AND status = 'done'",
+            (int(record_id[len(PROVISIONAL_PREFIX):]),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def find_pending_create(self, table_id: str, field: str, value: Any) -> Optional[Record]:
+        """
+        Find a queued create not flushed yet, by a field of its payload.
+
+        Until the flush, the record exists neither in NocoDB nor in the
+        replica; lookups must check here so a repeated registration during an
+        outage is not queued twice.
+
+        Args:
+            table_id: Table of the create
+            field: Payload field (e.g. "TG ID")
+            value: Field value
+
+        Returns:
+            Record with the provisional ID and queued fields, or None
+        """
+        row = self.db.execute(
+            "SELECT local_id, payload FROM outbox "
+            "WHERE status = 'pending' AND op = 'create' AND table_id = ? "
+            "AND json_extract(payload, ?) = ? ORDER BY local_id LIMIT 1",
+            (table_id, f'$."{field}"', value)
+        ).fetchone()
+        if row is None:
+            return None
+        return Record(f"{PROVISIONAL_PREFIX}{row[0]}", json.loads(row[1]))
+
+    def on_reconciled(self, callback: Callable[[str, str, Dict[str, Any]], Any]) -> None:
+        """
+        Register callback for flushed creates.
+
+        Called as callback(provisional_id, record_id, fields); may be sync or async.
+        """
+        self._callbacks.append(callback)
+
+    def pending_count(self) -> int:
+        """Number of mutations not yet flushed"""
+        return self.db.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start background flushing (flushes rows left from previous runs first)"""
+        if self.running:
+            return
+        self.running = True
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+        pending = self.pending_count()
+        print(f"📮 Outbox started ({pending} pending mutations)")
+
+    async def stop(self) -> None:
+        """
+        Stop background flushing after a final flush attempt.
+
+        A bulk insert in flight is awaited (up to stop_timeout), not
+        cancelled: NocoDB may already have committed it, and rows left
+        'pending' would be inserted again on the next start.
+        """
+        self.running = False
+        if self._task:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout=self.stop_timeout)
+            except asyncio.TimeoutError:
+                print(f"⚠️  Outbox flush still running after {self.stop_timeout:.0f}s, cancelling it")
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"⚠️  Final outbox flush failed: {e}")
+        print(f"🛑 Outbox stopped ({self.pending_count()} pending mutations kept for next start)")
+
+    async def _flush_loop(self) -> None:
+        """Flush when woken by new mutations (after `window`) or when retries are due"""
+        while self.running:
+            try:
+                timeout = self._next_retry_delay()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    if not self.running:
+                        break  # Woken by stop(), which does the final flush
+                    await asyncio.sleep(self.window)  # Collect more mutations into the batch
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                while self.running and await self.flush():
+                    pass  # Keep flushing while full batches succeed
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"❌ Error in outbox flush loop: {e}")
+                await asyncio.sleep(1)
+
+    def _next_retry_delay(self) -> Optional[float]:
+        """Seconds until the earliest pending row becomes due (None = nothing pending)"""
+        row = self.db.execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return max(row[0] - time.time(), 0.0)
+
+    async def flush(self) -> int:
+        """
+        Flush one batch of due mutations (creates first, then updates).
+
+        Batches never overlap: a flush waits for the one in progress, so the
+        same rows are not sent twice.
+
+        Returns:
+            Number of mutations flushed
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            return await self._flush_batch()
+
+    async def _flush_batch(self) -> int:
+        rows = self.db.execute(
+            "SELECT local_id, table_id, op, target, payload, attempts FROM outbox "
+            "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY local_id LIMIT ?",
+            (time.time(), self.batch_size)
+        ).fetchall()
+        if not rows:
+            return 0
+
+        flushed = 0
+        groups: Dict[tuple, list] = {}
+        for row in rows:
+            groups.setdefault((row[2], row[1]), []).append(row)
+
+        for (op, table_id), group in sorted(groups.items(), key=lambda item: item[0][0] != 'create'):
+            if op == 'create':
+                flushed += await self._flush_creates(table_id, group)
+            elif op == 'update':
+                flushed += await self._flush_updates(table_id, group)
+        return flushed
+
+    async def _flush_creates(self, table_id: str, rows: list) -> int:
+        flushed = 0
+        if self.dedup_field and any(row[5] for row in rows):
+            # An earlier attempt may have been committed despite failing
+            try:
+                rows, flushed = await self._reconcile_existing(table_id, rows)
+            except Exception as e:
+                self._mark_failed(rows, e)
+                return 0
+        if rows:
+            flushed += await self._insert_creates(table_id, rows)
+        return flushed
+
+    async def _insert_creates(self, table_id: str, rows: list) -> int:
+        payloads = [json.loads(row[4]) for row in rows]
+        try:
+            record_ids = await self.client.bulk_create(table_id, payloads)
+            if len(record_ids) != len(rows):
+                raise RuntimeError(f"bulk insert returned {len(record_ids)} IDs for {len(rows)} records")
+        except Exception as e:
+            if len(rows) > 1 and _is_permanent(e):
+                # Rejected as a whole: resend row by row so only invalid rows fail
+                print(f"⚠️  Outbox: bulk insert of {len(rows)} record(s) rejected, retrying one by one: {e}")
+                flushed = 0
+                for row in rows:
+                    flushed += await self._insert_creates(table_id, [row])
+                return flushed
+            self._mark_failed(rows, e)
+            return 0
+
+        await self._mark_created(table_id, rows, record_ids, payloads)
+        print(f"📤 Outbox: created {len(rows)} record(s) in {table_id}")
+        return len(rows)
+
+    async def _reconcile_existing(self, table_id: str, rows: list) -> tuple:
+        """
+        Reconcile retried creates already present in NocoDB (matched by dedup_field).
+
+        Returns:
+            (rows still to insert, number of rows reconciled to existing records)
+        """
+        field = self.dedup_field
+        payloads = {row[0]: json.loads(row[4]) for row in rows}
+        keys = {
+            str(payloads[row[0]][field]) for row in rows
+            if row[5] and payloads[row[0]].get(field) is not None
+        }
+        if not keys:
+            return rows, 0
+
+        records = await self.client.list(
+            table_id, where=where_in(field, sorted(keys)), fields=["Id", field], limit=len(keys)
+        )
+        existing = {str(record.get(field)): record.id for record in records}
+
+        found, remaining = [], []
+        for row in rows:
+            key = payloads[row[0]].get(field)
+            if row[5] and key is not None and str(key) in existing:
+                found.append(row)
+            else:
+                remaining.append(row)
+        if found:
+            await self._mark_created(
+                table_id, found,
+                [existing[str(payloads[row[0]][field])] for row in found],
+                [payloads[row[0]] for row in found]
+            )
+            self.stats['deduplicated'] += len(found)
+            print(f"📎 Outbox: {len(found)} record(s) already in {table_id} "
+                  f"(earlier insert was committed), not inserted again")
+        return remaining, len(found)
+
+    async def _mark_created(self, table_id: str, rows: list, record_ids: list, payloads: list) -> None:
+        """Store real record IDs of flushed creates and run reconciliation callbacks"""
+        self.db.executemany(
+            "UPDATE outbox SET status = 'done', record_id = ?, last_error = NULL WHERE local_id = ?",
+            [(str(record_id), row[0]) for row, record_id in zip(rows, record_ids)]
+        )
+        self.db.commit()
+        self._record_batch(table_id, len(rows))
+
+        for row, record_id, fields in zip(rows, record_ids, payloads):
+            await self._notify(f"{PROVISIONAL_PREFIX}{row[0]}", str(record_id), fields)
+
+    async def _flush_updates(self, table_id: str, rows: list) -> int:
+        ready, waiting = [], []
+        for row in rows:
+            record_id = self.resolve(row[3])
+            if record_id is None:
+                waiting.append(row)  # Create not flushed yet
+                continue
+            ready.append(row)
+
+        if waiting:
+            # Retry together with the create (or give up if the create was given up)
+            self.db.executemany(
+                "UPDATE outbox SET status = CASE WHEN ("
+                "  SELECT status FROM outbox AS c WHERE 'local:' || c.local_id = outbox.target"
+                ") = 'failed' THEN 'failed' ELSE status END, "
+                "next_attempt_at = ? WHERE local_id = ?",
+                [(time.time() + max(self.window, 1.0), row[0]) for row in waiting]
+            )
+            self.db.commit()
+
+        if not ready:
+            return 0
+        return await self._send_updates(table_id, ready)
+
+    async def _send_updates(self, table_id: str, rows: list) -> int:
+        payloads = [{"Id": self.resolve(row[3]), **json.loads(row[4])} for row in rows]
+        try:
+            await self.client.bulk_update(table_id, payloads)
+        except Exception as e:
+            if len(rows) > 1 and _is_permanent(e):
+                # Rejected as a whole: resend row by row so only invalid rows fail
+                flushed = 0
+                for row in rows:
+                    flushed += await self._send_updates(table_id, [row])
+                return flushed
+            self._mark_failed(rows, e)
+            return 0
+
+        self.db.executemany(
+            "UPDATE outbox SET status = 'done', last_error = NULL WHERE local_id = ?",
+            [(row[0],) for row in rows]
+        )
+        self.db.commit()
+        self._record_batch(table_id, len(rows))
+        return len(rows)
+
+    def _record_batch(self, table_id: str, size: int) -> None:
+        self.stats['flushed'] += size
+        self.stats['batches'] += 1
+        MetricsCollector.get_instance().record_batch(f"outbox:{table_id}", size)
+
+    def _mark_failed(self, rows: list, error: Exception) -> None:
+        """Schedule retry with exponential backoff (give up on repeated client errors)"""
+        retry_after = getattr(error, 'retry_after', None)  # CircuitOpenError
+        permanent = _is_permanent(error)
+        now = time.time()
+        updates = []
+        for row in rows:
+            attempts = row[5] + 1
+            give_up = permanent and attempts >= self.max_attempts
+            delay = retry_after or min(2 ** attempts, self.max_backoff)
+            updates.append(('failed' if give_up else 'pending', attempts, now + delay, str(error), row[0]))
+            if give_up:
+                self.stats['failed'] += 1
+                print(f"❌ Outbox: giving up on mutation {row[0]} after {attempts} attempts: {error}")
+
+        self.db.executemany(
+            "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+            "WHERE local_id = ?",
+            updates
+        )
+        self.db.commit()
+        self.stats['retries'] += len(rows)
+        self.stats['last_error'] = str(error)
+        print(f"⏳ Outbox: flush of {len(rows)} mutation(s) failed, will retry: {error}")
+
+    async def _notify(self, provisional_id: str, record_id: str, fields: Dict[str, Any]) -> None:
+        """Run reconciliation callbacks, logging errors"""
+        for callback in self._callbacks:
+            try:
+                result = callback(provisional_id, record_id, fields)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"❌ Error in outbox reconciliation callback for {provisional_id}: {e}")
+
+    def close(self) -> None:
+        """Close database connection"""
+        self.db.close()
+
+    def get_stats(self) -> dict:
+        """Get outbox statistics"""
+        return {
+            'pending': self.pending_count(),
+            'enqueued': self.stats['enqueued'],
+            'flushed': self.stats['flushed'],
+            'batches': self.stats['batches'],
+            'retries': self.stats['retries'],
+            'failed': self.stats['failed'],
+            'deduplicated': self.stats['deduplicated'],
+            'last_error': self.stats['last_error']
+        }
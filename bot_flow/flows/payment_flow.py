@@ -3,20 +3,40 @@ Declarative payment bot flow definition.
 
 This is the payment_bot.py reimplemented using the declarative FlowBuilder API.
 """
+import asyncio
+import datetime
+from typing import Optional
 from config import config
-from bot_flow.core import FlowBuilder, FlowContext
-from bot_flow.flows.texts_loader import load_texts_from_nocodb
-from bot_flow.flows.config_loader import load_config_from_nocodb
-from bot_flow.flows.nocodb_utils import nocodb_request_with_retry
+from bot_flow.core import FlowBuilder, FlowContext, AdaptivePollingPolicy
+from bot_flow.flows.content_registry import get_content_registry
+from bot_flow.flows.cache_manager import CacheJanitor, CacheManager
+from bot_flow.flows.nocodb_client import Record, get_nocodb_client, where_eq, where_in
+from bot_flow.flows.global_payment_tracker import parse_timestamp
+from bot_flow.flows.outbox import WriteOutbox
+from bot_flow.flows.replica import PaymentsReplica
+from bot_flow.flows.membership import RegisteredUsersFilter
 
 # NocoDB configuration from centralized config
 NOCODB_API_URL = config.NOCODB_API_URL
 NOCODB_API_TOKEN = config.NOCODB_API_TOKEN
 NOCODB_TABLE_ID = config.NOCODB_TABLE_ID
 
-# Global storage (loaded from NocoDB at startup)
-TEXTS = {}
-CONFIG = {}
+# /stats caching: totals are refreshed often, breakdowns less often
+STATS_CACHE_TTL = 30.0
+STATS_BREAKDOWN_TTL = 300.0
+STATS_BREAKDOWN_DAYS = 7
+
+# Durable outbox for payment record creates (created on first use)
+_outbox: Optional[WriteOutbox] = None
+
+# Local read replica of the payments table (created on first use)
+_replica: Optional[PaymentsReplica] = None
+
+# Bloom filter of registered TG IDs (created on first use)
+_registered_users: Optional[RegisteredUsersFilter] = None
+
+# Texts and config (one fetch of the shared content table, see content_registry)
+content = get_content_registry()
 
 
 # ============================================================================
@@ -35,6 +55,64 @@ async def save_fullname_from_message(ctx: FlowContext) -> None:
         print(f"⚠️ No fullname provided, using fallback: {ctx.user.first_name}")
 
 
+def get_outbox() -> WriteOutbox:
+    """
+    Get outbox for NocoDB writes.
+
+    Mutations are journaled locally and flushed in bulk batches (window in ms
+    or N records) with retries, so registration never waits for NocoDB.
+    Retried registrations already committed by NocoDB are matched by TG ID.
+    """
+    global _outbox
+    if _outbox is None:
+        _outbox = WriteOutbox(
+            config.OUTBOX_FILE,
+            get_nocodb_client(),
+            window=config.NOCODB_WRITE_WINDOW_MS / 1000,
+            batch_size=config.NOCODB_WRITE_MAX_BATCH,
+            dedup_field="TG ID"
+        )
+    return _outbox
+
+
+def get_replica() -> Optional[PaymentsReplica]:
+    """
+    Get local read replica of the payments table.
+
+    Returns:
+        Replica, or None if NocoDB or the replica file is not configured
+    """
+    global _replica
+    if _replica is None and NOCODB_API_TOKEN and NOCODB_TABLE_ID and config.PAYMENTS_REPLICA_FILE:
+        _replica = PaymentsReplica(
+            config.PAYMENTS_REPLICA_FILE,
+            get_nocodb_client(),
+            NOCODB_TABLE_ID,
+            sync_interval=config.REPLICA_SYNC_INTERVAL
+        )
+    return _replica
+
+
+def get_registered_users() -> Optional[RegisteredUsersFilter]:
+    """
+    Get Bloom filter of registered Telegram IDs.
+
+    Returns:
+        Filter, or None if NocoDB is not configured or the filter is disabled
+    """
+    global _registered_users
+    if (_registered_users is None and NOCODB_API_TOKEN and NOCODB_TABLE_ID
+            and config.MEMBERSHIP_FILTER_CAPACITY > 0):
+        _registered_users = RegisteredUsersFilter(
+            get_nocodb_client(),
+            NOCODB_TABLE_ID,
+            capacity=config.MEMBERSHIP_FILTER_CAPACITY,
+            error_rate=config.MEMBERSHIP_FILTER_ERROR_RATE,
+            reload_interval=config.MEMBERSHIP_FILTER_RELOAD_INTERVAL
+        )
+    return _registered_users
+
+
 async def create_payment_record(ctx: FlowContext) -> None:
     """Create payment record in NocoDB and register in Global Payment Tracker"""
     if not NOCODB_API_TOKEN or not NOCODB_TABLE_ID:
@@ -42,15 +120,8 @@ async def create_payment_record(ctx: FlowContext) -> None:
         ctx.set('record_id', None)
         return
 
-    headers = {
-        "xc-token": NOCODB_API_TOKEN,
-        "Content-Type": "application/json"
-    }
-
     # Get payment amount from config (validated at startup, no default needed)
-    payment_amount = CONFIG["PAYMENT_AMOUNT"]
-    # Extract numeric value from string like "1000 рублей"
-    price = int(payment_amount.split()[0])
+    price = _current_price()
 
     # Get fullname from context (saved from message)
     fullname = ctx.get('fullname', ctx.user.first_name or "Unknown")
@@ -63,28 +134,58 @@ async def create_payment_record(ctx: FlowContext) -> None:
         "Paid": False
     }
 
-    try:
-        response = await nocodb_request_with_retry(
-            "POST",
-            f"{NOCODB_API_URL}/api/v2/tables/{NOCODB_TABLE_ID}/records",
-            headers=headers,
-            json=data,
-            timeout=15.0
-        )
-        response.raise_for_status()
-        result = response.json()
-        record_id = str(result.get("Id") or result.get("id"))
-        ctx.set('record_id', record_id)
-        print(f"✅ Created NocoDB record: {record_id} for user {ctx.user.id} ({fullname})")
+    # Journaled locally (instant, survives NocoDB outages and restarts);
+    # the provisional ID is reconciled to the real one after the background flush
+    record_id = get_outbox().enqueue_create(NOCODB_TABLE_ID, data)
+    ctx.set('record_id', record_id)
+    registered_users = get_registered_users()
+    if registered_users is not None:
+        registered_users.add(ctx.user.id)
+    print(f"✅ Queued NocoDB record: {record_id} for user {ctx.user.id} ({fullname})")
 
-        # Register in Global Payment Tracker for centralized monitoring
-        from bot_flow.flows.global_payment_tracker import get_global_tracker
-        tracker = get_global_tracker()
-        tracker.track_user(ctx.user.id, record_id)
+    # Register in Global Payment Tracker for centralized monitoring
+    from bot_flow.flows.global_payment_tracker import get_global_tracker
+    tracker = get_global_tracker()
+    tracker.track_user(ctx.user.id, record_id)
 
-    except Exception as e:
-        print(f"❌ Error creating NocoDB record: {e}")
-        ctx.set('record_id', None)
+
+async def restore_queued_registration(executor, tracker, record_id: str, fields: dict) -> None:
+    """
+    Put a user whose registration was queued before a restart back into awaiting_payment.
+
+    The record did not exist in NocoDB yet when awaiting users were restored
+    at startup, so neither the tracker nor the executor knows the user; once
+    the outbox flushes it, the user is tracked and restored like the others.
+
+    Args:
+        executor: Running FlowExecutor
+        tracker: GlobalPaymentTracker
+        record_id: Real NocoDB record ID
+        fields: Fields of the created record
+    """
+    user_id = int(fields["TG ID"])
+    tracker.track_user(user_id, record_id)
+    if user_id in executor.user_states:
+        return  # User interacted with the bot after the restart
+    await executor.restore_user_states([{
+        'tg_id': user_id,
+        'record_id': record_id,
+        'username': fields.get("TG", ""),
+        'first_name': fields.get("FullName", "Unknown"),
+        'created_at': None
+    }])
+
+
+async def reload_content() -> None:
+    """
+    Reload texts and config from cache (stale data triggers a background refresh).
+
+    Never raises: on error the previous texts and config stay in use.
+    """
+    try:
+        await content.load(use_cache=True)
+    except ValueError as e:
+        print(f"⚠️  Content reload failed, keeping current texts and config: {e}")
 
 
 async def reload_texts_and_config(ctx: FlowContext) -> None:
@@ -95,13 +196,11 @@ async def reload_texts_and_config(ctx: FlowContext) -> None:
     hit NocoDB API on every /start - only when cache expires.
     This reduces API load by ~95% for repeated /start commands.
     """
-    global TEXTS, CONFIG
-    TEXTS = await load_texts_from_nocodb(use_cache=True)
-    CONFIG = await load_config_from_nocodb(use_cache=True)
+    await content.load(use_cache=True)
 
     # Store in context for dynamic usage
-    ctx.set('texts', TEXTS)
-    ctx.set('config', CONFIG)
+    ctx.set('texts', content.texts)
+    ctx.set('config', content.config_values)
 
     # Don't log on every /start - only log on actual cache miss
     # (logging is done inside load_texts/config functions)
@@ -110,38 +209,41 @@ async def reload_texts_and_config(ctx: FlowContext) -> None:
 async def load_awaiting_payment_users() -> list:
     """
     Load all users from NocoDB who are awaiting payment (Paid = false).
-    Returns list of dicts with user data: [{tg_id, record_id, username, first_name}, ...]
+    Returns list of dicts with user data: [{tg_id, record_id, username, first_name, created_at}, ...]
+
+    With the payments replica enabled, runs its startup full sync and reads
+    from the local copy (the previous copy is used if NocoDB is unavailable).
+    Otherwise streams all pages (no 1000-row cap), prefetching pages concurrently.
     """
     if not NOCODB_API_TOKEN or not NOCODB_TABLE_ID:
         print("⚠️ NocoDB not configured, skipping user state restoration")
         return []
 
-    headers = {"xc-token": NOCODB_API_TOKEN}
-
     try:
-        response = await nocodb_request_with_retry(
-            "GET",
-            f"{NOCODB_API_URL}/api/v2/tables/{NOCODB_TABLE_ID}/records",
-            headers=headers,
-            params={
-                "where": "(Paid,eq,false)",  # Filter: Paid = false
-                "limit": 1000
-            },
-            timeout=15.0
-        )
-        response.raise_for_status()
-        data = response.json()
-        records = data.get("list", [])
+        replica = get_replica()
+        if replica is not None:
+            await replica.full_sync()
+
+        if replica is not None and replica.is_ready:
+            records = _iter_list(replica.awaiting_payment())
+        else:
+            records = get_nocodb_client().iter_records(
+                NOCODB_TABLE_ID,
+                where=where_eq("Paid", False),  # Filter: Paid = false
+                fields=["Id", "TG ID", "TG", "First Name", "CreatedAt"],
+                page_size=1000
+            )
 
         users = []
-        for record in records:
+        async for record in records:
             tg_id = record.get("TG ID")
             if tg_id:
                 users.append({
                     'tg_id': int(tg_id),
-                    'record_id': str(record.get("Id") or record.get("id")),
+                    'record_id': record.id,
                     'username': record.get("TG", ""),
-                    'first_name': record.get("First Name", "Unknown")
+                    'first_name': record.get("First Name", "Unknown"),
+                    'created_at': parse_timestamp(record.get("CreatedAt"))
                 })
 
         return users
@@ -151,10 +253,70 @@ async def load_awaiting_payment_users() -> list:
         return []
 
 
+async def _iter_list(items: list):
+    """Async iterator over a list (same interface as client.iter_records)"""
+    for item in items:
+        yield item
+
+
+def _current_price() -> int:
+    """Extract numeric price from PAYMENT_AMOUNT (e.g. "1000 рублей" -> 1000)"""
+    return content.payment_amount
+
+
+async def _fetch_statistics() -> dict:
+    """
+    Fetch registration totals with server-side counts (2 small requests).
+
+    Cost does not depend on table size - no rows are downloaded.
+    Served locally when the payments replica is ready.
+    """
+    replica = get_replica()
+    if replica is not None and replica.is_ready:
+        total, paid = replica.count(), replica.count(paid=True)
+        return {'total': total, 'paid': paid, 'unpaid': total - paid}
+
+    client = get_nocodb_client()
+    total, paid = await asyncio.gather(
+        client.count(NOCODB_TABLE_ID),
+        client.count(NOCODB_TABLE_ID, where_eq("Paid", True))
+    )
+    return {'total': total, 'paid': paid, 'unpaid': total - paid}
+
+
+async def _fetch_statistics_breakdown() -> dict:
+    """
+    Build per-day and paid-per-price breakdowns from the payments replica.
+
+    NocoDB has no group-by endpoint, so the breakdowns are only shown when the
+    replica is ready (no API calls); otherwise an empty dict is returned and
+    /stats shows totals only. Days are UTC dates like NocoDB's CreatedAt, price
+    buckets come from the data. Refreshed less often than totals
+    (see STATS_BREAKDOWN_TTL).
+    """
+    replica = get_replica()
+    if replica is None or not replica.is_ready:
+        return {}
+
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    days = [
+        (today - datetime.timedelta(days=offset)).isoformat()
+        for offset in range(STATS_BREAKDOWN_DAYS)
+    ]
+    return {
+        'per_day': replica.count_per_day(days),
+        'paid_per_price': replica.count_paid_per_price()
+    }
+
+
 async def get_statistics(ctx: FlowContext) -> None:
     """
     Get statistics from NocoDB and send to user.
     This command is only available to admins.
+
+    Totals use two server-side count requests cached for STATS_CACHE_TTL
+    seconds; per-day and per-price breakdowns are added when the payments
+    replica is ready. Concurrent /stats calls share a single refresh.
     """
     if not NOCODB_API_TOKEN or not NOCODB_TABLE_ID:
         await ctx.update.message.reply_text(
@@ -163,35 +325,38 @@ async def get_statistics(ctx: FlowContext) -> None:
         )
         return
 
-    headers = {
-        "xc-token": NOCODB_API_TOKEN
-    }
-
     try:
-        response = await nocodb_request_with_retry(
-            "GET",
-            f"{NOCODB_API_URL}/api/v2/tables/{NOCODB_TABLE_ID}/records",
-            headers=headers,
-            params={"limit": 1000},  # Get up to 1000 records
-            timeout=15.0
+        cache = CacheManager.get_instance()
+        stats, breakdown = await asyncio.gather(
+            cache.get_or_fetch('payment_stats', _fetch_statistics, ttl=STATS_CACHE_TTL),
+            cache.get_or_fetch('payment_stats_breakdown', _fetch_statistics_breakdown,
+                               ttl=STATS_BREAKDOWN_TTL)
         )
-        response.raise_for_status()
-        data = response.json()
-        records = data.get("list", [])
 
-        # Calculate statistics
-        total = len(records)
-        paid = sum(1 for r in records if r.get("Paid") is True)
-        unpaid = total - paid
+        breakdown_text = ""
+        if breakdown:
+            per_day = "\n".join(
+                f"   {day}: <b>{count}</b>" for day, count in breakdown['per_day'].items()
+            )
+            per_price = "\n".join(
+                f"   {price}: <b>{count}</b>" for price, count in breakdown['paid_per_price'].items()
+            )
+            breakdown_text = f"""
+📅 Заявки по дням (UTC):
+{per_day}
+
+💵 Оплачено по цене:
+{per_price}
+"""
 
         # Format message
         message = f"""
 📊 <b>Статистика регистраций</b>
 
-📝 Всего заявок: <b>{total}</b>
-✅ Оплачено: <b>{paid}</b>
-⏳ Ожидают оплаты: <b>{unpaid}</b>
-
+📝 Всего заявок: <b>{stats['total']}</b>
+✅ Оплачено: <b>{stats['paid']}</b>
+⏳ Ожидают оплаты: <b>{stats['unpaid']}</b>
+{breakdown_text}
 🔗 <a href="https://app.nocodb.com/#/wux6zxnq/pwt37o18yvtfeh6/mfaob33z2nnrxve/vwat61y3diobt3it">Открыть NocoDB</a>
 """
 
@@ -234,6 +399,11 @@ async def check_user_registration(ctx: FlowContext) -> None:
     - 'record_id': NocoDB record ID if found
 
     This runs immediately as an action (not polling).
+    Registrations still queued in the outbox count (so /start during an
+    outage does not register the user twice). Otherwise served from the
+    local payments replica when it is ready, else the registered users
+    filter answers "definitely not registered" for new users without an
+    API call; only possible hits are looked up in NocoDB.
     """
     if not NOCODB_API_TOKEN or not NOCODB_TABLE_ID:
         print("⚠️ NocoDB not configured, skipping registration check")
@@ -241,29 +411,29 @@ async def check_user_registration(ctx: FlowContext) -> None:
         ctx.set('payment_confirmed', False)
         return
 
-    headers = {
-        "xc-token": NOCODB_API_TOKEN
-    }
-
     try:
-        response = await nocodb_request_with_retry(
-            "GET",
-            f"{NOCODB_API_URL}/api/v2/tables/{NOCODB_TABLE_ID}/records",
-            headers=headers,
-            params={
-                "where": f"(TG ID,eq,{ctx.user.id})",
-                "limit": 1
-            },
-            timeout=15.0
-        )
-        response.raise_for_status()
-        data = response.json()
+        # Hot path of /start: local replica lookup, no API call
+        replica = get_replica()
+        registered_users = get_registered_users()
+        queued = get_outbox().find_pending_create(NOCODB_TABLE_ID, "TG ID", ctx.user.id)
+        if queued is not None:
+            record = queued  # Registration not flushed to NocoDB yet
+        elif replica is not None and replica.is_ready:
+            record = replica.find_by_tg_id(ctx.user.id)
+        elif registered_users is not None and not registered_users.might_contain(ctx.user.id):
+            record = None
+        else:
+            record = await get_nocodb_client().find(
+                NOCODB_TABLE_ID,
+                where_eq("TG ID", ctx.user.id),
+                fields=["Id", "Paid"]
+            )
+            if record is None and registered_users is not None and registered_users.is_ready:
+                registered_users.record_false_positive()
 
         # Check if any records found
-        records = data.get("list", [])
-        if records:
-            record = records[0]
-            record_id = str(record.get("Id") or record.get("id"))
+        if record:
+            record_id = record.id
             is_paid = record.get("Paid", False) is True
 
             # Store record info in context
@@ -296,38 +466,16 @@ async def batch_check_payment_status(record_ids: list) -> dict:
     if not NOCODB_API_TOKEN or not NOCODB_TABLE_ID or not record_ids:
         return {}
 
-    headers = {
-        "xc-token": NOCODB_API_TOKEN
-    }
-
     try:
-        # Build WHERE clause: (Id,in,id1,id2,id3)
-        ids_str = ",".join(str(rid) for rid in record_ids)
-        where_clause = f"(Id,in,{ids_str})"
-
-        response = await nocodb_request_with_retry(
-            "GET",
-            f"{NOCODB_API_URL}/api/v2/tables/{NOCODB_TABLE_ID}/records",
-            headers=headers,
-            params={
-                "where": where_clause,
-                "limit": len(record_ids),
-                "fields": "Id,Paid"  # Only fetch necessary fields
-            },
-            timeout=15.0
+        records = await get_nocodb_client().list(
+            NOCODB_TABLE_ID,
+            where=where_in("Id", record_ids),
+            fields=["Id", "Paid"],  # Only fetch necessary fields
+            limit=len(record_ids)
         )
-        response.raise_for_status()
-        data = response.json()
 
         # Parse results into dict
-        results = {}
-        records = data.get("list", [])
-        for record in records:
-            record_id = str(record.get("Id") or record.get("id"))
-            is_paid = record.get("Paid", False) is True
-            results[record_id] = is_paid
-
-        return results
+        return {record.id: record.get("Paid", False) is True for record in records}
 
     except Exception as e:
         print(f"❌ Error batch checking payment status: {e}")
@@ -343,6 +491,9 @@ async def check_payment_status(ctx: FlowContext) -> bool:
 
     300 users = 1 API request instead of 300!
 
+    Runs once when entering awaiting_payment; afterwards the executor is
+    notified by tracker events (no per-user polling loop).
+
     Returns True if paid, False otherwise.
     """
     from bot_flow.flows.global_payment_tracker import get_global_tracker
@@ -386,22 +537,27 @@ async def build_payment_flow() -> 'Flow':
     Raises:
         ValueError: If required texts or config are missing in NocoDB
     """
-    # Load texts and config from NocoDB (will raise ValueError if validation fails)
-    global TEXTS, CONFIG
-    print("\n📥 Loading texts and config from NocoDB...")
-    TEXTS = await load_texts_from_nocodb()
-    CONFIG = await load_config_from_nocodb()
-    print("✅ Texts and config validated successfully\n")
+    # Warm start from the local content snapshot (refreshed from NocoDB in the
+    # background once the bot runs); without a snapshot load from NocoDB
+    # (will raise ValueError if validation fails). Rebuilds after a content
+    # change use the already loaded content.
+    if not content.is_loaded:
+        if content.load_snapshot() is not None:
+            print("✅ Texts and config loaded from local snapshot\n")
+        else:
+            print("\n📥 Loading texts and config from NocoDB...")
+            await content.load()
+            print("✅ Texts and config validated successfully\n")
 
     # Format payment_info with actual values from config (no defaults)
-    payment_info_text = TEXTS["payment_info"].format(
-        PAYMENT_PHONE=CONFIG["PAYMENT_PHONE"],
-        PAYMENT_AMOUNT=CONFIG["PAYMENT_AMOUNT"]
+    payment_info_text = content.text("payment_info").format(
+        PAYMENT_PHONE=content.config("PAYMENT_PHONE"),
+        PAYMENT_AMOUNT=content.config("PAYMENT_AMOUNT")
     )
 
     # Format success message with group link from config (no defaults)
-    success_text = TEXTS["success_message"].format(
-        TELEGRAM_GROUP_LINK=CONFIG["TELEGRAM_GROUP_LINK"]
+    success_text = content.text("success_message").format(
+        TELEGRAM_GROUP_LINK=content.config("TELEGRAM_GROUP_LINK")
     )
 
     flow = (
@@ -431,9 +587,9 @@ async def build_payment_flow() -> 'Flow':
         # State: Show Welcome (for new users)
         # ====================================================================
         .state("show_welcome")
-            .reply(TEXTS["welcome_message"])
+            .reply(content.text("welcome_message"))
             .button(
-                TEXTS["pay_button"],
+                content.text("pay_button"),
                 callback_data="pay_ticket",
                 goto="ask_fullname"
             )
@@ -461,8 +617,8 @@ async def build_payment_flow() -> 'Flow':
         # ====================================================================
         .state("already_paid")
             .reply(
-                TEXTS["already_registered_message"].format(
-                    TELEGRAM_GROUP_LINK=CONFIG["TELEGRAM_GROUP_LINK"]
+                content.text("already_registered_message").format(
+                    TELEGRAM_GROUP_LINK=content.config("TELEGRAM_GROUP_LINK")
                 ),
                 parse_mode="HTML"
             )
@@ -479,7 +635,7 @@ async def build_payment_flow() -> 'Flow':
         # State: Awaiting Payment (with polling)
         # ====================================================================
         .state("awaiting_payment")
-            .poll(check_payment_status, interval=60)  # Increased to 60s (was 30s, originally 10s)
+            .poll(check_payment_status, interval=60, event_driven=True)  # Confirmed by tracker events
             .on_condition(lambda ctx: ctx.poll_result, goto="success")
 
         # ====================================================================
@@ -510,7 +666,6 @@ async def build_payment_flow() -> 'Flow':
 def main():
     """Main entry point"""
     import sys
-    import asyncio
 
     # Check if we should just visualize
     if len(sys.argv) > 1 and sys.argv[1] == "visualize":
@@ -537,7 +692,28 @@ def main():
         return
 
     # Run the bot
+    import logging
     from bot_flow.core import FlowExecutor
+    from bot_flow.flows.request_logging import setup_request_logging, stop_request_logging
+
+    # NocoDB request logs are written by a background thread
+    setup_request_logging(
+        level=logging.getLevelName(config.NOCODB_LOG_LEVEL.upper()),
+        sample_rate=config.NOCODB_LOG_SAMPLE_RATE
+    )
+
+    # Bound in-memory cache (least recently used entries are evicted)
+    CacheManager.get_instance().set_limits(
+        max_entries=config.CACHE_MAX_ENTRIES or None,
+        max_bytes=config.CACHE_MAX_BYTES or None
+    )
+
+    # Several workers on this host: share texts/config and payment statuses via L2
+    from bot_flow.flows.shared_cache import get_shared_cache
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        CacheManager.get_instance().attach_l2(shared_cache)
+        print(f"🔗 Shared cache enabled: {shared_cache.path}")
 
     BOT_TOKEN = config.BOT_TOKEN
     if not BOT_TOKEN:
@@ -573,9 +749,8 @@ def main():
     ]
 
     # Create executor
-    # NOTE: Batch polling is prepared but requires FlowExecutor integration
-    # For now using standard per-user polling with optimized 60s interval
-    # This is still safe for <200 users. For 300+ users, batch polling integration needed.
+    # Payment waits are event-driven: the executor subscribes to Global Payment
+    # Tracker and transitions users as soon as a sweep (or webhook) confirms payment
     executor = FlowExecutor(
         flow,
         BOT_TOKEN,
@@ -587,22 +762,105 @@ def main():
     # Initialize Global Payment Tracker
     from bot_flow.flows.global_payment_tracker import get_global_tracker
     tracker = get_global_tracker()
-    tracker.configure(NOCODB_API_URL, NOCODB_API_TOKEN, NOCODB_TABLE_ID)
+    tracker.configure(
+        NOCODB_API_URL,
+        NOCODB_API_TOKEN,
+        NOCODB_TABLE_ID,
+        sync_mode=config.TRACKER_SYNC_MODE,
+        watermark_file=config.TRACKER_WATERMARK_FILE
+    )
+    tracker.shared_cache = shared_cache
+
+    # Payment changes are pushed by the replica change feed and/or webhooks;
+    # the tracker's own sweeps then only reconcile slowly
+    replica = get_replica()
+    if replica is not None or config.NOCODB_WEBHOOK_SECRET:
+        tracker.update_interval = config.TRACKER_RECONCILE_INTERVAL
+
+    # Check fresh registrations every sweep, back off for long-abandoned ones
+    tracker.polling_policy = AdaptivePollingPolicy(
+        base_interval=tracker.update_interval,
+        max_interval=config.POLL_MAX_INTERVAL,
+        fresh_period=config.POLL_FRESH_PERIOD,
+        backoff_factor=config.POLL_BACKOFF_FACTOR
+    )
 
     # Register all awaiting users in global tracker
     if awaiting_users:
         for user in awaiting_users:
-            tracker.track_user(user['tg_id'], user['record_id'])
+            tracker.track_user(user['tg_id'], user['record_id'], created_at=user['created_at'])
         print(f"📍 Registered {len(awaiting_users)} users in Global Payment Tracker\n")
 
     # Store awaiting users for state restoration
     executor._awaiting_users = awaiting_users
 
+    # Refresh texts/config in the background (the flow may have started from a snapshot);
+    # changed content rebuilds the flow in the background and swaps it in
+    executor._content_refresh = reload_content
+    content.on_change(lambda _content: executor.schedule_flow_rebuild(build_payment_flow))
+
     # Store tracker reference for starting in post_init hook
     executor._global_tracker = tracker
 
+    # Reclaim expired cache entries in the background instead of on next read
+    if config.CACHE_JANITOR_INTERVAL > 0:
+        executor._cache_janitor = CacheJanitor(
+            CacheManager.get_instance(), max_interval=config.CACHE_JANITOR_INTERVAL
+        )
+
+    # Without a ready replica, /start lookups for new users are answered by
+    # the Bloom filter of registered TG IDs (rebuilt periodically)
+    registered_users = get_registered_users()
+    if registered_users is not None and not (replica is not None and replica.is_ready):
+        if asyncio.run(registered_users.load()):
+            executor._registered_users = registered_users
+    else:
+        registered_users = None
+
+    # Outbox flushes queued record creates; provisional IDs are swapped for real ones
+    outbox = get_outbox()
+
+    async def on_record_created(provisional_id: str, record_id: str, fields: dict) -> None:
+        # Write-through, so the next /start finds the registration locally
+        if replica is not None:
+            replica.apply_rows([Record(record_id, fields)])
+        if registered_users is not None and fields.get("TG ID"):
+            registered_users.add(fields["TG ID"])
+        # Creates left over from a previous run have no tracked user or state yet
+        if not tracker.rebind_record(provisional_id, record_id) and fields.get("TG ID"):
+            await restore_queued_registration(executor, tracker, record_id, fields)
+
+    outbox.on_reconciled(on_record_created)
+    executor._outbox = outbox
+
+    # Replica change feed drives payment confirmations (tracker dispatches events)
+    if replica is not None:
+        replica.on_change(lambda records: tracker.apply_records(records, source='replica'))
+        executor._replica = replica
+        print(f"🗄️  Payments replica enabled (sync every {replica.sync_interval}s), "
+              f"tracker reconciles every {tracker.update_interval}s")
+
+    # NocoDB webhook receiver: instant confirmation, polling becomes slow reconciliation
+    # (webhook updates the tracker, which notifies the executor)
+    if config.NOCODB_WEBHOOK_SECRET:
+        from bot_flow.flows.webhook_server import PaymentWebhookServer
+
+        executor._webhook_server = PaymentWebhookServer(
+            tracker,
+            secret=config.NOCODB_WEBHOOK_SECRET,
+            on_records=replica.apply_rows if replica is not None else None,
+            host=config.WEBHOOK_HOST,
+            port=config.WEBHOOK_PORT,
+            path=config.WEBHOOK_PATH,
+            table_id=NOCODB_TABLE_ID
+        )
+        print(f"🪝 Webhook confirmations enabled, tracker reconciles every {tracker.update_interval}s")
+
     # Run executor (tracker will be started in post_init hook inside executor's event loop)
-    executor.run()
+    try:
+        executor.run()
+    finally:
+        stop_request_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,412 @@
+"""
+Local SQLite read replica of the payments table.
+
+Registration lookups, /stats counts and startup restoration read slowly
+changing data; serving them from a local copy takes microseconds and no
+API calls. NocoDB only handles writes and the change feed.
+
+Freshness:
+- full paginated sync at startup (and periodically, to catch deleted rows)
+- incremental sync by UpdatedAt watermark every `interval` seconds
+- write-through of rows from webhooks and the outbox (`apply_rows`)
+
+Usage:
+    replica = PaymentsReplica("data/payments_replica.db", get_nocodb_client(), table_id)
+    await replica.full_sync()
+    await replica.start()
+
+    record = replica.find_by_tg_id(user_id)    # Record or None, no API call
+    paid = replica.count(paid=True)
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from bot_flow.flows.global_payment_tracker import UPDATED_AT_FIELD, parse_timestamp
+from bot_flow.flows.nocodb_client import Record
+
+# NocoDB field -> replica column
+COLUMNS = {
+    "Id": "id",
+    "TG ID": "tg_id",
+    "TG": "tg",
+    "First Name": "first_name",
+    "FullName": "full_name",
+    "Price": "price",
+    "Paid": "paid",
+    "CreatedAt": "created_at",
+    UPDATED_AT_FIELD: "updated_at",
+}
+_FIELD_BY_COLUMN = {column: field for field, column in COLUMNS.items()}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY,
+    tg_id INTEGER,
+    tg TEXT,
+    first_name TEXT,
+    full_name TEXT,
+    price INTEGER,
+    paid INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    updated_at TEXT
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS payments_tg_id ON payments (tg_id);
+CREATE INDEX IF NOT EXISTS payments_paid ON payments (paid);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _to_row(record: Record) -> Dict[str, Any]:
+    """Map fields present in record to replica columns"""
+    row = {"id": int(record.id)}
+    for field, column in COLUMNS.items():
+        if field == "Id" or field not in record.fields:
+            continue
+        value = record.fields[field]
+        if column == "paid":
+            value = 1 if value is True else 0
+        row[column] = value
+    return row
+
+
+def _to_record(row: sqlite3.Row) -> Record:
+    """Build Record with NocoDB field names from replica row"""
+    fields = {_FIELD_BY_COLUMN[key]: row[key] for key in row.keys()}
+    fields["Paid"] = bool(fields["Paid"])
+    return Record(str(row["id"]), fields)
+
+
+class PaymentsReplica:
+    """
+    SQLite copy of the payments table, indexed on TG ID, Id and Paid.
+    """
+
+    def __init__(self, path: str, client, table_id: str, sync_interval: int = 20,
+                 full_sync_every: int = 180):
+        """
+        Initialize replica (opens or creates the database).
+
+        Args:
+            path: SQLite file path (":memory:" for tests)
+            client: NocoDBClient used for syncing
+            table_id: Payments table ID
+            sync_interval: Seconds between incremental syncs
+            full_sync_every: Full resync every N incremental syncs (catches deletions)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.client = client
+        self.table_id = table_id
+        self.sync_interval = sync_interval
+        self.full_sync_every = full_sync_every
+        self.syncs_since_full = 0
+
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA.format(table="payments") + _INDEXES)
+        self.db.commit()
+
+        # Copy of another table (table ID changed) is useless
+        if self._get_meta("table_id") not in (None, table_id):
+            self.db.execute("DELETE FROM payments")
+            self.db.execute("DELETE FROM meta")
+            self.db.commit()
+
+        self._listeners: List[Callable[[List[Record]], Any]] = []
+        self.sync_task: Optional[asyncio.Task] = None
+        self.running = False
+
+        self.stats = {
+            'lookups': 0,
+            'full_syncs': 0,
+            'incremental_syncs': 0,
+            'rows_applied': 0,
+            'sync_errors': 0,
+            'last_sync_time': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether replica holds a complete copy (at least one full sync finished)"""
+        return self._get_meta("synced_at") is not None
+
+    @property
+    def watermark(self):
+        """Newest UpdatedAt applied from the change feed"""
+        return parse_timestamp(self._get_meta("watermark"))
+
+    def on_change(self, listener: Callable[[List[Record]], Any]) -> None:
+        """
+        Register listener for rows changed by incremental sync.
+
+        Called with the list of changed records (e.g. GlobalPaymentTracker.apply_records).
+        """
+        self._listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def full_sync(self) -> bool:
+        """
+        Replace local copy with a full paginated download.
+
+        Rows are streamed into a staging table and swapped in one transaction,
+        so readers never see a partial copy.
+
+        Returns:
+            True on success (on failure the previous copy is kept)
+        """
+        started = time.time()
+        try:
+            # Take watermark BEFORE the download: changes made during it are
+            # re-applied by the next incremental sync
+            latest = await self.client.list(
+                self.table_id, fields=[UPDATED_AT_FIELD], sort=f"-{UPDATED_AT_FIELD}", limit=1
+            )
+
+            self.db.executescript("DROP TABLE IF EXISTS payments_staging;" +
+                                  _SCHEMA.format(table="payments_staging"))
+            count = 0
+            async for page in self.client.iter_pages(
+                self.table_id, fields=list(COLUMNS), page_size=1000
+            ):
+                self._upsert(page, table="payments_staging")
+                count += len(page)
+
+            with self.db:
+                self.db.execute("DELETE FROM payments")
+                self.db.execute("INSERT INTO payments SELECT * FROM payments_staging")
+                self.db.execute("DROP TABLE payments_staging")
+                self._set_meta("table_id", self.table_id)
+                self._set_meta("synced_at", str(time.time()))
+                if latest and latest[0].get(UPDATED_AT_FIELD):
+                    self._set_meta("watermark", latest[0].get(UPDATED_AT_FIELD))
+
+        except Exception as e:
+            self.stats['sync_errors'] += 1
+            print(f"❌ Replica full sync failed (keeping {'existing' if self.is_ready else 'empty'} copy): {e}")
+            return False
+
+        self.syncs_since_full = 0
+        self.stats['full_syncs'] += 1
+        self.stats['last_sync_time'] = time.time()
+        print(f"🗄️  Replica synced: {count} payment records in {time.time() - started:.1f}s")
+        return True
+
+    async def sync_changes(self) -> List[Record]:
+        """
+        Apply rows modified at or after the watermark (newest first).
+
+        Returns:
+            Changed records (also passed to on_change listeners)
+        """
+        watermark = self.watermark
+        if watermark is None:
+            return []
+
+        changes: List[Record] = []
+        newest, newest_raw = watermark, None
+        async for page in self.client.iter_pages(
+            self.table_id, fields=list(COLUMNS), sort=f"-{UPDATED_AT_FIELD}",
+            page_size=100, prefetch=1
+        ):
+            reached_watermark = False
+            for record in page:
+                updated_at = parse_timestamp(record.get(UPDATED_AT_FIELD))
+                if updated_at is None or updated_at < watermark:
+                    reached_watermark = True
+                    break
+                changes.append(record)
+                if updated_at > newest:
+                    newest = updated_at
+                    newest_raw = record.get(UPDATED_AT_FIELD)
+            if reached_watermark:
+                break
+
+        if changes:
+            self.apply_rows(changes)
+            if newest_raw is not None:
+                with self.db:
+                    self._set_meta("watermark", newest_raw)
+
+        self.syncs_since_full += 1
+        self.stats['incremental_syncs'] += 1
+        self.stats['last_sync_time'] = time.time()
+
+        if changes:
+            for listener in self._listeners:
+                try:
+                    listener(changes)
+                except Exception as e:
+                    print(f"❌ Error in replica change listener: {e}")
+        return changes
+
+    def _upsert(self, records: Iterable[Record], table: str = "payments") -> int:
+        """Insert or update rows, touching only columns present in each record"""
+        count = 0
+        with self.db:
+            for record in records:
+                if not record.id or record.id == "None":
+                    continue
+                row = _to_row(record)
+                columns = list(row)
+                updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id") or "id = id"
+                self.db.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)}) "
+                    f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                    [row[c] for c in columns]
+                )
+                count += 1
+        return count
+
+    def apply_rows(self, records: Iterable[Record]) -> int:
+        """
+        Write-through rows from webhooks, the outbox or the change feed.
+
+        Partial rows (e.g. only Id/Paid) update just the given columns.
+
+        Returns:
+            Number of rows applied
+        """
+        count = self._upsert(records)
+        self.stats['rows_applied'] += count
+        return count
+
+    async def start(self, interval: Optional[int] = None) -> None:
+        """Start periodic incremental sync (with periodic full resync)"""
+        if self.running:
+            return
+        interval = interval or self.sync_interval
+        self.running = True
+        self.sync_task = asyncio.create_task(self._sync_loop(interval))
+        print(f"🚀 Payments replica sync started (interval: {interval}s)")
+
+    async def stop(self) -> None:
+        """Stop periodic sync"""
+        self.running = False
+        if self.sync_task:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except asyncio.CancelledError:
+                pass
+            self.sync_task = None
+        print("🛑 Payments replica sync stopped")
+
+    async def _sync_loop(self, interval: int) -> None:
+        while self.running:
+            try:
+                await asyncio.sleep(interval)
+                if not self.is_ready or self.syncs_since_full >= self.full_sync_every:
+                    await self.full_sync()
+                else:
+                    await self.sync_changes()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.stats['sync_errors'] += 1
+                print(f"❌ Error in replica sync: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads (no API calls)
+    # ------------------------------------------------------------------
+
+    def find_by_tg_id(self, tg_id: int) -> Optional[Record]:
+        """First payment record of a Telegram user, or None"""
+        self.stats['lookups'] += 1
+        row = self.db.execute(
+            "SELECT * FROM payments WHERE tg_id = ? ORDER BY id LIMIT 1", (tg_id,)
+        ).fetchone()
+        return _to_record(row) if row else None
+
+    def get(self, record_id: str) -> Optional[Record]:
+        """Payment record by ID, or None"""
+        self.stats['lookups'] += 1
+        row = self.db.execute("SELECT * FROM payments WHERE id = ?", (int(record_id),)).fetchone()
+        return _to_record(row) if row else None
+
+    def awaiting_payment(self) -> List[Record]:
+        """Unpaid records with a Telegram user"""
+        self.stats['lookups'] += 1
+        rows = self.db.execute(
+            "SELECT * FROM payments WHERE paid = 0 AND tg_id IS NOT NULL ORDER BY id"
+        ).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def count(self, paid: Optional[bool] = None) -> int:
+        """Count records (optionally by Paid)"""
+        self.stats['lookups'] += 1
+        if paid is None:
+            return self.db.execute("SELECT COUNT(*) FROM payments").fetchone()[0]
+        return self.db.execute(
+            "SELECT COUNT(*) FROM payments WHERE paid = ?", (1 if paid else 0,)
+        ).fetchone()[0]
+
+    def count_per_day(self, days: List[str]) -> Dict[str, int]:
+        """Count records created on each day (YYYY-MM-DD)"""
+        self.stats['lookups'] += 1
+        rows = self.db.execute(
+            "SELECT substr(created_at, 1, 10) AS day, COUNT(*) FROM payments "
+            f"WHERE substr(created_at, 1, 10) IN ({', '.join('?' for _ in days)}) GROUP BY day",
+            days
+        ).fetchall()
+        counts = {row[0]: row[1] for row in rows}
+        return {day: counts.get(day, 0) for day in days}
+
+    def count_paid_per_price(self, since: Optional[str] = None) -> Dict[int, int]:
+        """Count paid records per price found in the data (optionally created on/after `since` day)"""
+        self.stats['lookups'] += 1
+        query = "SELECT price, COUNT(*) FROM payments WHERE paid = 1 AND price IS NOT NULL"
+        params: List[str] = []
+        if since is not None:
+            query += " AND substr(created_at, 1, 10) >= ?"
+            params.append(since)
+        rows = self.db.execute(f"{query} GROUP BY price ORDER BY price", params).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def close(self) -> None:
+        """Close database connection"""
+        self.db.close()
+
+    def get_stats(self) -> dict:
+        """Get replica statistics"""
+        age = time.time() - self.stats['last_sync_time'] if self.stats['last_sync_time'] else 0
+        return {
+            'rows': self.db.execute("SELECT COUNT(*) FROM payments").fetchone()[0],
+            'ready': self.is_ready,
+            'watermark': self._get_meta("watermark"),
+            'last_sync': f"{age:.0f}s ago" if age else "Never",
+            'lookups': self.stats['lookups'],
+            'full_syncs': self.stats['full_syncs'],
+            'incremental_syncs': self.stats['incremental_syncs'],
+            'rows_applied': self.stats['rows_applied'],
+            'sync_errors': self.stats['sync_errors']
+        }
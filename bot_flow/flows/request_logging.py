@@ -0,0 +1,124 @@
+"""
+Structured, low-overhead logging for NocoDB API requests.
+
+Replaces per-request console prints with `logging` records that are handed
+off to a background writer thread (QueueHandler + QueueListener), so the
+event loop never blocks on console I/O.
+
+- Levels: DEBUG = request details, INFO = responses, WARNING = 429/5xx/retries
+- Sampling: INFO/DEBUG records are sampled (WARNING and above always pass)
+- Fast path: callers check `logger.isEnabledFor(...)` before building fields,
+  so a disabled level costs a single integer comparison
+"""
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Optional
+
+
+# Logger used by nocodb_request_with_retry
+logger = logging.getLogger("bot_flow.nocodb")
+
+# Background writer (started by setup_request_logging)
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+# Standard LogRecord attributes (everything else came from `extra=`)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Pass a fraction of low-level records, always pass WARNING and above.
+
+    With sample_rate=0.1 only ~10% of successful request logs are written.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1.0:
+            return True
+        if random.random() < self.sample_rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Format records as `time level message key=value ...`.
+
+    Structured fields are passed via `extra=` and rendered in the
+    background thread, not at the call site.
+    """
+
+    def __init__(self):
+        super().__init__(fmt="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = [
+            f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRS
+        ]
+        if fields:
+            line = f"{line} {' '.join(fields)}"
+        return line
+
+
+def setup_request_logging(level: int = logging.INFO, sample_rate: float = 1.0,
+                          stream=None) -> logging.handlers.QueueListener:
+    """
+    Route NocoDB request logs through a background writer thread.
+
+    Safe to call multiple times (subsequent calls only update level/sampling).
+
+    Args:
+        level: Minimum level to log (DEBUG for full request details)
+        sample_rate: Fraction of INFO/DEBUG records to keep (0.0-1.0)
+        stream: Output stream (default: stdout)
+
+    Returns:
+        Running QueueListener
+    """
+    global _listener, _queue_handler
+
+    logger.setLevel(level)
+
+    if _listener is None:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+        handler = logging.StreamHandler(stream or sys.stdout)
+        handler.setFormatter(StructuredFormatter())
+
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        logger.addHandler(_queue_handler)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, handler)
+        _listener.start()
+
+    # Replace sampling filter
+    for old_filter in list(_queue_handler.filters):
+        _queue_handler.removeFilter(old_filter)
+    _queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    return _listener
+
+
+def stop_request_logging() -> None:
+    """Flush pending records and stop the background writer (call on shutdown)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        logger.removeHandler(_queue_handler)
+        logger.propagate = True
+        _listener = None
+        _queue_handler = None
@@ -0,0 +1,249 @@
+"""
+Shared L2 cache for multi-worker deployments.
+
+CacheManager (L1) lives in one process. When several bot workers or admin
+scripts run on the same host, each would fetch the same texts, config and
+payment statuses from NocoDB. The shared cache is a local SQLite database
+in WAL mode (concurrent readers, one writer, no server) that all processes
+open; TTLs are stored with the values as wall-clock times, so every process
+agrees on freshness.
+
+Fill leases make one worker do the fetch while the others wait for its
+result in L2:
+
+    shared = SharedCache("data/shared_cache.db")
+    if shared.acquire_lease("fill:texts", ttl=10):
+        value = await fetch()
+        shared.set("texts", value, ttl=300)
+        shared.release_lease("fill:texts")
+    else:
+        ...  # Another worker is fetching: poll shared.get("texts")
+
+Values are pickled: the file is a private cache of this application and
+must not be writable by anyone else.
+"""
+import os
+import pickle
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional, Tuple
+from config import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    stale_at REAL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Max SQLite parameters per IN (...) query of get_many
+_BATCH_SIZE = 500
+
+
+class SharedEntry:
+    """L2 value with its wall-clock soft (stale_at) and hard (expires_at) expiry"""
+    __slots__ = ('data', 'stale_at', 'expires_at')
+
+    def __init__(self, data: Any, stale_at: Optional[float], expires_at: float):
+        self.data = data
+        self.stale_at = stale_at
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Whether the soft TTL has not passed yet"""
+        now = time.time() if now is None else now
+        return now < (self.stale_at if self.stale_at is not None else self.expires_at)
+
+
+class SharedCache:
+    """
+    Cross-process key-value cache with TTLs and fill leases (SQLite, WAL mode).
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        """
+        Initialize shared cache (opens or creates the database).
+
+        Args:
+            path: SQLite file path shared by all workers (":memory:" for tests)
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"  # Lease holder ID of this process
+
+        self.db = sqlite3.connect(path, timeout=busy_timeout)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.db.commit()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'leases_acquired': 0,
+            'leases_denied': 0
+        }
+
+    def get(self, key: str) -> Optional[SharedEntry]:
+        """
+        Get entry (None if missing or past its hard expiry).
+
+        Args:
+            key: Cache key
+
+        Returns:
+            SharedEntry with value and expiry times
+        """
+        row = self.db.execute(
+            "SELECT value, stale_at, expires_at FROM entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return SharedEntry(pickle.loads(row[0]), row[1], row[2])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, SharedEntry]:
+        """
+        Get several entries in batched queries.
+
+        Returns:
+            Dict key -> entry for keys present and not expired
+        """
+        keys = list(keys)
+        now = time.time()
+        found: Dict[str, SharedEntry] = {}
+        for start in range(0, len(keys), _BATCH_SIZE):
+            batch = keys[start:start + _BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            for key, value, stale_at, expires_at in self.db.execute(
+                f"SELECT key, value, stale_at, expires_at FROM entries "
+                f"WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*batch, now)
+            ):
+                found[key] = SharedEntry(pickle.loads(value), stale_at, expires_at)
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: Any, ttl: float, hard_ttl: Optional[float] = None) -> None:
+        """
+        Store value for all workers.
+
+        Args:
+            key: Cache key
+            value: Picklable value
+            ttl: Seconds until stale (hard expiry if hard_ttl is None)
+            hard_ttl: Seconds the value may be served stale
+
+        Raises:
+            pickle.PicklingError, TypeError, AttributeError: If value cannot be pickled
+        """
+        self.set_many([(key, value)], ttl, hard_ttl)
+
+    def set_many(self, items: Iterable[Tuple[str, Any]], ttl: float,
+                 hard_ttl: Optional[float] = None) -> None:
+        """Store several values with the same TTLs in one transaction"""
+        now = time.time()
+        expires_at = now + max(ttl, hard_ttl or 0)
+        stale_at = now + ttl if hard_ttl is not None else None
+        rows = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), stale_at, expires_at)
+                for key, value in items]
+        if not rows:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, stale_at, expires_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        self.stats['sets'] += len(rows)
+
+    def delete(self, key: str) -> None:
+        """Remove entry"""
+        with self.db:
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def acquire_lease(self, name: str, ttl: float) -> bool:
+        """
+        Take (or extend) an exclusive lease, e.g. the right to fill a key.
+
+        The lease expires after ttl seconds, so a crashed holder cannot block
+        the others for longer than that.
+
+        Args:
+            name: Lease name
+            ttl: Lease duration in seconds
+
+        Returns:
+            True if this process holds the lease now
+        """
+        now = time.time()
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, self.owner, now + ttl, now)
+            )
+        acquired = cursor.rowcount > 0
+        self.stats['leases_acquired' if acquired else 'leases_denied'] += 1
+        return acquired
+
+    def release_lease(self, name: str) -> None:
+        """Release lease held by this process (no-op otherwise)"""
+        with self.db:
+            self.db.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+
+    def cleanup_expired(self) -> int:
+        """
+        Delete expired entries and leases.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self.db:
+            removed = self.db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            self.db.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+        return removed
+
+    def close(self) -> None:
+        """Close database connection"""
+        self.db.close()
+
+    def get_stats(self) -> dict:
+        """Get shared cache statistics"""
+        entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return dict(self.stats, entries=entries, path=self.path)
+
+
+# Global instance (created on first use)
+_shared_cache: Optional[SharedCache] = None
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """
+    Get shared cache of this host.
+
+    Returns:
+        Shared cache, or None if SHARED_CACHE_FILE is empty (single worker)
+    """
+    global _shared_cache
+    if _shared_cache is None and config.SHARED_CACHE_FILE:
+        _shared_cache = SharedCache(config.SHARED_CACHE_FILE)
+    return _shared_cache
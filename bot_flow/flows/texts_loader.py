@@ -3,11 +3,8 @@ Loader for bot texts from NocoDB.
 
 This module provides functionality to load bot text strings from NocoDB table pwt37o18yvtfeh6.
 """
-import httpx
 from typing import Dict
 from config import config
-from bot_flow.flows.nocodb_utils import nocodb_request_with_retry
-from bot_flow.flows.cache_manager import CacheManager
 
 # NocoDB configuration from centralized config
 NOCODB_API_URL = config.NOCODB_API_URL
@@ -42,51 +39,12 @@ def validate_texts(texts: Dict[str, str]) -> None:
         )
 
 
-async def _fetch_texts_from_nocodb() -> Dict[str, str]:
-    """
-    Fetch texts from NocoDB (internal function, use load_texts_from_nocodb instead).
-
-    Returns:
-        Dict mapping action -> text
-    """
-    headers = {
-        "xc-token": NOCODB_API_TOKEN
-    }
-
-    response = await nocodb_request_with_retry(
-        "GET",
-        f"{NOCODB_API_URL}/api/v2/tables/{TEXTS_TABLE_ID}/records",
-        headers=headers,
-        timeout=15.0
-    )
-    response.raise_for_status()
-    data = response.json()
-
-    # Parse records into dict
-    texts = {}
-    records = data.get("list", []) or data.get("records", [])
-
-    for record in records:
-        action = record.get("action")
-        text = record.get("text")
-        if action and text:
-            texts[action] = text
-
-    return texts
-
-
 async def load_texts_from_nocodb(use_cache: bool = True) -> Dict[str, str]:
     """
-    Load all text strings from NocoDB table pwt37o18yvtfeh6.
-
-    Validates that all required text keys are present.
-    Bot will not start if any required texts are missing.
-
-    Uses in-memory cache with 5-minute TTL to reduce API calls.
+    Load texts from NocoDB.
 
-    Table schema:
-        - action (string): text ID/key (lowercase)
-        - text (string): text content
+    Texts and config share one table: both are served by the content
+    registry from a single fetch (see content_registry), validated once.
 
     Args:
         use_cache: Whether to use cache (default: True)
@@ -95,42 +53,11 @@ async def load_texts_from_nocodb(use_cache: bool = True) -> Dict[str, str]:
         Dict mapping action -> text
 
     Raises:
-        ValueError: If required texts are missing or NocoDB is not configured
+        ValueError: If required keys are missing or NocoDB is not configured
     """
-    if not NOCODB_API_TOKEN or not TEXTS_TABLE_ID:
-        raise ValueError(
-            "❌ NocoDB not configured!\n"
-            "   Please set NOCODB_API_TOKEN and NOCODB_TEXTS_TABLE_ID in .env file"
-        )
-
-    try:
-        if use_cache:
-            # Try cache first
-            cache = CacheManager.get_instance()
-            texts = await cache.get_or_fetch(
-                'nocodb_texts',
-                _fetch_texts_from_nocodb,
-                ttl=300.0  # Cache for 5 minutes
-            )
-            print(f"✅ Loaded {len(texts)} texts from NocoDB (cache: {cache.get('nocodb_texts') is not None})")
-        else:
-            # Bypass cache
-            texts = await _fetch_texts_from_nocodb()
-            print(f"✅ Loaded {len(texts)} texts from NocoDB (no cache)")
-
-        # Validate all required keys are present
-        validate_texts(texts)
-        print(f"✅ All required text constants validated")
-
-        return texts
-
-    except httpx.HTTPError as e:
-        raise ValueError(
-            f"❌ Error loading texts from NocoDB: {e}\n"
-            f"   Please check your NOCODB_API_TOKEN and NOCODB_TEXTS_TABLE_ID"
-        ) from e
-    except Exception as e:
-        raise ValueError(f"❌ Unexpected error loading texts: {e}") from e
+    from bot_flow.flows.content_registry import get_content_registry
+    content = await get_content_registry().load(use_cache=use_cache)
+    return content.texts
 
 
 def load_texts_sync() -> Dict[str, str]:
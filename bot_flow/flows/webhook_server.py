@@ -0,0 +1,232 @@
+"""
+NocoDB webhook receiver for instant payment confirmation.
+
+NocoDB sends a "record updated" webhook as soon as an admin ticks `Paid`.
+This module runs a small local HTTP endpoint (stdlib asyncio, no extra
+dependencies) that verifies a shared secret, applies the updated rows to
+GlobalPaymentTracker, which dispatches status change events to its
+subscribers (optionally also invokes `on_paid` for every newly paid user).
+
+Polling remains as a slow reconciliation sweep in case a webhook is lost.
+
+NocoDB setup (Details -> Webhooks -> "After Update"):
+    URL:     http://<bot-host>:<WEBHOOK_PORT>/nocodb/webhook
+    Header:  X-Webhook-Secret: <NOCODB_WEBHOOK_SECRET>
+"""
+import asyncio
+import hmac
+import json
+from typing import Any, Awaitable, Callable, List, Optional
+
+from bot_flow.flows.nocodb_client import Record
+
+# Header with shared secret (configured as custom header in NocoDB webhook)
+SECRET_HEADER = "x-webhook-secret"
+
+# Reject bodies larger than this (NocoDB payloads are a few KB)
+MAX_BODY_SIZE = 1024 * 1024
+
+_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+def extract_rows(payload: Any) -> List[dict]:
+    """
+    Extract updated rows from NocoDB webhook payload.
+
+    Supports v2 payloads ({"data": {"rows": [...]}}) and legacy v1
+    payloads where "data" is the row itself.
+    """
+    if not isinstance(payload, dict):
+        return []
+    data = payload.get("data")
+    if isinstance(data, dict):
+        rows = data.get("rows")
+        if isinstance(rows, list):
+            return [row for row in rows if isinstance(row, dict)]
+        if "Id" in data or "id" in data:
+            return [data]
+    return []
+
+
+class PaymentWebhookServer:
+    """
+    HTTP endpoint that receives NocoDB record-updated webhooks.
+
+    Usage:
+        server = PaymentWebhookServer(
+            tracker=get_global_tracker(),
+            secret="shared-secret",
+            on_paid=callback,  # optional async fn(user_id)
+            port=8081
+        )
+        await server.start()
+        ...
+        await server.stop()
+    """
+
+    def __init__(
+        self,
+        tracker,
+        secret: str,
+        on_paid: Optional[Callable[[int], Awaitable[None]]] = None,
+        on_records: Optional[Callable[[List[Record]], Any]] = None,
+        host: str = "127.0.0.1",
+        port: int = 8081,
+        path: str = "/nocodb/webhook",
+        table_id: Optional[str] = None
+    ):
+        """
+        Initialize webhook server.
+
+        Args:
+            tracker: GlobalPaymentTracker to update
+            secret: Shared secret expected in X-Webhook-Secret header
+            on_paid: Async callback called with user_id for every newly paid user
+            on_records: Sync callback receiving all updated rows (e.g. replica write-through)
+            host: Bind address
+            port: Bind port (0 = pick free port)
+            path: Webhook URL path
+            table_id: If set, ignore webhooks for other tables
+        """
+        if not secret:
+            raise ValueError("Webhook secret is required")
+
+        self.tracker = tracker
+        self.secret = secret.encode()
+        self.on_paid = on_paid
+        self.on_records = on_records
+        self.host = host
+        self.port = port
+        self.path = path
+        self.table_id = table_id
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.stats = {
+            'received': 0,
+            'rejected': 0,
+            'rows_applied': 0,
+            'payments_confirmed': 0
+        }
+
+    async def start(self) -> None:
+        """Start listening for webhooks"""
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Resolve actual port (when started with port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"🪝 NocoDB webhook receiver listening on http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self) -> None:
+        """Stop listening"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            print("🛑 NocoDB webhook receiver stopped")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """Parse a single HTTP/1.1 request and send response"""
+        status = 400
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10.0)
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", "0"))
+            if length > MAX_BODY_SIZE:
+                status = 413
+            else:
+                body = await asyncio.wait_for(reader.readexactly(length), timeout=10.0)
+                status = self.handle_request(method, target.split("?", 1)[0], headers, body)
+
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                asyncio.TimeoutError, ValueError):
+            status = 400
+
+        except Exception as e:
+            print(f"❌ Webhook handling error: {e}")
+            status = 400
+
+        try:
+            body = json.dumps({"ok": status == 200}).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def handle_request(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        """
+        Verify and apply a webhook request.
+
+        Newly paid users are dispatched to `on_paid` in background tasks, so
+        NocoDB gets a response immediately.
+
+        Returns:
+            HTTP status code
+        """
+        if path != self.path:
+            return 404
+        if method != "POST":
+            return 405
+
+        self.stats['received'] += 1
+
+        provided = headers.get(SECRET_HEADER, "").encode()
+        if not hmac.compare_digest(provided, self.secret):
+            self.stats['rejected'] += 1
+            print("⚠️  Rejected NocoDB webhook with invalid secret")
+            return 401
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400
+
+        if self.table_id and isinstance(payload.get("data"), dict):
+            table_id = payload["data"].get("table_id")
+            if table_id and table_id != self.table_id:
+                return 200  # Not our table - acknowledge and ignore
+
+        records = [Record.from_api(row) for row in extract_rows(payload)]
+        if self.on_records is not None and records:
+            self.on_records(records)
+        newly_paid = self.tracker.apply_records(records, source='webhook')
+
+        self.stats['rows_applied'] += len(records)
+        self.stats['payments_confirmed'] += len(newly_paid)
+
+        for user_id in newly_paid:
+            print(f"💰 Webhook: payment confirmed for user {user_id}")
+            if self.on_paid is not None:
+                asyncio.create_task(self._dispatch(user_id))
+
+        return 200
+
+    async def _dispatch(self, user_id: int) -> None:
+        """Run on_paid callback, logging errors"""
+        try:
+            await self.on_paid(user_id)
+        except Exception as e:
+            print(f"❌ Error handling webhook payment for user {user_id}: {e}")
+
+    def get_stats(self) -> dict:
+        """Get webhook statistics"""
+        return dict(self.stats)
@@ -30,6 +30,59 @@ class Config:
     NOCODB_TEXTS_TABLE_ID: str = "mguawvnumqrb5k7"
     NOCODB_CONFIG_TABLE_ID: str = "mguawvnumqrb5k7"
 
+    # Global Payment Tracker sync: "incremental" (UpdatedAt change feed) or "full"
+    TRACKER_SYNC_MODE: str = os.getenv("TRACKER_SYNC_MODE", "incremental")
+    TRACKER_WATERMARK_FILE: str = os.getenv("TRACKER_WATERMARK_FILE", "data/tracker_watermark.json")
+
+    # Adaptive polling: fresh records checked every sweep, stale ones backed off (x factor per age stage)
+    POLL_FRESH_PERIOD: int = int(os.getenv("POLL_FRESH_PERIOD", "600"))
+    POLL_MAX_INTERVAL: int = int(os.getenv("POLL_MAX_INTERVAL", "3600"))
+    POLL_BACKOFF_FACTOR: float = float(os.getenv("POLL_BACKOFF_FACTOR", "2.0"))
+
+    # Payment record creates are coalesced into bulk inserts (window in ms or N records)
+    NOCODB_WRITE_WINDOW_MS: int = int(os.getenv("NOCODB_WRITE_WINDOW_MS", "100"))
+    NOCODB_WRITE_MAX_BATCH: int = int(os.getenv("NOCODB_WRITE_MAX_BATCH", "50"))
+    # Durable write-ahead outbox (pending NocoDB writes survive outages and restarts)
+    OUTBOX_FILE: str = os.getenv("OUTBOX_FILE", "data/outbox.db")
+
+    # Texts/config cache: refreshed in background after TTL, stale copy served up to MAX_STALE
+    CONTENT_CACHE_TTL: float = float(os.getenv("CONTENT_CACHE_TTL", "300"))
+    CONTENT_MAX_STALE: float = float(os.getenv("CONTENT_MAX_STALE", "86400"))
+
+    # Local snapshot of texts/config for warm starts (empty = disabled)
+    CONTENT_SNAPSHOT_DIR: str = os.getenv("CONTENT_SNAPSHOT_DIR", "data/content")
+
+    # In-memory cache limits (LRU eviction; 0 = unbounded)
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Background removal of expired cache entries: longest sleep in seconds (0 = disabled)
+    CACHE_JANITOR_INTERVAL: float = float(os.getenv("CACHE_JANITOR_INTERVAL", "60"))
+
+    # SQLite L2 cache shared by all workers of the host (empty = single worker, L1 only)
+    SHARED_CACHE_FILE: str = os.getenv("SHARED_CACHE_FILE", "")
+
+    # Local SQLite read replica of the payments table (empty path = disabled)
+    PAYMENTS_REPLICA_FILE: str = os.getenv("PAYMENTS_REPLICA_FILE", "data/payments_replica.db")
+    REPLICA_SYNC_INTERVAL: int = int(os.getenv("REPLICA_SYNC_INTERVAL", "20"))
+
+    # Bloom filter of registered TG IDs: skips lookups for new users on /start
+    # when the replica is not available (capacity 0 = disabled)
+    MEMBERSHIP_FILTER_CAPACITY: int = int(os.getenv("MEMBERSHIP_FILTER_CAPACITY", "100000"))
+    MEMBERSHIP_FILTER_ERROR_RATE: float = float(os.getenv("MEMBERSHIP_FILTER_ERROR_RATE", "0.01"))
+    MEMBERSHIP_FILTER_RELOAD_INTERVAL: int = int(os.getenv("MEMBERSHIP_FILTER_RELOAD_INTERVAL", "3600"))
+
+    # NocoDB webhook receiver (enabled when secret is set)
+    NOCODB_WEBHOOK_SECRET: Optional[str] = os.getenv("NOCODB_WEBHOOK_SECRET")
+    WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+    WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8081"))
+    WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/nocodb/webhook")
+    # Tracker sweep interval when webhooks deliver confirmations (slow reconciliation)
+    TRACKER_RECONCILE_INTERVAL: int = int(os.getenv("TRACKER_RECONCILE_INTERVAL", "300"))
+
+    # NocoDB request logging (DEBUG = full request details, WARNING = errors only)
+    NOCODB_LOG_LEVEL: str = os.getenv("NOCODB_LOG_LEVEL", "INFO")
+    NOCODB_LOG_SAMPLE_RATE: float = float(os.getenv("NOCODB_LOG_SAMPLE_RATE", "1.0"))
+
     # OpenAI (for agents)
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
 
@@ -56,6 +109,7 @@ class Config:
         print("📋 Configuration Status:")
         print(f"   BOT_TOKEN: {'✅ Set' if cls.BOT_TOKEN else '❌ Missing'}")
         print(f"   NocoDB: {'✅ Configured' if cls.is_nocodb_configured() else '⚠️ Not configured (local mode)'}")
+        print(f"   NocoDB webhook: {'✅ Enabled' if cls.NOCODB_WEBHOOK_SECRET else '⚠️ Disabled (polling only)'}")
         print(f"   OpenAI: {'✅ Set' if cls.OPENAI_API_KEY else '⚠️ Not set'}")
         print(f"   Environment: {cls.ENV}")
 
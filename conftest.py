@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Shared pytest fixtures: NocoDB API served over httpx.MockTransport.
+
+    async def test_something(mock_nocodb):
+        mock_nocodb(handler)  # All NocoDB requests now go to handler
+
+    async def test_sync(payments_table):
+        table = payments_table([{"Id": 1, "Paid": False, "UpdatedAt": "..."}])
+"""
+import httpx
+import pytest
+import pytest_asyncio
+
+from bot_flow.flows import nocodb_utils
+
+
+class FakePaymentsTable:
+    """In-memory payments table with Id filter, sort, offset and limit support"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.down = False  # Reject every request with 400
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.down:
+            return httpx.Response(400, json={"msg": "unavailable"})
+        params = request.url.params
+        rows = list(self.rows)
+
+        where = params.get("where", "")
+        if where.startswith("(Id,in,"):
+            ids = set(where[len("(Id,in,"):-1].split(","))
+            rows = [r for r in rows if str(r["Id"]) in ids]
+
+        if params.get("sort") == "-UpdatedAt":
+            rows.sort(key=lambda r: r["UpdatedAt"], reverse=True)
+
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 25))
+        return httpx.Response(200, json={
+            "list": rows[offset:offset + limit],
+            "pageInfo": {"totalRows": len(rows), "isLastPage": offset + limit >= len(rows)}
+        })
+
+
+@pytest_asyncio.fixture
+async def mock_nocodb():
+    """Install a MockTransport handler as the shared client pool (closed on teardown)"""
+    await nocodb_utils.close_client_pool()
+
+    def install(handler) -> None:
+        if nocodb_utils._client_pool is not None:
+            raise RuntimeError("mock_nocodb handler already installed")
+        nocodb_utils._client_pool = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    yield install
+    await nocodb_utils.close_client_pool()
+
+
+@pytest.fixture
+def payments_table(mock_nocodb):
+    """Serve a FakePaymentsTable with the given rows: payments_table(rows)"""
+    def create(rows) -> FakePaymentsTable:
+        table = FakePaymentsTable(rows)
+        mock_nocodb(table.handler)
+        return table
+
+    return create
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Tests for CacheManager (TTL, LRU eviction, size accounting, namespaces).
+Run: pytest test_cache_manager.py -v
+"""
+import asyncio
+
+import pytest
+
+from bot_flow.flows.cache_manager import CacheJanitor, CacheManager, estimate_size
+
+
+def test_lru_eviction_by_entry_count():
+    cache = CacheManager(max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("d", "D")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C" and cache.get("d") == "D"
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_byte_limit_and_size_accounting():
+    value = "x" * 1000
+    entry_size = estimate_size(value)
+    cache = CacheManager(max_bytes=entry_size * 2 + 10)
+
+    cache.set("a", value)
+    cache.set("b", value)
+    cache.set("c", value)
+
+    assert len(cache.cache) == 2 and cache.get("a") is None
+    assert cache.total_bytes == entry_size * 2
+
+    # Replacing and invalidating keep the accounting exact
+    cache.set("b", "small")
+    cache.invalidate("c")
+    assert cache.total_bytes == estimate_size("small")
+
+    # A single value larger than the limit is not cached (and evicts nothing)
+    cache.set("huge", "x" * 10_000)
+    assert cache.get("huge") is None and cache.get("b") == "small"
+    assert cache.get_stats()['oversized'] == 1
+
+
+def test_namespaces_have_own_limits():
+    cache = CacheManager()
+    users = cache.namespace("users", max_entries=2, default_ttl=60)
+    assert cache.namespace("users") is users
+
+    cache.set("texts", {"welcome": "hi"})
+    for user_id in range(5):
+        users.set(user_id, {"paid": False})
+
+    assert cache.get("texts") == {"welcome": "hi"}
+    assert len(users.cache) == 2 and users.get(4) == {"paid": False}
+
+    stats = cache.get_stats()
+    assert stats['total_entries'] == 1
+    assert stats['namespaces']['users']['evictions'] == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate_serves_stale_and_refreshes_once():
+    cache = CacheManager()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    assert await cache.get_or_fetch("texts", fetch, ttl=0.01, hard_ttl=60) == 1
+    await asyncio.sleep(0.02)
+
+    # Soft TTL passed: callers get stale value immediately, one refresh runs
+    results = await asyncio.gather(*(cache.get_or_fetch("texts", fetch, ttl=0.01, hard_ttl=60)
+                                     for _ in range(5)))
+    assert results == [1] * 5
+    await asyncio.sleep(0.1)
+
+    assert len(calls) == 2
+    assert cache.get("texts") == 2
+    stats = cache.get_stats()
+    assert stats['stale_hits'] == 5 and stats['background_refreshes'] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_stale_until_hard_ttl():
+    cache = CacheManager()
+    cache.refresh_retry_delay = 0.0
+
+    async def fetch_ok():
+        return {"welcome": "hi"}
+
+    async def fetch_fail():
+        raise RuntimeError("NocoDB down")
+
+    await cache.get_or_fetch("texts", fetch_ok, ttl=0.01, hard_ttl=0.2)
+    await asyncio.sleep(0.02)
+
+    assert await cache.get_or_fetch("texts", fetch_fail, ttl=0.01, hard_ttl=0.2) == {"welcome": "hi"}
+    await asyncio.sleep(0.01)
+    assert await cache.get_or_fetch("texts", fetch_fail, ttl=0.01, hard_ttl=0.2) == {"welcome": "hi"}
+    await asyncio.sleep(0.01)
+    stats = cache.get_stats()
+    assert stats['refresh_failures'] == 2 and stats['stale_on_error'] == 1
+
+    # Past hard TTL the error reaches the caller
+    await asyncio.sleep(0.2)
+    with pytest.raises(RuntimeError):
+        await cache.get_or_fetch("texts", fetch_fail, ttl=0.01, hard_ttl=0.2)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_per_key():
+    cache = CacheManager()
+    calls = {}
+    started = asyncio.Event()
+
+    async def slow_config():
+        calls['config'] = calls.get('config', 0) + 1
+        started.set()
+        await asyncio.sleep(0.2)
+        return "config"
+
+    async def fast_texts():
+        calls['texts'] = calls.get('texts', 0) + 1
+        return "texts"
+
+    config_waiters = [asyncio.create_task(cache.get_or_fetch("config", slow_config)) for _ in range(10)]
+    await started.wait()
+
+    # Different key is not blocked by the slow fetch
+    assert await asyncio.wait_for(cache.get_or_fetch("texts", fast_texts), timeout=0.1) == "texts"
+
+    assert await asyncio.gather(*config_waiters) == ["config"] * 10
+    assert calls == {'config': 1, 'texts': 1}
+    assert cache.get_stats()['coalesced'] == 9
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_reaches_all_waiters_and_is_not_cached():
+    cache = CacheManager()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("NocoDB down")
+
+    results = await asyncio.gather(*(cache.get_or_fetch("texts", failing) for _ in range(3)),
+                                   return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(attempts) == 1
+    assert cache.get("texts") is None
+
+    async def ok():
+        return "texts"
+
+    assert await cache.get_or_fetch("texts", ok) == "texts"
+    assert cache.get_stats()['fetch_failures'] == 1
+
+
+def test_expire_due_removes_only_due_entries():
+    cache = CacheManager()
+    users = cache.namespace('users')
+    cache.set("short", "x", ttl=0)
+    cache.set("long", "y", ttl=300)
+    users.set(1, {"name": "a"}, ttl=0)
+    cache.set("replaced", "old", ttl=0)
+    cache.set("replaced", "new", ttl=300)  # Heap item of the old entry is dead
+
+    assert cache.expire_due() == 2
+    assert list(cache.cache) == ["long", "replaced"]
+    assert not users.cache and users.total_bytes == 0
+    assert cache.get("replaced") == "new"
+
+    # Heap does not grow without bound under overwrites
+    for _ in range(1000):
+        cache.set("long", "y", ttl=300)
+    assert cache.get_stats()['expiry_heap'] < 200
+
+
+@pytest.mark.asyncio
+async def test_janitor_reclaims_entries_that_are_never_read():
+    cache = CacheManager()
+    janitor = CacheJanitor(cache, max_interval=60, min_interval=0.01)
+    await janitor.start()
+    cache.set("session", "data", ttl=0.05)
+    cache.set("texts", "data", ttl=300)
+
+    await asyncio.sleep(0.15)
+    await janitor.stop()
+
+    assert list(cache.cache) == ["texts"]
+    assert janitor.get_stats()['expired'] == 1
+    assert not janitor.get_stats()['running']
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for NocoDB circuit breaker and retry budget.
+Run: pytest test_circuit_breaker.py -v
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from bot_flow.flows import nocodb_utils
+from bot_flow.flows.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+    RetryBudget,
+)
+
+
+def test_opens_after_failure_threshold():
+    """Circuit opens after N consecutive failures and rejects requests"""
+    breaker = CircuitBreaker("GET tables/t/records", failure_threshold=3, recovery_timeout=30.0)
+
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_request()
+    assert exc_info.value.retry_after > 0
+    assert breaker.get_stats()['rejected'] == 1
+
+
+def test_success_resets_failures():
+    """A success in closed state resets consecutive failure counter"""
+    breaker = CircuitBreaker("GET tables/t/records", failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_probe_closes_circuit():
+    """After recovery timeout one probe is allowed; success closes the circuit"""
+    breaker = CircuitBreaker("GET tables/t/records", failure_threshold=1, recovery_timeout=30.0)
+    breaker.record_failure()
+    breaker.opened_until = time.monotonic() - 1  # Recovery timeout elapsed
+
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+    # Second concurrent probe is rejected
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_failure_reopens_circuit():
+    """Failed probe opens the circuit again, honoring Retry-After"""
+    breaker = CircuitBreaker("GET tables/t/records", failure_threshold=1, recovery_timeout=5.0)
+    breaker.record_failure()
+    breaker.opened_until = time.monotonic() - 1
+
+    breaker.before_request()
+    breaker.record_failure(retry_after=60.0)
+
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.opened_until - time.monotonic() > 50
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_releases_half_open_slot(mock_nocodb, monkeypatch):
+    """A probe cancelled mid-request must not leave the circuit rejecting forever"""
+    monkeypatch.setattr(CircuitBreakerRegistry, "_instance", None)
+    breaker = CircuitBreakerRegistry.get_instance().get_breaker("POST tables/t/records")
+    breaker.record_failure(retry_after=None)
+    breaker.state = CircuitState.OPEN
+    breaker.opened_until = time.monotonic() - 1
+
+    async def hanging(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    mock_nocodb(hanging)
+    probe = asyncio.create_task(nocodb_utils.nocodb_request_with_retry(
+        "POST", "https://nocodb.test/api/v2/tables/t/records", headers={}, json={}
+    ))
+    await asyncio.sleep(0.3)
+    assert breaker.half_open_calls == 1
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.half_open_calls == 0
+    assert breaker.before_request()  # Next probe is admitted
+
+
+def test_retry_budget_limits_retries_to_ratio_of_successes():
+    """Retries are limited to reserve + ratio * successes"""
+    budget = RetryBudget(ratio=0.5, min_tokens=1.0)
+
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    assert budget.get_stats() == {'tokens': 0.0, 'retries_allowed': 2, 'retries_denied': 2}
+
+
+def test_endpoint_key_keeps_records_count_apart_from_single_records():
+    """Record IDs share one breaker, records/count gets its own"""
+    base = "https://nocodb.test/api/v2/tables/abc"
+
+    assert nocodb_utils._endpoint_key("get", f"{base}/records/42?fields=Id") == "GET tables/abc/records/{id}"
+    assert nocodb_utils._endpoint_key("get", f"{base}/records/count?where=x") == "GET tables/abc/records/count"
+    assert nocodb_utils._endpoint_key("get", f"{base}/records") == "GET tables/abc/records"
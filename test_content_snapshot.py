@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for content registry, on-disk content snapshots and warm starts (no real API calls).
+Run: pytest test_content_snapshot.py -v
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from config import config
+from bot_flow.flows import content_registry, texts_loader
+from bot_flow.flows.cache_manager import CacheManager
+from bot_flow.flows.content_registry import ContentRegistry
+from bot_flow.flows.content_snapshot import ContentSnapshot
+from bot_flow.flows.nocodb_client import NocoDBClient
+
+TEXTS = {key: f"{key} text" for key in texts_loader.REQUIRED_TEXT_KEYS}
+ROWS = dict(TEXTS, PAYMENT_PHONE="+7 900 000-00-00", PAYMENT_AMOUNT="1000 рублей",
+            TELEGRAM_GROUP_LINK="https://t.me/+group")
+
+
+def test_snapshot_is_versioned_and_checksummed(tmp_path):
+    snapshot = ContentSnapshot(str(tmp_path))
+
+    assert snapshot.load('texts') is None
+    assert snapshot.save('texts', TEXTS)
+    assert not snapshot.save('texts', dict(TEXTS))  # Unchanged content is not rewritten
+    assert snapshot.save('texts', dict(TEXTS, welcome_message="new"))
+
+    assert snapshot.info('texts')['version'] == 2
+    assert snapshot.load('texts')['welcome_message'] == "new"
+
+    # Tampered file is ignored
+    path = tmp_path / "texts.json"
+    data = json.loads(path.read_text())
+    data['data']['welcome_message'] = "tampered"
+    path.write_text(json.dumps(data))
+    assert snapshot.load('texts') is None
+    assert snapshot.get_stats()['corrupt'] == 1
+
+
+@pytest.fixture
+def content_env(tmp_path, monkeypatch, mock_nocodb):
+    snapshot = ContentSnapshot(str(tmp_path))
+    monkeypatch.setattr(content_registry, "get_content_snapshot", lambda: snapshot)
+    monkeypatch.setattr(config, "NOCODB_API_TOKEN", "token")
+    monkeypatch.setattr(CacheManager, "_instance", None)
+    client = NocoDBClient("https://nocodb.test", "token")
+    monkeypatch.setattr(content_registry, "get_nocodb_client", lambda: client)
+
+    table = {"up": True, "requests": 0, "downloads": 0, "updated_at": "2026-01-01 10:00:00",
+             "rows": [{"action": k, "text": v} for k, v in ROWS.items()]}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        table["requests"] += 1
+        if not table["up"]:
+            return httpx.Response(404, json={"msg": "Table not found"})
+        page_info = {"isLastPage": True, "totalRows": len(table["rows"])}
+        if request.url.params.get("fields") == "UpdatedAt":
+            return httpx.Response(200, json={"list": [{"UpdatedAt": table["updated_at"]}],
+                                             "pageInfo": page_info})
+        table["downloads"] += 1
+        return httpx.Response(200, json={"list": table["rows"], "pageInfo": page_info})
+
+    mock_nocodb(handler)
+    return snapshot, table
+
+
+@pytest.mark.asyncio
+async def test_one_fetch_builds_texts_and_config_views(content_env):
+    snapshot, table = content_env
+    registry = ContentRegistry(["content"])
+
+    await registry.load()
+
+    assert table["downloads"] == 1
+    assert registry.texts == TEXTS
+    assert registry.config("PAYMENT_AMOUNT") == "1000 рублей"
+    assert registry.payment_amount == 1000
+    assert "PAYMENT_PHONE" not in registry.texts
+    assert snapshot.load('content') == ROWS
+
+
+@pytest.mark.asyncio
+async def test_warm_start_does_not_wait_for_nocodb(content_env):
+    snapshot, table = content_env
+    snapshot.save('content', ROWS)
+    table["up"] = False
+    registry = ContentRegistry(["content"])
+
+    # Boot: snapshot served, background refresh fails, stale data keeps being served
+    assert registry.load_snapshot() is not None
+    assert (await registry.load()).texts == TEXTS
+    await asyncio.sleep(0.05)
+    assert CacheManager.get_instance().get_stats()['refresh_failures'] == 1
+    assert registry.text("welcome_message") == "welcome_message text"
+
+    # Incomplete snapshot is not used
+    snapshot.save('content', {"welcome_message": "hi"})
+    assert ContentRegistry(["content"]).load_snapshot() is None
+
+
+@pytest.mark.asyncio
+async def test_unchanged_content_is_not_downloaded_again(content_env):
+    snapshot, table = content_env
+    registry = ContentRegistry(["content"])
+    changes = []
+    registry.on_change(changes.append)
+    await registry.load(use_cache=False)
+
+    # Unchanged fingerprint: one small probe request, no download
+    requests = table["requests"]
+    await registry.load(use_cache=False)
+    assert table["requests"] == requests + 1
+    assert table["downloads"] == 1
+
+    # Touched but identical rows: downloaded, but listeners are not notified
+    table["updated_at"] = "2026-01-02 10:00:00"
+    await registry.load(use_cache=False)
+    assert table["downloads"] == 2
+    assert changes == []
+
+    # Real edit: downloaded and applied
+    table["updated_at"] = "2026-01-03 10:00:00"
+    table["rows"][0] = dict(table["rows"][0], text="edited")
+    await registry.load(use_cache=False)
+    assert table["downloads"] == 3
+    assert len(changes) == 1 and registry.content is changes[0]
+
+    stats = registry.get_stats()
+    assert (stats['unchanged_probes'], stats['unchanged_downloads'], stats['changes']) == (1, 1, 1)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for hot-swapping the running flow (FlowExecutor.swap_flow).
+Run: pytest test_flow_swap.py -v
+"""
+import asyncio
+import pytest
+
+from bot_flow.core import create_flow, FlowExecutor
+
+
+def _build_flow(welcome_text: str, with_pending: bool = True):
+    builder = (
+        create_flow("payments")
+        .state("welcome")
+            .on_command("/start")
+            .reply(welcome_text)
+            .button("Pay", callback_data="pay", goto="pending" if with_pending else "done")
+    )
+    if with_pending:
+        builder = builder.state("pending").reply("Waiting").transition(to="done")
+    return builder.state("done").reply("Done").final().build()
+
+
+def test_swap_keeps_users_states_and_uses_new_texts():
+    executor = FlowExecutor(_build_flow("Hello"), "token")
+    executor.user_states = {101: "welcome", 102: "pending"}
+
+    assert executor.swap_flow(_build_flow("Hello again"))
+
+    assert executor.flow_version == 2
+    assert executor.user_states == {101: "welcome", 102: "pending"}
+    assert executor.flow.get_state("welcome").message == "Hello again"
+
+
+def test_swap_rejected_when_users_would_be_stranded():
+    old_flow = _build_flow("Hello")
+    executor = FlowExecutor(old_flow, "token")
+    executor.user_states = {101: "pending"}
+
+    assert not executor.swap_flow(_build_flow("Hello", with_pending=False))
+    assert executor.flow is old_flow and executor.flow_version == 1
+
+    # Nobody in the removed state: swap is fine
+    executor.user_states = {101: "welcome"}
+    assert executor.swap_flow(_build_flow("Hello", with_pending=False))
+
+
+@pytest.mark.asyncio
+async def test_background_rebuilds_are_coalesced():
+    executor = FlowExecutor(_build_flow("v0"), "token")
+    builds = []
+
+    async def rebuild():
+        builds.append(len(builds) + 1)
+        await asyncio.sleep(0.02)
+        return _build_flow(f"v{len(builds)}")
+
+    executor.schedule_flow_rebuild(rebuild)
+    await asyncio.sleep(0.01)  # Rebuild in progress
+    for _ in range(4):
+        executor.schedule_flow_rebuild(rebuild)
+    await executor._rebuild_task
+
+    # One rebuild running + one for all requests that arrived meanwhile
+    assert builds == [1, 2]
+    assert executor.flow.get_state("welcome").message == "v2"
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for GlobalPaymentTracker sync (uses httpx.MockTransport, no real API calls).
+Run: pytest test_global_payment_tracker.py -v
+"""
+import pytest
+
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker, chunk_record_ids
+
+API_URL = "https://nocodb.test"
+
+
+@pytest.fixture
+def table(payments_table):
+    return payments_table([
+        {"Id": 1, "Paid": False, "UpdatedAt": "2026-01-01 10:00:00+00:00"},
+        {"Id": 2, "Paid": False, "UpdatedAt": "2026-01-01 10:05:00+00:00"},
+        {"Id": 3, "Paid": True, "UpdatedAt": "2026-01-01 09:00:00+00:00"},
+    ])
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_fetches_only_changes(table, tmp_path):
+    """After the initial full sweep only rows newer than the watermark are applied"""
+    watermark_file = tmp_path / "watermark.json"
+    tracker = GlobalPaymentTracker()
+    tracker.configure(API_URL, "token", "payments", sync_mode="incremental",
+                      watermark_file=str(watermark_file))
+    tracker.track_user(101, "1")
+    tracker.track_user(102, "2")
+
+    # First sweep: full + watermark
+    await tracker.force_update()
+    assert tracker.stats['full_sweeps'] == 1
+    assert tracker.watermark.isoformat() == "2026-01-01T10:05:00+00:00"
+    assert watermark_file.exists()
+
+    # Admin ticks Paid for record 1
+    table.rows[0].update(Paid=True, UpdatedAt="2026-01-01 10:10:00+00:00")
+    await tracker.force_update()
+
+    assert tracker.stats['incremental_sweeps'] == 1
+    assert tracker.is_paid(101)
+    assert not tracker.is_paid(102)
+    # Two changed rows (new + tie at watermark), first older row stops paging
+    assert tracker.stats['users_updated'] == 2
+    assert tracker.watermark.isoformat() == "2026-01-01T10:10:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_watermark_survives_restart(table, tmp_path):
+    """A new tracker instance resumes incremental sync from the persisted watermark"""
+    watermark_file = str(tmp_path / "watermark.json")
+    first = GlobalPaymentTracker()
+    first.configure(API_URL, "token", "payments", sync_mode="incremental", watermark_file=watermark_file)
+    first.track_user(101, "1")
+    await first.force_update()
+
+    restarted = GlobalPaymentTracker()
+    restarted.configure(API_URL, "token", "payments", sync_mode="incremental", watermark_file=watermark_file)
+
+    assert restarted.watermark == first.watermark
+
+    # Watermark of another table is ignored
+    other = GlobalPaymentTracker()
+    other.configure(API_URL, "token", "other_table", sync_mode="incremental", watermark_file=watermark_file)
+    assert other.watermark is None
+
+
+def test_chunk_record_ids_respects_limits():
+    ids = [str(i) for i in range(1, 2501)]
+    chunks = chunk_record_ids(ids, max_ids=1000, max_where_length=200)
+
+    assert [i for chunk in chunks for i in chunk] == ids
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert all(len(f"(Id,in,{','.join(chunk)})") <= 200 for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_full_sweep_is_chunked_for_large_tracked_sets(table):
+    """Thousands of tracked users are split into bounded requests and merged"""
+    table.rows = [{"Id": i, "Paid": i % 500 == 0, "UpdatedAt": "2026-01-01 10:00:00+00:00"}
+                  for i in range(1, 3001)]
+    tracker = GlobalPaymentTracker()
+    tracker.configure(API_URL, "token", "payments")
+    for i in range(1, 3001):
+        tracker.track_user(i, str(i))
+
+    await tracker.force_update()
+
+    assert len(table.requests) > 1
+    assert all(len(r.url.params["where"]) <= 1500 for r in table.requests)
+    assert tracker.stats['users_updated'] == 3000
+    assert tracker.stats['sweep_chunks'] == len(table.requests)
+    assert tracker.is_paid(500) and tracker.is_paid(3000)
+    assert not tracker.is_paid(1)
+
+
+def test_sweep_index_is_maintained_incrementally():
+    """Track/untrack/rebind keep the reverse index and pre-built chunks in sync"""
+    tracker = GlobalPaymentTracker()
+    for i in range(1, 2001):
+        tracker.track_user(i, str(i))
+    tracker.track_user(5000, "local:1")
+
+    chunks = tracker.sweep_index.chunks()
+    assert sum(size for _, size in chunks) == 2000  # Provisional record excluded
+    assert all(len(where) <= 1500 for where, _ in chunks)
+    assert tracker.sweep_index.chunks() == chunks  # Cached, unchanged
+
+    assert tracker.rebind_record("local:1", "9001")
+    assert tracker.user_by_record["9001"] == 5000 and "local:1" not in tracker.user_by_record
+
+    for i in range(1, 1901):
+        tracker.untrack_user(i)
+    assert tracker.sweep_index.rebuilds >= 1
+    remaining = tracker.sweep_index.chunks()
+    assert sum(size for _, size in remaining) == 101
+    assert len(remaining) == 1
+    assert set(tracker.user_by_record) == {str(i) for i in range(1901, 2001)} | {"9001"}
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the registered users Bloom filter (uses httpx.MockTransport, no real API calls).
+Run: pytest test_membership.py -v
+"""
+import random
+
+import httpx
+import pytest
+
+from bot_flow.flows.membership import BloomFilter, RegisteredUsersFilter
+from bot_flow.flows.nocodb_client import NocoDBClient
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_error_rate():
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    members = random.Random(1).sample(range(10**9), 10_000)
+    for key in members:
+        bloom.add(key)
+
+    assert all(key in bloom for key in members)
+
+    others = [key for key in range(10**9 + 1, 10**9 + 20_001)]
+    false_positives = sum(1 for key in others if key in bloom)
+    assert false_positives / len(others) < 0.02
+    # ~9.6 bits per key at 1%
+    assert 11_000 < bloom.size_bytes < 13_000
+
+
+@pytest.fixture
+def table(mock_nocodb):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        offset = int(request.url.params.get("offset", 0))
+        rows = [{"TG ID": 101}, {"TG ID": 102}, {"TG ID": None}]
+        return httpx.Response(200, json={
+            "list": rows[offset:], "pageInfo": {"totalRows": 3, "isLastPage": True}
+        })
+
+    mock_nocodb(handler)
+    return requests
+
+
+@pytest.mark.asyncio
+async def test_filter_answers_definite_misses_after_load(table):
+    members = RegisteredUsersFilter(NocoDBClient("https://nocodb.test", "token"), "payments",
+                                    capacity=1000, error_rate=0.01)
+    # Not loaded yet: everyone is a possible hit (fall back to NocoDB)
+    assert members.might_contain(555)
+
+    assert await members.load()
+    assert members.might_contain(101) and members.might_contain(102)
+    assert not members.might_contain(555)
+
+    members.add(555)
+    assert members.might_contain(555)
+
+    stats = members.get_stats()
+    assert stats['ids'] == 3
+    assert stats['definite_misses'] == 1
+    assert stats['target_error_rate'] == "1.00%"
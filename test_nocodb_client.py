@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for typed NocoDB client (uses httpx.MockTransport, no real API calls).
+Run: pytest test_nocodb_client.py -v
+"""
+import asyncio
+import gzip
+import json
+import httpx
+import pytest
+
+from bot_flow.flows import nocodb_utils
+from bot_flow.flows.nocodb_client import NocoDBClient, where_and, where_eq, where_in
+
+API_URL = "https://nocodb.test"
+
+
+@pytest.fixture
+def requests_log(mock_nocodb):
+    """Install mock transport and collect requests"""
+    log = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        log.append(request)
+        path = request.url.path
+        if path.endswith("/records/count"):
+            return httpx.Response(200, json={"count": 42})
+        if path.endswith("/records/404"):
+            return httpx.Response(404, json={"msg": "not found"})
+        if request.method == "POST":
+            body = json.loads(request.content)
+            if isinstance(body, list):
+                return httpx.Response(200, json=[{"Id": i + 1} for i in range(len(body))])
+            return httpx.Response(200, json={"id": 7})
+        return httpx.Response(200, json={
+            "list": [{"Id": 1, "Paid": True}, {"id": 2, "Paid": False}],
+            "pageInfo": {"isLastPage": True}
+        })
+
+    mock_nocodb(handler)
+    return log
+
+
+def test_where_builders():
+    assert where_eq("Paid", False) == "(Paid,eq,false)"
+    assert where_in("Id", [1, "2"]) == "(Id,in,1,2)"
+    assert where_and(where_eq("TG ID", 5), "") == "(TG ID,eq,5)"
+
+
+@pytest.mark.asyncio
+async def test_list_normalizes_ids_and_projects_fields(requests_log):
+    client = NocoDBClient(API_URL, "token")
+
+    records = await client.list("t1", where=where_eq("Paid", False), fields=["Id", "Paid"], limit=10)
+
+    assert [r.id for r in records] == ["1", "2"]
+    assert records[0].get("Paid") is True
+    params = requests_log[0].url.params
+    assert params["fields"] == "Id,Paid"
+    assert params["where"] == "(Paid,eq,false)"
+    assert requests_log[0].headers["xc-token"] == "token"
+
+
+@pytest.mark.asyncio
+async def test_get_returns_none_for_missing_record(requests_log):
+    client = NocoDBClient(API_URL, "token")
+
+    assert await client.get("t1", "404") is None
+
+
+@pytest.mark.asyncio
+async def test_create_count_and_bulk_create(requests_log):
+    client = NocoDBClient(API_URL, "token")
+
+    assert await client.create("t1", {"TG ID": 1}) == "7"
+    assert await client.bulk_create("t1", [{"a": 1}, {"a": 2}]) == ["1", "2"]
+    assert await client.count("t1", where_eq("Paid", True)) == 42
+    assert len(requests_log) == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_records_follows_page_info(mock_nocodb):
+    """Iterator streams every page (beyond the first 1000-row page) and stops at last page"""
+    total_rows = 25
+    offsets = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params["limit"])
+        offsets.append(offset)
+        rows = [{"Id": i + 1} for i in range(offset, min(offset + limit, total_rows))]
+        return httpx.Response(200, json={
+            "list": rows,
+            "pageInfo": {"totalRows": total_rows, "isLastPage": offset + limit >= total_rows}
+        })
+
+    mock_nocodb(handler)
+    client = NocoDBClient(API_URL, "token")
+    ids = [r.id async for r in client.iter_records("t1", page_size=10, prefetch=2)]
+
+    assert ids == [str(i + 1) for i in range(total_rows)]
+    assert sorted(offsets) == [0, 10, 20]
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_gets_share_one_request(requests_log):
+    """Concurrent identical GETs (param order aside) cost one request; writes are never shared"""
+    client = NocoDBClient(API_URL, "token")
+    before = nocodb_utils.get_request_stats()
+
+    first, second, other = await asyncio.gather(
+        client.list("t1", where="(Paid,eq,false)", fields=["Id", "Paid"]),
+        nocodb_utils.nocodb_request_with_retry(
+            "GET", f"{API_URL}/api/v2/tables/t1/records",
+            headers={"xc-token": "token"}, params={"fields": "Id,Paid", "where": "(Paid,eq,false)"},
+            timeout=client.timeout
+        ),
+        client.list("t2")
+    )
+    assert len(requests_log) == 2
+    assert [r.id for r in first] == ["1", "2"] and len(other) == 2
+    # Every caller decodes its own copy of the body
+    nocodb_utils.response_json(second)["list"].clear()
+    assert len(first) == 2
+
+    await asyncio.gather(client.create("t1", {"TG ID": 1}), client.create("t1", {"TG ID": 1}))
+    assert len(requests_log) == 4
+
+    stats = nocodb_utils.get_request_stats()
+    assert stats['coalesced'] - before['coalesced'] == 1
+    assert stats['gets'] - before['gets'] == 3
+    assert stats['in_flight_gets'] == 0
+
+
+@pytest.mark.asyncio
+async def test_coalesced_gets_share_gzip_encoded_response(mock_nocodb):
+    """Callers sharing a compressed response get the decoded body, not a second decompression"""
+    body = gzip.compress(json.dumps({"list": [{"Id": 1}], "pageInfo": {"isLastPage": True}}).encode())
+    requests = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal requests
+        requests += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, content=body, headers={
+            "Content-Type": "application/json", "Content-Encoding": "gzip"
+        })
+
+    mock_nocodb(handler)
+    client = NocoDBClient(API_URL, "token")
+    results = await asyncio.gather(*(client.list("t1") for _ in range(3)))
+
+    assert requests == 1
+    assert [[r.id for r in records] for records in results] == [["1"]] * 3
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Tests for WriteOutbox (uses httpx.MockTransport, no real API calls).
+Run: pytest test_outbox.py -v
+"""
+import asyncio
+import json
+import httpx
+import pytest
+
+from bot_flow.flows import global_payment_tracker, payment_flow
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker
+from bot_flow.flows.nocodb_client import NocoDBClient, Record
+from bot_flow.flows.outbox import WriteOutbox, is_provisional
+
+
+class FakeNocoDB:
+    """Bulk create/update endpoint that can be switched into outage mode"""
+
+    def __init__(self):
+        self.down = False
+        self.delay = 0.0
+        self.next_id = 100
+        self.requests = []
+        self.rejected = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            return httpx.Response(400, json={"msg": "temporarily rejected"})
+        rows = json.loads(request.content)
+        if any(row.get("Price") == "invalid" for row in rows):
+            self.rejected.append(rows)
+            return httpx.Response(400, json={"msg": "invalid Price"})
+        self.requests.append((request.method, rows))  # Committed before the (slow) response
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if request.method == "POST":
+            ids = list(range(self.next_id, self.next_id + len(rows)))
+            self.next_id += len(rows)
+            return httpx.Response(200, json=[{"Id": i} for i in ids])
+        return httpx.Response(200, json=[{"Id": row["Id"]} for row in rows])
+
+
+@pytest.fixture
+def nocodb(mock_nocodb):
+    fake = FakeNocoDB()
+    mock_nocodb(fake.handler)
+    return fake
+
+
+def _outbox(path):
+    return WriteOutbox(str(path), NocoDBClient("https://nocodb.test", "token"), window=0.01)
+
+
+@pytest.mark.asyncio
+async def test_creates_are_acknowledged_then_flushed_and_reconciled(nocodb, tmp_path):
+    outbox = _outbox(tmp_path / "outbox.db")
+    tracker = GlobalPaymentTracker()
+    reconciled = []
+
+    def on_created(provisional_id, record_id, fields):
+        reconciled.append((provisional_id, record_id, fields["TG ID"]))
+        tracker.rebind_record(provisional_id, record_id)
+
+    outbox.on_reconciled(on_created)
+
+    first = outbox.enqueue_create("payments", {"TG ID": 1, "Paid": False})
+    second = outbox.enqueue_create("payments", {"TG ID": 2, "Paid": False})
+    outbox.enqueue_update("payments", first, {"FullName": "Ann"})
+    tracker.track_user(1, first)
+
+    assert is_provisional(first) and outbox.resolve(first) is None
+    assert nocodb.requests == []
+
+    assert await outbox.flush() == 3
+
+    # One bulk insert for both creates, then update with the real ID
+    assert nocodb.requests[0] == ("POST", [{"TG ID": 1, "Paid": False}, {"TG ID": 2, "Paid": False}])
+    assert nocodb.requests[1] == ("PATCH", [{"Id": "100", "FullName": "Ann"}])
+    assert reconciled == [(first, "100", 1), (second, "101", 2)]
+    assert outbox.resolve(first) == "100"
+    assert tracker.user_records[1] == "100"
+    assert outbox.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_pending_writes_survive_outage_and_restart(nocodb, tmp_path):
+    path = tmp_path / "outbox.db"
+    outbox = _outbox(path)
+    nocodb.down = True
+
+    provisional_id = outbox.enqueue_create("payments", {"TG ID": 7, "Paid": False})
+    assert await outbox.flush() == 0
+    assert outbox.get_stats()['retries'] == 1
+    outbox.close()
+
+    # Bot restarts after the outage; the retry becomes due
+    nocodb.down = False
+    restarted = _outbox(path)
+    restarted.db.execute("UPDATE outbox SET next_attempt_at = 0")
+    assert restarted.pending_count() == 1
+    assert await restarted.flush() == 1
+    assert restarted.resolve(provisional_id) == "100"
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_insert_in_flight(nocodb, tmp_path):
+    """Stopping during a slow bulk insert must not re-insert its rows on the next start"""
+    nocodb.delay = 0.3
+    outbox = _outbox(tmp_path / "outbox.db")
+    await outbox.start()
+    outbox.enqueue_create("payments", {"TG ID": 1, "Paid": False})
+    await asyncio.sleep(0.1)  # Bulk insert is now in flight
+
+    await outbox.stop()
+    assert outbox.pending_count() == 0
+    outbox.close()
+
+    restarted = _outbox(tmp_path / "outbox.db")
+    await restarted.start()
+    await restarted.stop()
+    assert [method for method, _ in nocodb.requests] == ["POST"]
+
+
+class TimeoutAfterCommitClient:
+    """NocoDB client whose first bulk insert is committed but times out"""
+
+    def __init__(self):
+        self.rows = {}
+        self.inserts = []
+        self.timeouts = 1
+
+    async def bulk_create(self, table_id, rows):
+        self.inserts.append([row["TG ID"] for row in rows])
+        ids = []
+        for fields in rows:
+            ids.append(str(len(self.rows) + 1))
+            self.rows[ids[-1]] = fields
+        if self.timeouts:
+            self.timeouts -= 1
+            raise httpx.ReadTimeout("timed out")
+        return ids
+
+    async def list(self, table_id, where=None, fields=None, limit=None, **kwargs):
+        values = where[len("(TG ID,in,"):-1].split(",")
+        return [Record(record_id, {"Id": int(record_id), "TG ID": row["TG ID"]})
+                for record_id, row in self.rows.items() if str(row["TG ID"]) in values]
+
+
+@pytest.mark.asyncio
+async def test_retried_create_committed_before_timeout_is_not_inserted_again(tmp_path):
+    client = TimeoutAfterCommitClient()
+    outbox = WriteOutbox(str(tmp_path / "outbox.db"), client, window=0.01, dedup_field="TG ID")
+    first = outbox.enqueue_create("payments", {"TG ID": 1, "Paid": False})
+    second = outbox.enqueue_create("payments", {"TG ID": 2, "Paid": False})
+
+    assert await outbox.flush() == 0  # Committed by NocoDB, but the response timed out
+    third = outbox.enqueue_create("payments", {"TG ID": 3, "Paid": False})
+    outbox.db.execute("UPDATE outbox SET next_attempt_at = 0")
+
+    assert await outbox.flush() == 3
+    assert client.inserts == [[1, 2], [3]]
+    assert [outbox.resolve(i) for i in (first, second, third)] == ["1", "2", "3"]
+    assert outbox.get_stats()['deduplicated'] == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_is_resent_row_by_row(nocodb, tmp_path):
+    """One invalid row is given up alone; the rest of its batch is created"""
+    outbox = WriteOutbox(str(tmp_path / "outbox.db"), NocoDBClient("https://nocodb.test", "token"),
+                         window=0.01, max_attempts=1)
+    first = outbox.enqueue_create("payments", {"TG ID": 1, "Price": 1000})
+    invalid = outbox.enqueue_create("payments", {"TG ID": 2, "Price": "invalid"})
+    third = outbox.enqueue_create("payments", {"TG ID": 3, "Price": 1000})
+
+    assert await outbox.flush() == 2
+    assert len(nocodb.rejected) == 2  # The batch, then the invalid row alone
+    assert [rows for _, rows in nocodb.requests] == [[{"TG ID": 1, "Price": 1000}],
+                                                     [{"TG ID": 3, "Price": 1000}]]
+    assert outbox.resolve(first) == "100" and outbox.resolve(third) == "101"
+    assert outbox.resolve(invalid) is None
+    assert outbox.get_stats()['failed'] == 1 and outbox.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_tracker_skips_provisional_records(nocodb):
+    tracker = GlobalPaymentTracker()
+    tracker.configure("https://nocodb.test", "token", "payments")
+    tracker.track_user(1, "local:5")
+
+    await tracker.force_update()
+
+    assert nocodb.requests == []
+
+
+class FakeUser:
+    id = 555
+    username = "user"
+    first_name = "User"
+
+
+class FakeContext:
+    """Minimal FlowContext for running flow actions"""
+
+    def __init__(self):
+        self.user = FakeUser()
+        self.data = {}
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+
+@pytest.mark.asyncio
+async def test_repeated_start_during_outage_registers_once(nocodb, tmp_path, monkeypatch):
+    """/start twice while NocoDB is down: the queued registration is found, one record is created"""
+    outbox = _outbox(tmp_path / "outbox.db")
+    client = NocoDBClient("https://nocodb.test", "token")
+    monkeypatch.setattr(payment_flow, "NOCODB_API_TOKEN", "token")
+    monkeypatch.setattr(payment_flow, "NOCODB_TABLE_ID", "payments")
+    monkeypatch.setattr(payment_flow, "_outbox", outbox)
+    monkeypatch.setattr(payment_flow, "get_replica", lambda: None)
+    monkeypatch.setattr(payment_flow, "get_registered_users", lambda: None)
+    monkeypatch.setattr(payment_flow, "get_nocodb_client", lambda: client)
+    monkeypatch.setattr(payment_flow, "_current_price", lambda: 1000)
+    monkeypatch.setattr(global_payment_tracker, "_global_tracker", GlobalPaymentTracker())
+
+    nocodb.down = True
+    for _ in range(2):
+        ctx = FakeContext()
+        await payment_flow.check_user_registration(ctx)
+        if not ctx.get('already_registered'):
+            await payment_flow.create_payment_record(ctx)
+
+    assert ctx.get('already_registered') and ctx.get('record_id') == "local:1"
+    assert outbox.pending_count() == 1
+
+    nocodb.down = False
+    await outbox.flush()
+    assert [(method, len(rows)) for method, rows in nocodb.requests] == [("POST", 1)]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for push-based payment confirmation (tracker events -> executor).
+Run: pytest test_payment_events.py -v
+"""
+import asyncio
+import pytest
+
+from bot_flow.core import create_flow, FlowExecutor
+from bot_flow.flows import payment_flow
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker
+from bot_flow.flows.nocodb_client import Record
+from bot_flow.flows.outbox import WriteOutbox
+
+
+class RecordingBot:
+    """Collects messages instead of sending them to Telegram"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+class FakeApplication:
+    def __init__(self):
+        self.bot = RecordingBot()
+
+
+async def _never_paid(ctx) -> bool:
+    return False
+
+
+def _build_executor(tracker):
+    flow = (
+        create_flow("payments")
+        .state("awaiting_payment")
+            .poll(_never_paid, interval=60, event_driven=True)
+            .on_condition(lambda ctx: ctx.poll_result, goto="success")
+        .state("success")
+            .reply("Paid!")
+            .final()
+        .build()
+    )
+    executor = FlowExecutor(flow, "token")
+    executor.application = FakeApplication()
+    executor._global_tracker = tracker
+    tracker.subscribe(executor._on_payment_status_change)
+    return executor
+
+
+@pytest.mark.asyncio
+async def test_subscribers_receive_status_change_events():
+    tracker = GlobalPaymentTracker()
+    tracker.track_user(101, "1")
+    tracker.track_user(102, "2")
+
+    by_user, by_record, everything = [], [], []
+
+    async def on_user(event):
+        by_user.append(event)
+
+    async def on_record(event):
+        by_record.append(event)
+
+    async def on_any(event):
+        everything.append(event)
+
+    tracker.subscribe(on_user, user_id=101)
+    tracker.subscribe(on_record, record_id="2")
+    tracker.subscribe(on_any)
+
+    tracker.apply_records([Record("1", {"Paid": True}), Record("2", {"Paid": False})])
+    await asyncio.sleep(0)
+
+    # Record 2 did not change -> only one event
+    assert [e.user_id for e in by_user] == [101]
+    assert by_record == []
+    assert len(everything) == 1 and everything[0].paid and everything[0].source == 'sweep'
+
+    tracker.unsubscribe(on_any)
+    tracker.apply_records([Record("2", {"Paid": True})], source='webhook')
+    await asyncio.sleep(0)
+
+    assert [e.source for e in by_record] == ['webhook']
+    assert len(everything) == 1
+
+
+@pytest.mark.asyncio
+async def test_restored_user_is_confirmed_without_polling_loop():
+    tracker = GlobalPaymentTracker()
+    tracker.track_user(101, "1")
+    executor = _build_executor(tracker)
+
+    await executor.restore_user_states([{'tg_id': 101, 'record_id': "1"}])
+    assert executor.polling_tasks == {}
+    assert 101 in executor.poll_contexts
+
+    tracker.apply_records([Record("1", {"Paid": True})])
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert executor.user_states[101] == "success"
+    assert executor.application.bot.sent == [(101, "Paid!")]
+    assert tracker.get_tracked_count() == 0
+
+
+class CreatingClient:
+    """NocoDB client accepting bulk inserts"""
+
+    async def bulk_create(self, table_id, rows):
+        return [str(42 + index) for index in range(len(rows))]
+
+
+@pytest.mark.asyncio
+async def test_registration_queued_before_restart_is_restored_when_flushed(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    WriteOutbox(path, CreatingClient()).enqueue_create("payments", {"TG ID": 101, "Paid": False})
+
+    # After the restart: the record is not in NocoDB yet, nobody knows the user
+    tracker = GlobalPaymentTracker()
+    executor = _build_executor(tracker)
+    outbox = WriteOutbox(path, CreatingClient())
+
+    async def on_created(provisional_id, record_id, fields):
+        if not tracker.rebind_record(provisional_id, record_id):
+            await payment_flow.restore_queued_registration(executor, tracker, record_id, fields)
+
+    outbox.on_reconciled(on_created)
+    assert await outbox.flush() == 1
+    assert tracker.user_records[101] == "42"
+    assert executor.user_states[101] == "awaiting_payment"
+
+    tracker.apply_records([Record("42", {"Paid": True})])
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert executor.user_states[101] == "success"
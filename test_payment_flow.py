@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for payment flow actions (uses httpx.MockTransport, no real API calls).
+Run: pytest test_payment_flow.py -v
+"""
+import datetime
+
+import pytest
+
+from bot_flow.flows import payment_flow
+from bot_flow.flows.nocodb_client import NocoDBClient
+from bot_flow.flows.replica import PaymentsReplica
+
+
+def _row(record_id, paid, created, price):
+    return {"Id": record_id, "TG ID": 100 + record_id, "Price": price, "Paid": paid,
+            "CreatedAt": created, "UpdatedAt": created}
+
+
+@pytest.mark.asyncio
+async def test_stats_breakdown_is_served_from_replica(payments_table, tmp_path, monkeypatch):
+    """Breakdown costs no API calls, buckets by UTC day and reports every paid price"""
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    day = lambda offset: f"{today - datetime.timedelta(days=offset)} 00:30:00+00:00"
+    table = payments_table([
+        _row(1, True, day(0), price=1500),
+        _row(2, True, day(3), price=1500),
+        _row(3, False, day(3), price=1500),
+        _row(4, True, day(30), price=1000),  # Older price, outside the day window
+    ])
+    replica = PaymentsReplica(str(tmp_path / "replica.db"),
+                              NocoDBClient("https://nocodb.test", "token"), "payments")
+    assert await replica.full_sync()
+    monkeypatch.setattr(payment_flow, "get_replica", lambda: replica)
+    requests = len(table.requests)
+
+    try:
+        breakdown = await payment_flow._fetch_statistics_breakdown()
+    finally:
+        replica.close()
+
+    assert len(table.requests) == requests
+    assert list(breakdown['per_day']) == [
+        (today - datetime.timedelta(days=offset)).isoformat()
+        for offset in range(payment_flow.STATS_BREAKDOWN_DAYS)
+    ]
+    assert breakdown['per_day'][today.isoformat()] == 1
+    assert breakdown['per_day'][(today - datetime.timedelta(days=3)).isoformat()] == 2
+    assert breakdown['paid_per_price'] == {1000: 1, 1500: 2}
+
+
+@pytest.mark.asyncio
+async def test_stats_breakdown_is_left_out_without_replica(payments_table, monkeypatch):
+    table = payments_table([_row(1, True, "2026-01-01 10:00:00+00:00", price=1000)])
+    monkeypatch.setattr(payment_flow, "get_replica", lambda: None)
+
+    assert await payment_flow._fetch_statistics_breakdown() == {}
+    assert table.requests == []
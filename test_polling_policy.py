@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for AdaptivePollingPolicy and its use in GlobalPaymentTracker.
+Run: pytest test_polling_policy.py -v
+"""
+import time
+import httpx
+import pytest
+
+from bot_flow.core import AdaptivePollingPolicy
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker, SweepIndex
+
+
+def test_interval_backs_off_exponentially_with_age():
+    policy = AdaptivePollingPolicy(base_interval=20, max_interval=3600, fresh_period=600)
+    now = time.time()
+
+    for age, expected in [(0, 20), (599, 20), (600, 40), (1199, 40), (1200, 80), (2400, 160),
+                          (3 * 24 * 3600, 3600)]:
+        policy.register("rec", created_at=now - age)
+        assert policy.interval_for("rec", now) == expected, age
+
+
+def test_touch_moves_stale_key_back_to_fast_lane():
+    policy = AdaptivePollingPolicy(base_interval=20, max_interval=3600, fresh_period=600)
+    now = time.time()
+    policy.register("old", created_at=now - 3 * 24 * 3600)
+    policy.register("new")
+
+    policy.record_checks(["old", "new"], now)
+    assert policy.due(["old", "new"], now + 25) == ["new"]
+
+    policy.touch("old")
+    assert policy.interval_for("old") == 20
+    assert policy.due(["old", "new"], time.time() + 25) == ["old", "new"]
+
+    stats = policy.get_stats()
+    assert stats['touches'] == 1
+    assert stats['skipped'] == 1
+
+
+@pytest.mark.asyncio
+async def test_tracker_sweeps_skip_backed_off_records(mock_nocodb):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        where = request.url.params["where"]
+        ids = where[len("(Id,in,"):-1].split(",")
+        requested.append(ids)
+        return httpx.Response(200, json={"list": [{"Id": int(i), "Paid": False} for i in ids],
+                                         "pageInfo": {"isLastPage": True}})
+
+    mock_nocodb(handler)
+    tracker = GlobalPaymentTracker()
+    tracker.configure("https://nocodb.test", "token", "payments")
+    tracker.polling_policy = AdaptivePollingPolicy(base_interval=20, fresh_period=600)
+    tracker.track_user(101, "1")  # Just registered
+    tracker.track_user(102, "2", created_at="2020-01-01 00:00:00+00:00")  # Abandoned
+
+    await tracker.force_update()  # Both due on first sweep
+    tracker.polling_policy.record_checks([101], time.time() - 20)  # Fresh record due again
+
+    await tracker.force_update()
+    assert requested == [["1", "2"], ["1"]]
+
+    tracker.untrack_user(102)
+    assert tracker.polling_policy.get_stats()['scheduled_keys'] == 1
+
+
+@pytest.mark.asyncio
+async def test_incremental_reconcile_checks_backed_off_records(payments_table, tmp_path):
+    """The periodic full reconcile is not filtered by the polling policy"""
+    table = payments_table([
+        {"Id": 1, "Paid": False, "UpdatedAt": "2026-01-01 10:00:00+00:00"},
+        {"Id": 2, "Paid": False, "UpdatedAt": "2026-01-01 09:00:00+00:00"},
+    ])
+    tracker = GlobalPaymentTracker()
+    tracker.configure("https://nocodb.test", "token", "payments", sync_mode="incremental",
+                      watermark_file=str(tmp_path / "watermark.json"))
+    tracker.polling_policy = AdaptivePollingPolicy(base_interval=20, fresh_period=600)
+    tracker.track_user(101, "1")
+    tracker.track_user(102, "2", created_at="2020-01-01 00:00:00+00:00")  # Abandoned
+    await tracker.force_update()
+    tracker.polling_policy.record_checks([101, 102])  # Neither is due now
+
+    # Change the watermark missed (UpdatedAt older than the watermark)
+    table.rows[1].update(Paid=True, UpdatedAt="2026-01-01 09:30:00+00:00")
+    tracker.sweeps_since_full = tracker.full_sync_every
+    await tracker.force_update()
+
+    assert tracker.stats['full_sweeps'] == 2
+    assert tracker.is_paid(102)
+
+
+def test_tracker_sweep_visits_only_due_chunks():
+    tracker = GlobalPaymentTracker()
+    tracker.sweep_index = SweepIndex(max_ids=2)
+    tracker.polling_policy = AdaptivePollingPolicy(base_interval=20, fresh_period=600)
+    for user_id in (101, 102):
+        tracker.track_user(user_id, str(user_id - 100), created_at="2020-01-01 00:00:00+00:00")
+    for user_id in (103, 104):
+        tracker.track_user(user_id, str(user_id - 100))
+
+    checked, queries, user_ids = tracker._select_due()  # First sweep: everyone
+    assert queries == [("(Id,in,1,2)", 2), ("(Id,in,3,4)", 2)]
+    tracker._record_checks(user_ids, checked)
+    assert tracker._select_due()[2] == []
+
+    # Fresh chunk is due again one interval later; the backed-off chunk is not visited
+    tracker.polling_policy.record_checks([103, 104], time.time() - 20)
+    (_, visited), queries, user_ids = tracker._select_due()
+    assert visited == [1]
+    assert queries == [("(Id,in,3,4)", 2)]
+    assert user_ids == [103, 104]
+
+    # Interaction brings the backed-off user's chunk into the next interval
+    tracker.polling_policy.touch(101)
+    deadline = tracker.polling_policy.due_deadline(time.time() + 20)
+    assert tracker.sweep_index.due_chunks(deadline) == [0, 1]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for PaymentsReplica (uses httpx.MockTransport, no real API calls).
+Run: pytest test_replica.py -v
+"""
+import pytest
+
+from bot_flow.flows.nocodb_client import NocoDBClient, Record
+from bot_flow.flows.replica import PaymentsReplica
+
+
+def _row(record_id, tg_id, paid, created, updated, price=1000):
+    return {"Id": record_id, "TG ID": tg_id, "TG": f"user{tg_id}", "First Name": "Ann",
+            "FullName": "Ann Lee", "Price": price, "Paid": paid,
+            "CreatedAt": created, "UpdatedAt": updated}
+
+
+@pytest.fixture
+def table(payments_table):
+    return payments_table([
+        _row(1, 101, True, "2026-01-01 09:00:00+00:00", "2026-01-01 09:30:00+00:00"),
+        _row(2, 102, False, "2026-01-02 10:00:00+00:00", "2026-01-02 10:00:00+00:00"),
+        _row(3, 103, False, "2026-01-02 11:00:00+00:00", "2026-01-02 11:00:00+00:00"),
+    ])
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = PaymentsReplica(str(tmp_path / "replica.db"),
+                              NocoDBClient("https://nocodb.test", "token"), "payments")
+    yield replica
+    replica.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_are_served_locally_after_full_sync(table, replica):
+    assert not replica.is_ready
+    assert await replica.full_sync()
+    requests = len(table.requests)
+
+    record = replica.find_by_tg_id(101)
+    assert record.id == "1" and record.get("Paid") is True
+    assert replica.find_by_tg_id(999) is None
+    assert replica.count() == 3 and replica.count(paid=True) == 1
+    assert [r.get("TG ID") for r in replica.awaiting_payment()] == [102, 103]
+    assert replica.count_per_day(["2026-01-02", "2026-01-03"]) == {"2026-01-02": 2, "2026-01-03": 0}
+    assert replica.count_paid_per_price() == {1000: 1}
+    assert replica.count_paid_per_price(since="2026-01-02") == {}
+
+    # No API calls for reads
+    assert len(table.requests) == requests
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_applies_changes_and_notifies(table, replica):
+    await replica.full_sync()
+    changed = []
+    replica.on_change(changed.extend)
+
+    table.rows[1].update(Paid=True, UpdatedAt="2026-01-03 12:00:00+00:00")
+    await replica.sync_changes()
+
+    assert replica.find_by_tg_id(102).get("Paid") is True
+    assert "2" in [r.id for r in changed]
+    assert replica.get_stats()['watermark'] == "2026-01-03 12:00:00+00:00"
+
+
+@pytest.mark.asyncio
+async def test_partial_write_through_and_outage(table, replica):
+    await replica.full_sync()
+
+    # Webhook row with only Id/Paid keeps other columns
+    replica.apply_rows([Record("3", {"Id": 3, "Paid": True})])
+    record = replica.find_by_tg_id(103)
+    assert record.get("Paid") is True and record.get("FullName") == "Ann Lee"
+
+    # Failed resync keeps the existing copy
+    table.down = True
+    assert not await replica.full_sync()
+    assert replica.is_ready and replica.count() == 3
+
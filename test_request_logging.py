@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for structured NocoDB request logging.
+Run: pytest test_request_logging.py -v
+"""
+import logging
+import httpx
+import pytest
+
+from bot_flow.flows.nocodb_utils import nocodb_request_with_retry, response_json
+from bot_flow.flows.request_logging import SamplingFilter, logger
+
+
+def _record(level: int) -> logging.LogRecord:
+    return logging.LogRecord("bot_flow.nocodb", level, __file__, 0, "msg", (), None)
+
+
+def test_sampling_filter_always_passes_warnings():
+    """WARNING records are never sampled out"""
+    sampling = SamplingFilter(sample_rate=0.0)
+
+    assert sampling.filter(_record(logging.WARNING))
+    assert not sampling.filter(_record(logging.INFO))
+    assert sampling.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_response_json_decoded_once(mock_nocodb):
+    """Debug logging and caller share a single JSON decode"""
+    mock_nocodb(lambda request: httpx.Response(200, json={"list": [{"Id": 1}]}))
+    logger.setLevel(logging.DEBUG)
+    try:
+        response = await nocodb_request_with_retry(
+            "GET", "https://app.nocodb.com/api/v2/tables/t/records", headers={}
+        )
+        # Logging already decoded the body - a second decode must not happen
+        response.json = lambda: pytest.fail("response body decoded twice")
+        assert response_json(response) == {"list": [{"Id": 1}]}
+    finally:
+        logger.setLevel(logging.NOTSET)
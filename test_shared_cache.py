@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared L2 cache (two workers simulated by two caches on one file).
+Run: pytest test_shared_cache.py -v
+"""
+import asyncio
+
+import pytest
+
+from bot_flow.flows.cache_manager import CacheManager
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker
+from bot_flow.flows.nocodb_client import Record
+from bot_flow.flows.shared_cache import SharedCache
+
+
+def workers(tmp_path, count=2):
+    """Caches of `count` workers sharing one L2 file"""
+    path = str(tmp_path / "shared.db")
+    caches = []
+    for _ in range(count):
+        cache = CacheManager()
+        cache.attach_l2(SharedCache(path))
+        cache.l2_poll_interval = 0.01
+        caches.append(cache)
+    return caches
+
+
+def test_leases_are_exclusive_until_released(tmp_path):
+    first = SharedCache(str(tmp_path / "shared.db"))
+    second = SharedCache(str(tmp_path / "shared.db"))
+
+    assert first.acquire_lease("fill:texts", ttl=10)
+    assert first.acquire_lease("fill:texts", ttl=10)  # Holder may extend
+    assert not second.acquire_lease("fill:texts", ttl=10)
+    first.release_lease("fill:texts")
+    assert second.acquire_lease("fill:texts", ttl=10)
+
+    # Expired lease of a crashed holder can be taken over
+    assert first.acquire_lease("fill:config", ttl=0)
+    assert second.acquire_lease("fill:config", ttl=10)
+
+
+@pytest.mark.asyncio
+async def test_one_worker_fills_and_others_read_l2(tmp_path):
+    worker_a, worker_b = workers(tmp_path)
+    fetches = 0
+
+    async def fetch():
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0.05)
+        return {"welcome_message": "hi"}
+
+    # Cold start of both workers at once: one fetch, the other waits for L2
+    values = await asyncio.gather(
+        worker_a.get_or_fetch('texts', fetch, ttl=300),
+        worker_b.get_or_fetch('texts', fetch, ttl=300)
+    )
+    assert values == [{"welcome_message": "hi"}] * 2
+    assert fetches == 1
+
+    served = [worker_a.get_stats()['served_by'], worker_b.get_stats()['served_by']]
+    assert sorted(s['origin'] for s in served) == [0, 1]
+    assert sorted(s['l2'] for s in served) == [0, 1]
+
+    # Later lookups come from L1
+    worker_b.get('texts')
+    assert worker_b.get_stats()['served_by']['l1'] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_refresh_adopts_value_refreshed_by_other_worker(tmp_path):
+    worker_a, worker_b = workers(tmp_path)
+    worker_a.set('config', {"PAYMENT_AMOUNT": "1000"}, ttl=0, hard_ttl=60)
+    assert worker_b.get('config') == {"PAYMENT_AMOUNT": "1000"}
+
+    # Worker A refreshed; worker B's stale copy picks it up without fetching
+    worker_a.set('config', {"PAYMENT_AMOUNT": "1500"}, ttl=300, hard_ttl=60)
+
+    async def fetch():
+        raise AssertionError("worker B must not fetch")
+
+    assert await worker_b.get_or_fetch('config', fetch, ttl=300, hard_ttl=60) == {"PAYMENT_AMOUNT": "1000"}
+    await asyncio.sleep(0.01)
+    assert worker_b.get('config') == {"PAYMENT_AMOUNT": "1500"}
+    assert worker_b.get_stats()['served_by']['origin'] == 0
+
+
+@pytest.mark.asyncio
+async def test_tracker_sweeps_only_statuses_missing_from_l2(tmp_path):
+    shared = SharedCache(str(tmp_path / "shared.db"))
+    queried = []
+
+    class FakeClient:
+        async def list(self, table_id, where=None, fields=None, limit=None, **kwargs):
+            queried.append(where)
+            return [Record("1", {"Id": 1, "Paid": True}), Record("2", {"Id": 2, "Paid": False})]
+
+    def make_tracker():
+        tracker = GlobalPaymentTracker()
+        tracker.configure("https://nocodb.test", "token", "payments")
+        tracker.client = FakeClient()
+        tracker.shared_cache = shared
+        tracker.track_user(101, "1")
+        tracker.track_user(102, "2")
+        return tracker
+
+    first, second = make_tracker(), make_tracker()
+    await first.force_update()
+    await second.force_update()
+
+    assert len(queried) == 1
+    assert second.is_paid(101) and not second.is_paid(102)
+    assert second.get_stats()['statuses_served_by'] == {'shared': 2, 'origin': 0}
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for NocoDB webhook receiver (local fake webhook sender, no real NocoDB).
+Run: pytest test_webhook_server.py -v
+"""
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+
+from bot_flow.flows.global_payment_tracker import GlobalPaymentTracker
+from bot_flow.flows.webhook_server import PaymentWebhookServer, extract_rows
+
+SECRET = "test-secret"
+
+
+def _payload(rows, table_id="payments"):
+    """NocoDB v2 'records.after.update' payload"""
+    return {
+        "type": "records.after.update",
+        "data": {"table_id": table_id, "rows": rows, "previous_rows": []}
+    }
+
+
+@pytest_asyncio.fixture
+async def webhook():
+    tracker = GlobalPaymentTracker()
+    tracker.track_user(101, "1")
+    tracker.track_user(102, "2")
+
+    confirmed = []
+    done = asyncio.Event()
+
+    async def on_paid(user_id):
+        confirmed.append(user_id)
+        done.set()
+
+    server = PaymentWebhookServer(tracker, SECRET, on_paid=on_paid, port=0, table_id="payments")
+    await server.start()
+    url = f"http://127.0.0.1:{server.port}{server.path}"
+    yield tracker, server, url, confirmed, done
+    await server.stop()
+
+
+def test_extract_rows_supports_v1_and_v2_payloads():
+    assert extract_rows(_payload([{"Id": 1}])) == [{"Id": 1}]
+    assert extract_rows({"type": "records.after.update", "data": {"Id": 5, "Paid": True}}) == [{"Id": 5, "Paid": True}]
+    assert extract_rows({"data": "garbage"}) == []
+
+
+@pytest.mark.asyncio
+async def test_webhook_confirms_payment_immediately(webhook):
+    tracker, server, url, confirmed, done = webhook
+
+    async with httpx.AsyncClient() as sender:
+        response = await sender.post(
+            url,
+            json=_payload([{"Id": 1, "Paid": True}]),
+            headers={"X-Webhook-Secret": SECRET}
+        )
+
+    assert response.status_code == 200
+    await asyncio.wait_for(done.wait(), timeout=1.0)
+    assert confirmed == [101]
+    assert tracker.is_paid(101)
+    assert not tracker.is_paid(102)
+
+
+@pytest.mark.asyncio
+async def test_webhook_rejects_invalid_secret(webhook):
+    tracker, server, url, confirmed, _ = webhook
+
+    async with httpx.AsyncClient() as sender:
+        response = await sender.post(
+            url,
+            json=_payload([{"Id": 1, "Paid": True}]),
+            headers={"X-Webhook-Secret": "wrong"}
+        )
+
+    assert response.status_code == 401
+    assert not tracker.is_paid(101)
+    assert server.get_stats()['rejected'] == 1
+
+
+@pytest.mark.asyncio
+async def test_webhook_ignores_other_tables_and_paths(webhook):
+    tracker, server, url, confirmed, _ = webhook
+
+    async with httpx.AsyncClient() as sender:
+        other_table = await sender.post(
+            url,
+            json=_payload([{"Id": 1, "Paid": True}], table_id="other"),
+            headers={"X-Webhook-Secret": SECRET}
+        )
+        wrong_path = await sender.post(url + "x", json={}, headers={"X-Webhook-Secret": SECRET})
+
+    assert other_table.status_code == 200
+    assert wrong_path.status_code == 404
+    assert not tracker.is_paid(101)
@@ -5,8 +5,9 @@ Usage:
     python upload_config_to_nocodb.py
 """
 import asyncio
-import httpx
 from config import config
+from bot_flow.flows.nocodb_client import get_nocodb_client
+from bot_flow.flows.nocodb_utils import close_client_pool
 
 # NocoDB configuration from centralized config
 NOCODB_API_URL = config.NOCODB_API_URL
@@ -27,34 +28,21 @@ async def upload_config():
         print("❌ NOCODB_API_TOKEN not found in .env file!")
         return
 
-    headers = {
-        "xc-token": NOCODB_API_TOKEN,
-        "Content-Type": "application/json"
-    }
-
     print(f"📤 Uploading {len(CONFIG)} config values to NocoDB table {CONFIG_TABLE_ID}...")
 
-    async with httpx.AsyncClient() as client:
-        for action, msg in CONFIG.items():
-            data = {
-                "action": action,
-                "text": msg
-            }
-
-            try:
-                response = await client.post(
-                    f"{NOCODB_API_URL}/api/v2/tables/{CONFIG_TABLE_ID}/records",
-                    headers=headers,
-                    json=data,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                result = response.json()
-                record_id = result.get("Id") or result.get("id")
-                print(f"  ✅ {action}: {msg} (ID: {record_id})")
-
-            except Exception as e:
-                print(f"  ❌ {action}: {e}")
+    rows = [{"action": action, "text": msg} for action, msg in CONFIG.items()]
+
+    try:
+        # One bulk request for all config values
+        record_ids = await get_nocodb_client().bulk_create(CONFIG_TABLE_ID, rows)
+        for (action, msg), record_id in zip(CONFIG.items(), record_ids):
+            print(f"  ✅ {action}: {msg} (ID: {record_id})")
+
+    except Exception as e:
+        print(f"  ❌ Upload failed: {e}")
+
+    finally:
+        await close_client_pool()
 
     print("\n✨ Upload complete!")
 
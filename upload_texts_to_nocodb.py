@@ -5,8 +5,9 @@ Usage:
     python upload_texts_to_nocodb.py
 """
 import asyncio
-import httpx
 from config import config
+from bot_flow.flows.nocodb_client import get_nocodb_client
+from bot_flow.flows.nocodb_utils import close_client_pool
 
 # NocoDB configuration from centralized config
 NOCODB_API_URL = config.NOCODB_API_URL
@@ -47,34 +48,30 @@ async def upload_texts():
         print("❌ NOCODB_API_TOKEN not found in .env file!")
         return
 
-    headers = {
-        "xc-token": NOCODB_API_TOKEN,
-        "Content-Type": "application/json"
-    }
-
     print(f"📤 Uploading {len(TEXTS)} texts to NocoDB table {TEXTS_TABLE_ID}...")
 
-    async with httpx.AsyncClient() as client:
-        for action, text in TEXTS.items():
-            data = {
-                "action": action,
-                "text": text
-            }
+    rows = [{"action": action, "text": text} for action, text in TEXTS.items()]
+
+    client = get_nocodb_client()
+
+    try:
+        # One bulk request for all texts
+        record_ids = await client.bulk_create(TEXTS_TABLE_ID, rows)
+        for action, record_id in zip(TEXTS, record_ids):
+            print(f"  ✅ {action}: {record_id}")
 
+    except Exception as e:
+        # Bulk insert is all-or-nothing: retry row by row to find the failing texts
+        print(f"  ⚠️ Bulk upload failed ({e}), uploading texts one by one...")
+        for row in rows:
             try:
-                response = await client.post(
-                    f"{NOCODB_API_URL}/api/v2/tables/{TEXTS_TABLE_ID}/records",
-                    headers=headers,
-                    json=data,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                result = response.json()
-                record_id = result.get("Id") or result.get("id")
-                print(f"  ✅ {action}: {record_id}")
+                record_id = await client.create(TEXTS_TABLE_ID, row)
+                print(f"  ✅ {row['action']}: {record_id}")
+            except Exception as row_error:
+                print(f"  ❌ {row['action']}: {row_error}")
 
-            except Exception as e:
-                print(f"  ❌ {action}: {e}")
+    finally:
+        await close_client_pool()
 
     print("\n✨ Upload complete!")
 